@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from src.asset_worker import AssetGenWorkerPool
+from src.db import IdeaRepository
+from src.asset_queue import AssetGenQueue
+from src.tg_content_factory import AssetGenService, LocalStorage, MetadataStore
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Drain the asset generation queue")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", default=str(Path("data") / "ideas.db"))
+    source.add_argument(
+        "--shard-dir",
+        default=None,
+        help="Drain every per-course idea DB shard (*.db) in this directory instead of --db",
+    )
+    parser.add_argument("--assets", default=str(Path("data") / "assets"))
+    parser.add_argument("--metadata-db", default=str(Path("data") / "metadata.db"))
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to CPU count")
+    parser.add_argument(
+        "--compact-payloads",
+        action="store_true",
+        help="Rewrite legacy JSON queue payloads in the compact format first",
+    )
+    return parser
+
+
+def shard_paths(shard_dir: Path) -> list[Path]:
+    """Idea DB shards written by ``nightly_idea_job.py --courses``, in name order."""
+    return sorted(path for path in shard_dir.glob("*.db") if path.is_file())
+
+
+def drain(
+    db_path: str, service: AssetGenService, workers: Optional[int], compact_payloads: bool
+) -> None:
+    repository = IdeaRepository(db_path=db_path)
+    if compact_payloads:
+        compaction = repository.compact_queue_payloads()
+        print(
+            f"Compacted queue payloads: {compaction.converted} "
+            f"({compaction.dead_lettered} undecodable, dead-lettered)"
+        )
+    queue = AssetGenQueue(repository)
+    stats = AssetGenWorkerPool(queue, service, workers=workers).drain()
+    print(f"Processed jobs: {stats.succeeded} succeeded, {stats.failed} failed")
+    dead = queue.dead_letters()
+    if dead:
+        print(f"Dead-lettered jobs: {[row['id'] for row in dead]}")
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    service = AssetGenService(LocalStorage(Path(args.assets)), MetadataStore(Path(args.metadata_db)))
+    if args.shard_dir is None:
+        drain(args.db, service, args.workers, args.compact_payloads)
+        return
+    shards = shard_paths(Path(args.shard_dir))
+    if not shards:
+        raise SystemExit(f"No idea DB shards found in {args.shard_dir}")
+    # Shards are drained one after another; each pool already uses every core.
+    for shard in shards:
+        print(f"Shard {shard.stem}:")
+        drain(str(shard), service, args.workers, args.compact_payloads)
+
+
+if __name__ == "__main__":
+    main()
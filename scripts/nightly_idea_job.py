@@ -1,11 +1,34 @@
 from __future__ import annotations
 
+import argparse
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Optional
 
 from src.db import IdeaRepository
 from src.idea_service import IdeaService
-from src.queue import AssetGenQueue
+from src.asset_queue import AssetGenQueue
+from src.tg_content_factory.near_duplicates import NearDuplicateIndex
+
+
+@dataclass(frozen=True)
+class CourseJob:
+    name: str
+    config_path: str
+    db_path: str
+
+
+@dataclass(frozen=True)
+class CourseSummary:
+    name: str
+    db_path: str
+    ideas_created: int
+    elapsed_seconds: float
+    error: Optional[str] = None
 
 
 def load_config(config_path: Path) -> dict[str, list[str]]:
@@ -13,19 +36,125 @@ def load_config(config_path: Path) -> dict[str, list[str]]:
         return json.load(handle)
 
 
-def main() -> None:
-    config_path = Path(__file__).resolve().parent.parent / "data" / "course_data.json"
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate and enqueue nightly ideas")
+    parser.add_argument(
+        "--courses",
+        default=None,
+        help="Directory of course config JSON files, or a manifest JSON listing them",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=str(Path("data") / "ideas"),
+        help="Directory for per-course idea DB shards (multi-course mode)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to CPU count")
+    return parser
+
+
+def generate_for_course(config_path: Path, db_path: str) -> list[int]:
     config = load_config(config_path)
-    repository = IdeaRepository(db_path=str(Path("data") / "ideas.db"))
+    repository = IdeaRepository(db_path=db_path, duplicate_index=NearDuplicateIndex())
     queue = AssetGenQueue(repository)
-    service = IdeaService(repository, queue)
-    service.generate_and_enqueue(
+    topic_index = repository.recent_topic_index()
+    # The index is the only recency source; passing the config list as well would
+    # penalise every configured topic twice.
+    topic_index.prune()
+    topic_index.seed(config.get("recent_topics", []))
+    service = IdeaService(repository, queue, topic_index=topic_index)
+    return service.generate_and_enqueue_bulk(
         themes=config["themes"],
         recent_keywords=config["recent_keywords"],
         trend_signals=config["trend_signals"],
-        recent_topics=config["recent_topics"],
     )
 
 
+def run_course(job: CourseJob) -> CourseSummary:
+    started = time.perf_counter()
+    try:
+        idea_ids = generate_for_course(Path(job.config_path), job.db_path)
+    except Exception as exc:
+        return CourseSummary(
+            name=job.name,
+            db_path=job.db_path,
+            ideas_created=0,
+            elapsed_seconds=round(time.perf_counter() - started, 3),
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return CourseSummary(
+        name=job.name,
+        db_path=job.db_path,
+        ideas_created=len(idea_ids),
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+def discover_courses(source: Path, shard_dir: Path) -> list[CourseJob]:
+    """Resolve a config directory or manifest into one job per course.
+
+    A manifest is either a JSON list of config paths or ``{"courses": [...]}``
+    whose entries are paths or ``{"name": ..., "config": ...}`` objects; relative
+    paths resolve against the manifest's directory.
+    """
+    if source.is_dir():
+        entries: list[object] = sorted(path.name for path in source.glob("*.json"))
+        base = source
+    else:
+        manifest = load_config(source)
+        entries = manifest["courses"] if isinstance(manifest, dict) else manifest
+        base = source.parent
+    jobs: list[CourseJob] = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            config_path = base / entry["config"]
+            name = entry.get("name") or config_path.stem
+        else:
+            config_path = base / str(entry)
+            name = config_path.stem
+        jobs.append(
+            CourseJob(
+                name=name,
+                config_path=str(config_path),
+                db_path=str(shard_dir / f"{name}.db"),
+            )
+        )
+    names = [job.name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise SystemExit(f"Course names must be unique per shard: {duplicates}")
+    return jobs
+
+
+def run_courses(jobs: list[CourseJob], workers: Optional[int] = None) -> list[CourseSummary]:
+    # Each course writes its own shard, so processes never contend for a SQLite lock.
+    max_workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    if max_workers == 1:
+        return [run_course(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_course, jobs))
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    if not args.courses:
+        config_path = Path(__file__).resolve().parent.parent / "data" / "course_data.json"
+        generate_for_course(config_path, str(Path("data") / "ideas.db"))
+        return
+
+    jobs = discover_courses(Path(args.courses), Path(args.shard_dir))
+    started = time.perf_counter()
+    summaries = run_courses(jobs, args.workers)
+    for summary in summaries:
+        print(json.dumps(asdict(summary)))
+    failed = [summary.name for summary in summaries if summary.error]
+    print(
+        f"Processed {len(summaries)} courses "
+        f"({sum(summary.ideas_created for summary in summaries)} ideas, "
+        f"{len(failed)} failed) in {time.perf_counter() - started:.2f}s"
+    )
+    if failed:
+        raise SystemExit(1)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict
+
+from src.tg_content_factory.cassette import Cassette, LatencyModel, RecordingServer, ReplayServer
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Record OpenAI /responses traffic, or replay it from a local server",
+        epilog="Anything after `--` is run with OPENAI_BASE_URL pointed at the server.",
+    )
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", required=True, help="JSON-lines cassette file")
+    parser.add_argument("--port", type=int, default=0, help="Defaults to a free port")
+    parser.add_argument(
+        "--upstream",
+        default=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        help="API to record from",
+    )
+    parser.add_argument(
+        "--latency",
+        default="fixed:0",
+        help="fixed:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MU,SIGMA",
+    )
+    parser.add_argument(
+        "--event-delay", type=float, default=0.0, help="Delay between replayed stream events"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Latency sampling seed")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Reply 404 to unrecorded requests instead of reusing recordings",
+    )
+    return parser
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    command: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, command = argv[:split], argv[split + 1 :]
+    args = build_parser().parse_args(argv)
+    cassette = Cassette(args.cassette)
+    address = ("127.0.0.1", args.port)
+    if args.mode == "record":
+        server = RecordingServer(cassette, args.upstream, address=address)
+    else:
+        server = ReplayServer(
+            cassette,
+            latency=LatencyModel.parse(args.latency),
+            address=address,
+            strict=args.strict,
+            event_delay=args.event_delay,
+            seed=args.seed,
+        )
+    if not command:
+        print(f"Serving {args.mode} on {server.base_url} (Ctrl-C to stop)", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    env = dict(os.environ, OPENAI_BASE_URL=server.base_url)
+    env.pop("TG_OPENAI_MOCK", None)
+    started = time.perf_counter()
+    try:
+        returncode = subprocess.run(command, env=env).returncode
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+    summary = asdict(server.stats())
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["recorded"] = len(cassette.interactions)
+    print(json.dumps(summary))
+    raise SystemExit(returncode)
+
+
+if __name__ == "__main__":
+    main()
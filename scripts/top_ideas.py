@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.db import IdeaRepository
+from src.models import StoredIdea
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Show the top scored ideas")
+    parser.add_argument(
+        "--db",
+        action="append",
+        default=None,
+        help="Idea DB to query (repeatable; defaults to data/ideas.db)",
+    )
+    parser.add_argument("--shard-dir", default=None, help="Query every *.db shard in a directory")
+    parser.add_argument("--theme", default=None)
+    parser.add_argument("--days", type=float, default=None, help="Only ideas from the last N days")
+    parser.add_argument("--limit", type=int, default=50)
+    return parser
+
+
+def top_ideas(
+    db_paths: Iterable[str],
+    limit: int,
+    theme: Optional[str] = None,
+    since: Optional[datetime] = None,
+) -> list[tuple[str, StoredIdea]]:
+    # Each shard returns at most `limit` rows, so the merge heap stays bounded.
+    candidates = (
+        (db_path, stored)
+        for db_path in db_paths
+        for stored in IdeaRepository(db_path).top_ideas(limit, theme=theme, since=since)
+    )
+    return heapq.nlargest(limit, candidates, key=lambda item: item[1].idea.score.total)
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    db_paths = list(args.db or [])
+    if args.shard_dir:
+        db_paths.extend(str(path) for path in sorted(Path(args.shard_dir).glob("*.db")))
+    if not db_paths:
+        db_paths = [str(Path("data") / "ideas.db")]
+    since = datetime.utcnow() - timedelta(days=args.days) if args.days is not None else None
+    for db_path, stored in top_ideas(db_paths, args.limit, theme=args.theme, since=since):
+        idea = stored.idea
+        print(
+            json.dumps(
+                {
+                    "db": db_path,
+                    "id": stored.id,
+                    "title": idea.title,
+                    "theme": idea.theme,
+                    "total_score": idea.score.total,
+                    "created_at": idea.created_at.isoformat(),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sqlite3
+import struct
+import uuid
+from datetime import datetime, timedelta
+
+from .db import IdeaRepository
+from .models import AssetGenJob, Idea
+from .payloads import decode_asset_payload
+
+DEFAULT_VISIBILITY_TIMEOUT = timedelta(minutes=5)
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = timedelta(seconds=30)
+
+
+class AssetGenQueue:
+    """Leased work queue over the ``asset_gen_queue`` table.
+
+    ``claim`` atomically leases pending rows (or rows whose lease expired) for
+    ``visibility_timeout``. Workers then ``ack`` or ``nack`` them; rows that run
+    out of attempts are parked with status ``dead``.
+    """
+
+    def __init__(
+        self,
+        repository: IdeaRepository,
+        visibility_timeout: timedelta = DEFAULT_VISIBILITY_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay: timedelta = DEFAULT_RETRY_DELAY,
+    ) -> None:
+        self._repository = repository
+        self._visibility_timeout = visibility_timeout
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+
+    def enqueue(self, idea: Idea, idea_id: int | None = None) -> None:
+        self._repository.enqueue_asset_generation(idea, idea_id=idea_id)
+
+    def claim(
+        self, limit: int = 1, worker_id: str | None = None, now: datetime | None = None
+    ) -> list[AssetGenJob]:
+        current = (now or datetime.utcnow()).isoformat()
+        lease_token = f"{worker_id or 'worker'}:{uuid.uuid4().hex}"
+        lease_expires_at = ((now or datetime.utcnow()) + self._visibility_timeout).isoformat()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    """
+                    UPDATE asset_gen_queue
+                    SET status = 'dead', leased_by = NULL, lease_expires_at = NULL,
+                        last_error = COALESCE(last_error, 'lease expired')
+                    WHERE status = 'leased' AND lease_expires_at <= ? AND attempts >= ?
+                    """,
+                    (current, self._max_attempts),
+                )
+                rows = conn.execute(
+                    """
+                    SELECT id FROM (
+                        SELECT id FROM asset_gen_queue
+                        WHERE status = 'pending'
+                        AND (available_at IS NULL OR available_at <= ?)
+                        UNION ALL
+                        SELECT id FROM asset_gen_queue
+                        WHERE status = 'leased' AND lease_expires_at <= ?
+                    )
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (current, current, limit),
+                ).fetchall()
+                job_ids = [row[0] for row in rows]
+                conn.executemany(
+                    """
+                    UPDATE asset_gen_queue
+                    SET status = 'leased', leased_by = ?, lease_expires_at = ?,
+                        attempts = attempts + 1
+                    WHERE id = ?
+                    """,
+                    [(lease_token, lease_expires_at, job_id) for job_id in job_ids],
+                )
+                claimed = conn.execute(
+                    f"""
+                    SELECT id, idea_id, payload, attempts FROM asset_gen_queue
+                    WHERE id IN ({", ".join("?" for _ in job_ids)})
+                    ORDER BY id
+                    """,
+                    job_ids,
+                ).fetchall()
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            jobs = []
+            for job_id, idea_id, raw_payload, attempts in claimed:
+                try:
+                    payload = decode_asset_payload(raw_payload)
+                except (ValueError, KeyError, TypeError, struct.error) as exc:
+                    # A payload that cannot be decoded never will be; park it instead of
+                    # failing the whole batch and stranding the other leases.
+                    conn.execute(
+                        """
+                        UPDATE asset_gen_queue
+                        SET status = 'dead', leased_by = NULL, lease_expires_at = NULL,
+                            last_error = ?
+                        WHERE id = ? AND leased_by = ?
+                        """,
+                        (f"undecodable payload: {exc!r}", job_id, lease_token),
+                    )
+                    continue
+                jobs.append(
+                    AssetGenJob(
+                        id=job_id,
+                        idea_id=idea_id,
+                        payload=payload,
+                        attempts=attempts,
+                        lease_token=lease_token,
+                    )
+                )
+        finally:
+            conn.close()
+        return jobs
+
+    def ack(self, job: AssetGenJob) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE asset_gen_queue
+                SET status = 'done', leased_by = NULL, lease_expires_at = NULL
+                WHERE id = ? AND status = 'leased' AND leased_by = ?
+                """,
+                (job.id, job.lease_token),
+            )
+            return cursor.rowcount > 0
+
+    def nack(self, job: AssetGenJob, error: str, now: datetime | None = None) -> bool:
+        current = now or datetime.utcnow()
+        exhausted = job.attempts >= self._max_attempts
+        available_at = current + self._retry_delay * (2 ** max(job.attempts - 1, 0))
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE asset_gen_queue
+                SET status = ?, available_at = ?, last_error = ?,
+                    leased_by = NULL, lease_expires_at = NULL
+                WHERE id = ? AND status = 'leased' AND leased_by = ?
+                """,
+                (
+                    "dead" if exhausted else "pending",
+                    None if exhausted else available_at.isoformat(),
+                    error,
+                    job.id,
+                    job.lease_token,
+                ),
+            )
+            return cursor.rowcount > 0
+
+    def dead_letters(self) -> list[dict[str, object]]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                """
+                SELECT id, idea_id, attempts, last_error, created_at
+                FROM asset_gen_queue WHERE status = 'dead' ORDER BY id
+                """
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_dead_letters(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE asset_gen_queue
+                SET status = 'pending', attempts = 0, available_at = NULL
+                WHERE status = 'dead'
+                """
+            )
+            return cursor.rowcount
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._repository.db_path, isolation_level=None, timeout=30)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from .models import AssetGenJob
+from .payloads import ASSET_KEYWORD_LIMIT
+from .asset_queue import AssetGenQueue
+from .tg_content_factory.asset_generation import AssetGenService
+from .tg_content_factory.data import AssetGenerationItem, AssetGenerationRequest, AssetType
+
+B_ROLL_SECONDS = 4.0
+OVERLAY_SECONDS = 3.0
+
+
+@dataclass(frozen=True)
+class DrainStats:
+    succeeded: int
+    failed: int
+
+
+def build_asset_request(job: AssetGenJob) -> AssetGenerationRequest:
+    payload = job.payload
+    theme = payload.theme
+    items = [
+        AssetGenerationItem(
+            asset_type=AssetType.TEXT_OVERLAY,
+            prompt=payload.title,
+            duration_seconds=OVERLAY_SECONDS,
+            license="generated",
+            source="asset_gen_queue",
+        )
+    ]
+    for keyword in payload.keywords[:ASSET_KEYWORD_LIMIT]:
+        items.append(
+            AssetGenerationItem(
+                asset_type=AssetType.B_ROLL,
+                prompt=f"{theme}: {keyword}" if theme else keyword,
+                duration_seconds=B_ROLL_SECONDS,
+                license="generated",
+                source="asset_gen_queue",
+            )
+        )
+    request_key = f"idea_{job.idea_id}" if job.idea_id is not None else f"job_{job.id}"
+    return AssetGenerationRequest(request_id=request_key, items=items)
+
+
+class AssetGenWorkerPool:
+    """Drains ``AssetGenQueue`` into ``AssetGenService`` with parallel worker processes.
+
+    Asset generation renders and serializes every clip in Python, which holds the
+    GIL, so workers are processes rather than threads. The queue, service and
+    request builder are pickled into each worker; the queue's ``claim`` leases rows
+    in an immediate SQLite transaction, so workers never claim the same job.
+
+    Each worker claims one job at a time, so a slow item never holds leases on
+    work another worker could pick up. Failures are nacked and retried by the
+    queue until they are dead-lettered.
+    """
+
+    def __init__(
+        self,
+        queue: AssetGenQueue,
+        service: AssetGenService,
+        workers: int | None = None,
+        request_builder: Callable[[AssetGenJob], AssetGenerationRequest] = build_asset_request,
+    ) -> None:
+        self._queue = queue
+        self._service = service
+        self._workers = workers or os.cpu_count() or 1
+        self._request_builder = request_builder
+
+    def drain(self) -> DrainStats:
+        """Process claimable jobs until none are left; returns this run's counts."""
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            futures = [
+                executor.submit(
+                    _drain_worker,
+                    self._queue,
+                    self._service,
+                    self._request_builder,
+                    f"worker-{index}",
+                )
+                for index in range(self._workers)
+            ]
+            results = [future.result() for future in futures]
+        return DrainStats(
+            succeeded=sum(result.succeeded for result in results),
+            failed=sum(result.failed for result in results),
+        )
+
+
+def _drain_worker(
+    queue: AssetGenQueue,
+    service: AssetGenService,
+    request_builder: Callable[[AssetGenJob], AssetGenerationRequest],
+    worker_id: str,
+) -> DrainStats:
+    succeeded = 0
+    failed = 0
+    while True:
+        jobs = queue.claim(limit=1, worker_id=worker_id)
+        if not jobs:
+            return DrainStats(succeeded=succeeded, failed=failed)
+        job = jobs[0]
+        try:
+            service.generate_assets(request_builder(job))
+        except Exception as exc:
+            queue.nack(job, f"{type(exc).__name__}: {exc}")
+            failed += 1
+            continue
+        queue.ack(job)
+        succeeded += 1
@@ -2,18 +2,58 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from dataclasses import asdict
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Sequence
 
-from .models import Idea
+from . import recent_topics
+from .models import Idea, IdeaScore, PayloadCompaction, StoredIdea
+from .payloads import asset_payload_for, decode_asset_payload, encode_asset_payload
+from .recent_topics import RecentTopicIndex
+from .tg_content_factory.near_duplicates import DuplicateMatch, NearDuplicateIndex
+
+_IDEA_COLUMNS = (
+    "title",
+    "description",
+    "theme",
+    "keywords",
+    "trends",
+    "created_at",
+    "engagement",
+    "novelty",
+    "venue_fit",
+    "total_score",
+)
+
+_QUEUE_LEASE_COLUMNS = {
+    "status": "TEXT NOT NULL DEFAULT 'pending'",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "available_at": "TEXT",
+    "leased_by": "TEXT",
+    "lease_expires_at": "TEXT",
+    "last_error": "TEXT",
+}
 
 
 class IdeaRepository:
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        topic_half_life: timedelta = recent_topics.DEFAULT_HALF_LIFE,
+        duplicate_index: NearDuplicateIndex | None = None,
+    ) -> None:
         self._db_path = db_path
+        self._topic_half_life = topic_half_life
+        self._duplicate_index = duplicate_index
         self._ensure_schema()
 
+    @property
+    def db_path(self) -> str:
+        return self._db_path
+
+    def recent_topic_index(self) -> RecentTopicIndex:
+        return RecentTopicIndex(self._db_path, half_life=self._topic_half_life)
+
     def _ensure_schema(self) -> None:
         Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
         with sqlite3.connect(self._db_path) as conn:
@@ -34,62 +74,357 @@ class IdeaRepository:
                 )
                 """
             )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_ideas_theme_score
+                ON ideas (theme, total_score DESC, created_at)
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_ideas_score
+                ON ideas (total_score DESC, created_at)
+                """
+            )
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS asset_gen_queue (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    idea_title TEXT NOT NULL,
+                    idea_id INTEGER REFERENCES ideas (id),
+                    idea_title TEXT,
                     payload TEXT NOT NULL,
-                    created_at TEXT NOT NULL
+                    created_at TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at TEXT,
+                    leased_by TEXT,
+                    lease_expires_at TEXT,
+                    last_error TEXT
                 )
                 """
             )
+            _migrate_asset_gen_queue(conn)
+            _add_missing_columns(conn, "asset_gen_queue", _QUEUE_LEASE_COLUMNS)
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_asset_gen_queue_pending
+                ON asset_gen_queue (available_at, id) WHERE status = 'pending'
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_asset_gen_queue_leased
+                ON asset_gen_queue (lease_expires_at) WHERE status = 'leased'
+                """
+            )
+            recent_topics.ensure_schema(conn, self._topic_half_life)
+            if self._duplicate_index and self._duplicate_index.ensure_schema(conn):
+                self._duplicate_index.backfill(
+                    conn,
+                    conn.execute(
+                        "SELECT id, title || '\n' || description, lower(theme) FROM ideas"
+                    ).fetchall(),
+                )
+
+    def find_near_duplicate(self, idea: Idea) -> DuplicateMatch | None:
+        if self._duplicate_index is None:
+            return None
+        with sqlite3.connect(self._db_path) as conn:
+            return self._duplicate_index.find_duplicate(
+                conn, self._duplicate_index.signature(_idea_text(idea)), _idea_scope(idea)
+            )
 
     def save_idea(self, idea: Idea) -> int:
         with sqlite3.connect(self._db_path) as conn:
             cursor = conn.execute(
-                """
-                INSERT INTO ideas (
-                    title,
-                    description,
-                    theme,
-                    keywords,
-                    trends,
-                    created_at,
-                    engagement,
-                    novelty,
-                    venue_fit,
-                    total_score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                f"""
+                INSERT INTO ideas ({", ".join(_IDEA_COLUMNS)})
+                VALUES ({", ".join("?" for _ in _IDEA_COLUMNS)})
                 """,
-                (
-                    idea.title,
-                    idea.description,
-                    idea.theme,
-                    json.dumps(idea.keywords),
-                    json.dumps(idea.trends),
-                    idea.created_at.isoformat(),
-                    idea.score.engagement,
-                    idea.score.novelty,
-                    idea.score.venue_fit,
-                    idea.score.total,
-                ),
+                _idea_row(idea),
             )
-            return int(cursor.lastrowid)
+            idea_id = int(cursor.lastrowid)
+            if self._duplicate_index:
+                self._duplicate_index.add(
+                    conn,
+                    idea_id,
+                    self._duplicate_index.signature(_idea_text(idea)),
+                    _idea_scope(idea),
+                )
+            self._record_topics(conn, [idea])
+            return idea_id
+
+    def top_ideas(
+        self,
+        limit: int,
+        *,
+        theme: str | None = None,
+        since: datetime | None = None,
+    ) -> list[StoredIdea]:
+        """Return the highest scoring ideas, optionally filtered by theme and age.
 
-    def enqueue_asset_generation(self, idea: Idea) -> None:
-        payload = json.dumps(asdict(idea), default=_json_serializer)
+        The score indexes carry ``created_at`` so SQLite walks them in score order,
+        filters on the index entries and stops after ``limit`` matches.
+        """
+        clauses: list[str] = []
+        params: list[object] = []
+        if theme is not None:
+            clauses.append("theme = ?")
+            params.append(theme)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.isoformat())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with sqlite3.connect(self._db_path) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT id, {", ".join(_IDEA_COLUMNS)} FROM ideas
+                {where}
+                ORDER BY total_score DESC
+                LIMIT ?
+                """,
+                (*params, limit),
+            ).fetchall()
+        return [_stored_idea(row) for row in rows]
+
+    def enqueue_asset_generation(self, idea: Idea, idea_id: int | None = None) -> None:
         with sqlite3.connect(self._db_path) as conn:
             conn.execute(
                 """
-                INSERT INTO asset_gen_queue (idea_title, payload, created_at)
-                VALUES (?, ?, ?)
+                INSERT INTO asset_gen_queue (idea_id, idea_title, payload, created_at)
+                VALUES (?, ?, ?, ?)
                 """,
-                (idea.title, payload, datetime.utcnow().isoformat()),
+                (idea_id, idea.title, _queue_payload(idea), datetime.utcnow().isoformat()),
             )
 
+    def save_ideas_and_enqueue(self, ideas: Sequence[Idea]) -> list[int]:
+        """Persist ideas and their queue rows in a single transaction.
+
+        Ids are reserved up front while holding the write lock so both tables can
+        be filled with ``executemany``; queue rows reference ``ideas.id``. When a
+        duplicate index is configured, near-duplicates of stored ideas (or of
+        earlier ideas in the same batch) are dropped and only inserted ids are
+        returned.
+        """
+        if not ideas:
+            return []
+        conn = sqlite3.connect(self._db_path, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                accepted, idea_ids = self._reserve_ids(conn, ideas)
+                conn.executemany(
+                    f"""
+                    INSERT INTO ideas (id, {", ".join(_IDEA_COLUMNS)})
+                    VALUES (?, {", ".join("?" for _ in _IDEA_COLUMNS)})
+                    """,
+                    [(idea_id, *_idea_row(idea)) for idea_id, idea in zip(idea_ids, accepted)],
+                )
+                enqueued_at = datetime.utcnow().isoformat()
+                conn.executemany(
+                    """
+                    INSERT INTO asset_gen_queue (idea_id, payload, created_at)
+                    VALUES (?, ?, ?)
+                    """,
+                    [
+                        (idea_id, _queue_payload(idea), enqueued_at)
+                        for idea_id, idea in zip(idea_ids, accepted)
+                    ],
+                )
+                self._record_topics(conn, accepted)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return idea_ids
+
+    def compact_queue_payloads(self, batch_size: int = 500) -> PayloadCompaction:
+        """Rewrite legacy JSON queue payloads in the compact format.
+
+        Rows enqueued before queue rows referenced ``ideas.id`` are linked back to
+        their idea by title and creation time. Rows whose payload cannot be decoded
+        are dead-lettered with ``last_error`` and left as they are.
+        """
+        converted = 0
+        dead_lettered = 0
+        last_id = 0
+        with sqlite3.connect(self._db_path) as conn:
+            while True:
+                rows = conn.execute(
+                    """
+                    SELECT id, idea_id, payload FROM asset_gen_queue
+                    WHERE typeof(payload) = 'text' AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (last_id, batch_size),
+                ).fetchall()
+                if not rows:
+                    return PayloadCompaction(converted, dead_lettered)
+                last_id = rows[-1][0]
+                updates = []
+                failures = []
+                for row_id, idea_id, payload in rows:
+                    try:
+                        compact = encode_asset_payload(decode_asset_payload(payload))
+                        legacy = json.loads(payload)
+                    except (ValueError, KeyError, TypeError) as exc:
+                        failures.append((f"undecodable legacy payload: {exc!r}", row_id))
+                        continue
+                    if idea_id is None:
+                        match = conn.execute(
+                            "SELECT id FROM ideas WHERE title = ? AND created_at = ?",
+                            (legacy.get("title"), legacy.get("created_at")),
+                        ).fetchone()
+                        idea_id = match[0] if match else None
+                    updates.append((compact, idea_id, row_id))
+                conn.executemany(
+                    "UPDATE asset_gen_queue SET payload = ?, idea_id = ? WHERE id = ?",
+                    updates,
+                )
+                conn.executemany(
+                    """
+                    UPDATE asset_gen_queue
+                    SET status = 'dead', leased_by = NULL, lease_expires_at = NULL,
+                        last_error = ?
+                    WHERE id = ?
+                    """,
+                    failures,
+                )
+                conn.commit()
+                converted += len(updates)
+                dead_lettered += len(failures)
+
+    def _reserve_ids(
+        self, conn: sqlite3.Connection, ideas: Sequence[Idea]
+    ) -> tuple[list[Idea], list[int]]:
+        next_id = _next_idea_id(conn)
+        accepted: list[Idea] = []
+        idea_ids: list[int] = []
+        for idea in ideas:
+            if self._duplicate_index:
+                signature = self._duplicate_index.signature(_idea_text(idea))
+                scope = _idea_scope(idea)
+                if self._duplicate_index.find_duplicate(conn, signature, scope):
+                    continue
+                self._duplicate_index.add(conn, next_id, signature, scope)
+            accepted.append(idea)
+            idea_ids.append(next_id)
+            next_id += 1
+        return accepted, idea_ids
+
+    def _record_topics(self, conn: sqlite3.Connection, ideas: Sequence[Idea]) -> None:
+        recent_topics.record_observations(
+            conn,
+            [
+                (topic, idea.created_at)
+                for idea in ideas
+                for topic in recent_topics.idea_topics(idea)
+            ],
+            self._topic_half_life,
+        )
+
+
+def _idea_row(idea: Idea) -> tuple[object, ...]:
+    return (
+        idea.title,
+        idea.description,
+        idea.theme,
+        json.dumps(idea.keywords),
+        json.dumps(idea.trends),
+        idea.created_at.isoformat(),
+        idea.score.engagement,
+        idea.score.novelty,
+        idea.score.venue_fit,
+        idea.score.total,
+    )
+
+
+def _stored_idea(row: Sequence[object]) -> StoredIdea:
+    (
+        idea_id,
+        title,
+        description,
+        theme,
+        keywords,
+        trends,
+        created_at,
+        engagement,
+        novelty,
+        venue_fit,
+        _total_score,
+    ) = row
+    return StoredIdea(
+        id=int(idea_id),
+        idea=Idea.from_inputs(
+            title=title,
+            description=description,
+            theme=theme,
+            keywords=json.loads(keywords),
+            trends=json.loads(trends),
+            created_at=datetime.fromisoformat(created_at),
+            score=IdeaScore(engagement=engagement, novelty=novelty, venue_fit=venue_fit),
+        ),
+    )
+
+
+def _idea_text(idea: Idea) -> str:
+    return f"{idea.title}\n{idea.description}"
+
+
+def _idea_scope(idea: Idea) -> str:
+    # Ideas share template text and course keywords, so only the theme tells them
+    # apart; compare each idea against its own theme only.
+    return idea.theme.lower()
+
+
+def _queue_payload(idea: Idea) -> bytes:
+    return encode_asset_payload(asset_payload_for(idea))
+
+
+def _next_idea_id(conn: sqlite3.Connection) -> int:
+    # AUTOINCREMENT never reuses ids, so honour sqlite_sequence as well as MAX(id).
+    row = conn.execute(
+        """
+        SELECT MAX(
+            COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'ideas'), 0),
+            COALESCE((SELECT MAX(id) FROM ideas), 0)
+        )
+        """
+    ).fetchone()
+    return int(row[0]) + 1
+
+
+def _migrate_asset_gen_queue(conn: sqlite3.Connection) -> None:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(asset_gen_queue)")}
+    if "idea_id" in columns:
+        return
+    # Older databases declared idea_title NOT NULL; rebuild so rows can link by id.
+    conn.executescript(
+        """
+        BEGIN;
+        ALTER TABLE asset_gen_queue RENAME TO asset_gen_queue_legacy;
+        CREATE TABLE asset_gen_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idea_id INTEGER REFERENCES ideas (id),
+            idea_title TEXT,
+            payload TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        INSERT INTO asset_gen_queue (id, idea_title, payload, created_at)
+        SELECT id, idea_title, payload, created_at FROM asset_gen_queue_legacy;
+        DROP TABLE asset_gen_queue_legacy;
+        COMMIT;
+        """
+    )
+
 
-def _json_serializer(value: object) -> str:
-    if isinstance(value, datetime):
-        return value.isoformat()
-    raise TypeError(f"Unsupported type: {type(value)!r}")
+def _add_missing_columns(
+    conn: sqlite3.Connection, table: str, columns: dict[str, str]
+) -> None:
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
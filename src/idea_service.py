@@ -5,14 +5,21 @@ from typing import Iterable
 
 from .db import IdeaRepository
 from .models import Idea, IdeaScore
-from .queue import AssetGenQueue
-from .scoring import score_idea
+from .asset_queue import AssetGenQueue
+from .recent_topics import RecentTopicIndex
+from .scoring import ScoreBreakdown, ScoreCandidate, score_idea, score_ideas_batch
 
 
 class IdeaService:
-    def __init__(self, repository: IdeaRepository, queue: AssetGenQueue) -> None:
+    def __init__(
+        self,
+        repository: IdeaRepository,
+        queue: AssetGenQueue,
+        topic_index: RecentTopicIndex | None = None,
+    ) -> None:
         self._repository = repository
         self._queue = queue
+        self._topic_index = topic_index
 
     def generate_and_enqueue(
         self,
@@ -20,7 +27,7 @@ class IdeaService:
         themes: Iterable[str],
         recent_keywords: Iterable[str],
         trend_signals: Iterable[str],
-        recent_topics: Iterable[str],
+        recent_topics: Iterable[str] = (),
     ) -> list[Idea]:
         ideas: list[Idea] = []
         for theme in themes:
@@ -30,11 +37,41 @@ class IdeaService:
                 trend_signals=trend_signals,
                 recent_topics=recent_topics,
             )
-            self._repository.save_idea(idea)
-            self._queue.enqueue(idea)
+            if self._repository.find_near_duplicate(idea):
+                continue
+            idea_id = self._repository.save_idea(idea)
+            self._queue.enqueue(idea, idea_id=idea_id)
             ideas.append(idea)
         return ideas
 
+    def generate_and_enqueue_bulk(
+        self,
+        *,
+        themes: Iterable[str],
+        recent_keywords: Iterable[str],
+        trend_signals: Iterable[str],
+        recent_topics: Iterable[str] = (),
+    ) -> list[int]:
+        """Score every theme in one batch and persist ideas plus queue rows in one transaction."""
+        theme_list = list(themes)
+        keywords = tuple(recent_keywords)
+        trends = tuple(trend_signals)
+        breakdowns = score_ideas_batch(
+            [ScoreCandidate(theme=theme, keywords=keywords, trends=trends) for theme in theme_list],
+            recent_topics=recent_topics,
+            topic_index=self._topic_index,
+        )
+        ideas = [
+            self._assemble_idea(
+                theme=theme,
+                keywords=keywords,
+                trends=trends,
+                score_breakdown=breakdown,
+            )
+            for theme, breakdown in zip(theme_list, breakdowns)
+        ]
+        return self._repository.save_ideas_and_enqueue(ideas)
+
     def _build_idea(
         self,
         *,
@@ -50,7 +87,23 @@ class IdeaService:
             keywords=keywords,
             trends=trends,
             recent_topics=recent_topics,
+            topic_index=self._topic_index,
+        )
+        return self._assemble_idea(
+            theme=theme,
+            keywords=keywords,
+            trends=trends,
+            score_breakdown=score_breakdown,
         )
+
+    def _assemble_idea(
+        self,
+        *,
+        theme: str,
+        keywords: tuple[str, ...],
+        trends: tuple[str, ...],
+        score_breakdown: ScoreBreakdown,
+    ) -> Idea:
         score = IdeaScore(
             engagement=score_breakdown.engagement,
             novelty=score_breakdown.novelty,
@@ -47,3 +47,33 @@ class Idea:
             created_at=created_at,
             score=score,
         )
+
+
+@dataclass(frozen=True)
+class StoredIdea:
+    id: int
+    idea: Idea
+
+
+@dataclass(frozen=True)
+class AssetJobPayload:
+    """Fields the asset stage needs; everything else stays in ``ideas``."""
+
+    title: str
+    theme: str
+    keywords: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class AssetGenJob:
+    id: int
+    idea_id: int | None
+    payload: AssetJobPayload
+    attempts: int
+    lease_token: str
+
+
+@dataclass(frozen=True)
+class PayloadCompaction:
+    converted: int
+    dead_lettered: int
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import struct
+
+from .models import AssetJobPayload, Idea
+
+COMPACT_PAYLOAD_VERSION = 2
+ASSET_KEYWORD_LIMIT = 3
+
+_HEADER = struct.Struct("<BBHH")
+_LENGTH = struct.Struct("<H")
+
+
+def asset_payload_for(idea: Idea) -> AssetJobPayload:
+    return AssetJobPayload(
+        title=idea.title,
+        theme=idea.theme,
+        keywords=tuple(idea.keywords[:ASSET_KEYWORD_LIMIT]),
+    )
+
+
+def encode_asset_payload(payload: AssetJobPayload) -> bytes:
+    """Pack as ``version, keyword count, field lengths`` followed by UTF-8 bytes."""
+    fields = [payload.title, payload.theme, *payload.keywords[:ASSET_KEYWORD_LIMIT]]
+    encoded = [_truncate(field.encode("utf-8")) for field in fields]
+    header = _HEADER.pack(
+        COMPACT_PAYLOAD_VERSION, len(encoded) - 2, len(encoded[0]), len(encoded[1])
+    )
+    keyword_lengths = b"".join(_LENGTH.pack(len(field)) for field in encoded[2:])
+    return header + keyword_lengths + b"".join(encoded)
+
+
+def decode_asset_payload(raw: bytes | str) -> AssetJobPayload:
+    """Decode a compact payload, or a legacy ``asdict(idea)`` JSON document."""
+    if isinstance(raw, str):
+        data = json.loads(raw)
+        return AssetJobPayload(
+            title=data["title"],
+            theme=data.get("theme", ""),
+            keywords=tuple(data.get("keywords", ()))[:ASSET_KEYWORD_LIMIT],
+        )
+    version, keyword_count, title_length, theme_length = _HEADER.unpack_from(raw)
+    if version != COMPACT_PAYLOAD_VERSION:
+        raise ValueError(f"Unsupported asset payload version: {version}")
+    offset = _HEADER.size
+    lengths = [title_length, theme_length]
+    for _ in range(keyword_count):
+        lengths.append(_LENGTH.unpack_from(raw, offset)[0])
+        offset += _LENGTH.size
+    fields = []
+    for length in lengths:
+        fields.append(raw[offset : offset + length].decode("utf-8"))
+        offset += length
+    return AssetJobPayload(title=fields[0], theme=fields[1], keywords=tuple(fields[2:]))
+
+
+def _truncate(value: bytes) -> bytes:
+    limit = 0xFFFF
+    if len(value) <= limit:
+        return value
+    return value[:limit].decode("utf-8", errors="ignore").encode("utf-8")
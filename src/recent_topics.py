@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Collection, Iterable
+
+from .models import Idea
+
+DEFAULT_HALF_LIFE = timedelta(days=7)
+DEFAULT_MIN_WEIGHT = 0.05
+DEFAULT_MAX_TOPICS = 10_000
+
+
+class RecentTopicIndex:
+    """Time-decayed topic counts stored next to the ``ideas`` table.
+
+    Each row keeps a weight anchored at ``updated_at``; reading a weight decays it
+    to the current time, so lookups cost one indexed query per call regardless of
+    how much idea history exists. ``prune`` keeps the table bounded: topics that
+    decayed below ``min_weight`` are dropped, then the weakest beyond ``max_topics``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        half_life: timedelta = DEFAULT_HALF_LIFE,
+        min_weight: float = DEFAULT_MIN_WEIGHT,
+        max_topics: int = DEFAULT_MAX_TOPICS,
+    ) -> None:
+        self._db_path = db_path
+        self._half_life = half_life
+        self._min_weight = min_weight
+        self._max_topics = max_topics
+        Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self._db_path) as conn:
+            ensure_schema(conn, half_life)
+
+    def lookup(
+        self, topics: Collection[str], now: datetime | None = None
+    ) -> dict[str, float]:
+        wanted = sorted({topic.lower() for topic in topics})
+        if not wanted:
+            return {}
+        current = now or datetime.utcnow()
+        with sqlite3.connect(self._db_path) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT topic, weight, updated_at FROM recent_topics
+                WHERE topic IN ({", ".join("?" for _ in wanted)})
+                """,
+                wanted,
+            ).fetchall()
+        weights: dict[str, float] = {}
+        for topic, weight, updated_at in rows:
+            decayed = _decay(weight, datetime.fromisoformat(updated_at), current, self._half_life)
+            if decayed >= self._min_weight:
+                weights[topic] = decayed
+        return weights
+
+    def record(self, topics: Iterable[str], observed_at: datetime | None = None) -> None:
+        observed = observed_at or datetime.utcnow()
+        with sqlite3.connect(self._db_path) as conn:
+            record_observations(conn, [(topic, observed) for topic in topics], self._half_life)
+
+    def seed(self, topics: Iterable[str], observed_at: datetime | None = None) -> None:
+        """Add ``topics`` as single observations unless the index already tracks them.
+
+        Lets externally supplied recent topics (e.g. a course config) count once
+        without stacking on top of history recorded from saved ideas.
+        """
+        observed = (observed_at or datetime.utcnow()).isoformat()
+        with sqlite3.connect(self._db_path) as conn:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO recent_topics (topic, weight, updated_at)
+                VALUES (?, 1.0, ?)
+                """,
+                [(topic, observed) for topic in sorted({topic.lower() for topic in topics})],
+            )
+
+    def prune(self, now: datetime | None = None) -> int:
+        """Delete decayed and excess topics; returns how many were removed."""
+        current = now or datetime.utcnow()
+        with sqlite3.connect(self._db_path) as conn:
+            rows = conn.execute("SELECT topic, weight, updated_at FROM recent_topics").fetchall()
+            ranked = sorted(
+                (
+                    (_decay(weight, datetime.fromisoformat(at), current, self._half_life), topic)
+                    for topic, weight, at in rows
+                ),
+                reverse=True,
+            )
+            stale = [
+                (topic,)
+                for position, (weight, topic) in enumerate(ranked)
+                if weight < self._min_weight or position >= self._max_topics
+            ]
+            conn.executemany("DELETE FROM recent_topics WHERE topic = ?", stale)
+        return len(stale)
+
+
+def idea_topics(idea: Idea) -> set[str]:
+    return {idea.theme.lower(), *(keyword.lower() for keyword in idea.keywords)}
+
+
+def ensure_schema(conn: sqlite3.Connection, half_life: timedelta = DEFAULT_HALF_LIFE) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recent_topics'"
+    ).fetchone()
+    if exists:
+        return
+    conn.execute(
+        """
+        CREATE TABLE recent_topics (
+            topic TEXT PRIMARY KEY,
+            weight REAL NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    has_ideas = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ideas'"
+    ).fetchone()
+    if has_ideas:
+        _backfill_from_ideas(conn, half_life)
+
+
+def record_observations(
+    conn: sqlite3.Connection,
+    observations: Iterable[tuple[str, datetime]],
+    half_life: timedelta = DEFAULT_HALF_LIFE,
+) -> None:
+    """Fold topic observations into the decayed counts inside the caller's transaction."""
+    grouped: dict[str, list[datetime]] = defaultdict(list)
+    for topic, observed_at in observations:
+        grouped[topic.lower()].append(observed_at)
+    if not grouped:
+        return
+    topics = sorted(grouped)
+    existing = {
+        topic: (weight, datetime.fromisoformat(updated_at))
+        for topic, weight, updated_at in conn.execute(
+            f"""
+            SELECT topic, weight, updated_at FROM recent_topics
+            WHERE topic IN ({", ".join("?" for _ in topics)})
+            """,
+            topics,
+        )
+    }
+    rows = []
+    for topic in topics:
+        anchor = max(grouped[topic])
+        weight = 0.0
+        if topic in existing:
+            previous_weight, previous_at = existing[topic]
+            anchor = max(anchor, previous_at)
+            weight = _decay(previous_weight, previous_at, anchor, half_life)
+        weight += sum(_decay(1.0, observed, anchor, half_life) for observed in grouped[topic])
+        rows.append((topic, weight, anchor.isoformat()))
+    conn.executemany(
+        """
+        INSERT INTO recent_topics (topic, weight, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT (topic) DO UPDATE SET
+            weight = excluded.weight,
+            updated_at = excluded.updated_at
+        """,
+        rows,
+    )
+
+
+def _backfill_from_ideas(conn: sqlite3.Connection, half_life: timedelta) -> None:
+    observations: list[tuple[str, datetime]] = []
+    for theme, keywords, created_at in conn.execute(
+        "SELECT theme, keywords, created_at FROM ideas"
+    ):
+        observed_at = datetime.fromisoformat(created_at)
+        topics = {theme.lower(), *(keyword.lower() for keyword in json.loads(keywords))}
+        observations.extend((topic, observed_at) for topic in topics)
+    record_observations(conn, observations, half_life)
+
+
+def _decay(weight: float, since: datetime, until: datetime, half_life: timedelta) -> float:
+    elapsed = (until - since).total_seconds()
+    if elapsed <= 0:
+        return weight
+    return weight * 0.5 ** (elapsed / half_life.total_seconds())
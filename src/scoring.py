@@ -2,7 +2,12 @@ from __future__ import annotations
 
 from collections import Counter
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Collection, Iterable, Mapping, Protocol, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is not installed
+    np = None
 
 
 @dataclass(frozen=True)
@@ -12,12 +17,25 @@ class ScoreBreakdown:
     venue_fit: float
 
 
+class TopicWeightLookup(Protocol):
+    def lookup(self, topics: Collection[str]) -> Mapping[str, float]:
+        """Return recency weights for the given lowercased topics."""
+
+
+@dataclass(frozen=True)
+class ScoreCandidate:
+    theme: str
+    keywords: tuple[str, ...]
+    trends: tuple[str, ...]
+
+
 def score_idea(
     *,
     theme: str,
     keywords: Iterable[str],
     trends: Iterable[str],
-    recent_topics: Iterable[str],
+    recent_topics: Iterable[str] = (),
+    topic_index: TopicWeightLookup | None = None,
 ) -> ScoreBreakdown:
     keyword_list = [word.lower() for word in keywords]
     trend_list = [trend.lower() for trend in trends]
@@ -27,13 +45,154 @@ def score_idea(
     engagement = min(5.0, 1.0 + len(overlap) * 1.2 + len(trend_list) * 0.3)
 
     recency_counts = Counter(recent_list)
+    if topic_index is not None:
+        recency_counts.update(topic_index.lookup({theme.lower(), *keyword_list}))
     novelty_penalty = sum(recency_counts[word] for word in keyword_list if word in recency_counts)
     novelty = max(0.5, 5.0 - novelty_penalty * 0.8)
 
-    venue_fit = 2.5 + (0.2 if theme.lower() in recent_list else 0.0) + min(2.5, len(keyword_list) * 0.3)
+    theme_bonus = 0.2 if recency_counts.get(theme.lower(), 0) > 0 else 0.0
+    venue_fit = 2.5 + theme_bonus + min(2.5, len(keyword_list) * 0.3)
 
     return ScoreBreakdown(
         engagement=round(engagement, 3),
         novelty=round(novelty, 3),
         venue_fit=round(venue_fit, 3),
     )
+
+
+def score_ideas_batch(
+    candidates: Sequence[ScoreCandidate],
+    *,
+    recent_topics: Iterable[str] = (),
+    topic_index: TopicWeightLookup | None = None,
+) -> list[ScoreBreakdown]:
+    """Score many candidates against one set of recent topics.
+
+    The vocabulary is lowercased and encoded once; every candidate is then
+    reduced to integer token ids so the three components can be computed for
+    the whole batch at once. Results are identical to calling ``score_idea``
+    for each candidate.
+    """
+    if not candidates:
+        return []
+    encoded = _encode_batch(candidates, recent_topics, topic_index)
+    if np is None:
+        return _score_encoded_python(encoded)
+    return _score_encoded_numpy(encoded)
+
+
+@dataclass(frozen=True)
+class _EncodedBatch:
+    vocabulary_size: int
+    keyword_ids: list[list[int]]
+    trend_ids: list[list[int]]
+    theme_ids: list[int]
+    recency_counts: list[float]
+
+
+def _encode_batch(
+    candidates: Sequence[ScoreCandidate],
+    recent_topics: Iterable[str],
+    topic_index: TopicWeightLookup | None,
+) -> _EncodedBatch:
+    vocabulary: dict[str, int] = {}
+
+    def encode(word: str) -> int:
+        return vocabulary.setdefault(word.lower(), len(vocabulary))
+
+    keyword_ids = [[encode(word) for word in candidate.keywords] for candidate in candidates]
+    trend_ids = [[encode(trend) for trend in candidate.trends] for candidate in candidates]
+    theme_ids = [encode(candidate.theme) for candidate in candidates]
+
+    recency_counts: list[float] = [0] * len(vocabulary)
+    for topic in recent_topics:
+        token_id = vocabulary.get(topic.lower())
+        if token_id is not None:
+            recency_counts[token_id] += 1
+    if topic_index is not None:
+        # One lookup for the whole vocabulary instead of one per candidate.
+        for topic, weight in topic_index.lookup(vocabulary.keys()).items():
+            token_id = vocabulary.get(topic)
+            if token_id is not None:
+                recency_counts[token_id] += weight
+
+    return _EncodedBatch(
+        vocabulary_size=len(vocabulary),
+        keyword_ids=keyword_ids,
+        trend_ids=trend_ids,
+        theme_ids=theme_ids,
+        recency_counts=recency_counts,
+    )
+
+
+def _score_encoded_python(encoded: _EncodedBatch) -> list[ScoreBreakdown]:
+    counts = encoded.recency_counts
+    results: list[ScoreBreakdown] = []
+    for keyword_ids, trend_ids, theme_id in zip(
+        encoded.keyword_ids, encoded.trend_ids, encoded.theme_ids
+    ):
+        overlap = len(set(keyword_ids) & set(trend_ids))
+        engagement = min(5.0, 1.0 + overlap * 1.2 + len(trend_ids) * 0.3)
+        novelty_penalty = sum(counts[token_id] for token_id in keyword_ids)
+        novelty = max(0.5, 5.0 - novelty_penalty * 0.8)
+        venue_fit = (
+            2.5 + (0.2 if counts[theme_id] else 0.0) + min(2.5, len(keyword_ids) * 0.3)
+        )
+        results.append(
+            ScoreBreakdown(
+                engagement=round(engagement, 3),
+                novelty=round(novelty, 3),
+                venue_fit=round(venue_fit, 3),
+            )
+        )
+    return results
+
+
+def _score_encoded_numpy(encoded: _EncodedBatch) -> list[ScoreBreakdown]:
+    size = len(encoded.theme_ids)
+    vocabulary_size = encoded.vocabulary_size
+    counts = np.asarray(encoded.recency_counts, dtype=np.float64)
+
+    keyword_lengths = np.fromiter(
+        (len(ids) for ids in encoded.keyword_ids), dtype=np.int64, count=size
+    )
+    trend_lengths = np.fromiter(
+        (len(ids) for ids in encoded.trend_ids), dtype=np.int64, count=size
+    )
+    keyword_flat = _flatten(encoded.keyword_ids, int(keyword_lengths.sum()))
+    trend_flat = _flatten(encoded.trend_ids, int(trend_lengths.sum()))
+    keyword_owner = np.repeat(np.arange(size, dtype=np.int64), keyword_lengths)
+    trend_owner = np.repeat(np.arange(size, dtype=np.int64), trend_lengths)
+
+    # Unique (candidate, token) pairs mirror the set intersection in score_idea.
+    keyword_pairs = np.unique(keyword_owner * vocabulary_size + keyword_flat)
+    trend_pairs = np.unique(trend_owner * vocabulary_size + trend_flat)
+    shared = np.intersect1d(keyword_pairs, trend_pairs, assume_unique=True)
+    overlap = np.bincount(shared // max(vocabulary_size, 1), minlength=size)
+
+    novelty_penalty = np.bincount(
+        keyword_owner, weights=counts[keyword_flat], minlength=size
+    )
+    theme_bonus = np.where(counts[np.asarray(encoded.theme_ids, dtype=np.int64)] > 0, 0.2, 0.0)
+
+    engagement = np.minimum(5.0, 1.0 + overlap * 1.2 + trend_lengths * 0.3)
+    novelty = np.maximum(0.5, 5.0 - novelty_penalty * 0.8)
+    venue_fit = 2.5 + theme_bonus + np.minimum(2.5, keyword_lengths * 0.3)
+
+    # Python's round() is used on the way out so ties resolve exactly like score_idea.
+    return [
+        ScoreBreakdown(
+            engagement=round(float(engagement_value), 3),
+            novelty=round(float(novelty_value), 3),
+            venue_fit=round(float(venue_fit_value), 3),
+        )
+        for engagement_value, novelty_value, venue_fit_value in zip(
+            engagement.tolist(), novelty.tolist(), venue_fit.tolist()
+        )
+    ]
+
+
+def _flatten(rows: list[list[int]], total: int) -> "np.ndarray":
+    return np.fromiter(
+        (token_id for row in rows for token_id in row), dtype=np.int64, count=total
+    )
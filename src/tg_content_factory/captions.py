@@ -0,0 +1,161 @@
+"""Caption layout and one-off rasterization into transparent PNG overlays."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import textwrap
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Average glyph advance as a fraction of the font size; good enough for sans fonts.
+_GLYPH_WIDTH = 0.5
+_MARGIN = 0.08
+LINE_SPACING = 0.35
+# Bump when layout or rasterization changes so stale overlays are not reused.
+CAPTION_VERSION = 1
+DEFAULT_MAX_OVERLAYS = 256
+
+
+@lru_cache(maxsize=1024)
+def layout_caption(text: str, width: int, font_size: int) -> Tuple[str, ...]:
+    """Wrap ``text`` into lines that fit ``width`` pixels at ``font_size``."""
+    usable = width * (1 - 2 * _MARGIN)
+    max_chars = max(8, int(usable / (font_size * _GLYPH_WIDTH)))
+    lines: List[str] = []
+    for paragraph in text.splitlines():
+        if not paragraph.strip():
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        lines.extend(textwrap.wrap(paragraph.strip(), width=max_chars) or [""])
+    while lines and not lines[-1]:
+        lines.pop()
+    return tuple(lines)
+
+
+class CaptionRasterizer:
+    """Renders each distinct caption layout to ``directory/<key>.png`` exactly once.
+
+    ``run`` executes an ffmpeg command and must create the listed output paths;
+    overlays are written under a temporary name and renamed into place, so
+    concurrent renderers (threads or processes) never read a partial image.
+    A key's lock only lives until its overlay exists. Reuse refreshes an overlay's
+    mtime, and once more than ``max_overlays`` exist the least recently used are
+    deleted (a render still reading one keeps its open file).
+    """
+
+    def __init__(self, directory: Path, max_overlays: int = DEFAULT_MAX_OVERLAYS) -> None:
+        self.directory = Path(directory)
+        self.max_overlays = max_overlays
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def overlay_for(
+        self,
+        text: str,
+        font_path: Path,
+        font_size: int,
+        size: Tuple[int, int],
+        run: Callable[[List[str], Sequence[Path]], object],
+        extra_args: Sequence[str] = (),
+    ) -> Path:
+        width, height = size
+        lines = layout_caption(text, width, font_size)
+        key = _caption_key(lines, font_path, font_size, size)
+        overlay = self.directory / f"{key}.png"
+        if _touch(overlay):
+            return overlay
+        with self._key_lock(key):
+            if _touch(overlay):
+                return overlay
+            self.directory.mkdir(parents=True, exist_ok=True)
+            staging = f".{key}.{os.getpid()}.{threading.get_ident()}"
+            textfile = self.directory / f"{staging}.txt"
+            image = self.directory / f"{staging}.png"
+            textfile.write_text("\n".join(lines), encoding="utf-8")
+            try:
+                command = [
+                    "ffmpeg",
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    f"color=c=black@0.0:s={width}x{height},format=rgba",
+                    "-vf",
+                    (
+                        "drawtext="
+                        f"fontfile={_filter_path(font_path)}:"
+                        f"textfile={_filter_path(textfile)}:expansion=none:"
+                        f"fontsize={font_size}:fontcolor=white:"
+                        f"line_spacing={int(font_size * LINE_SPACING)}:"
+                        "x=(w-text_w)/2:y=(h-text_h)/2"
+                    ),
+                    "-frames:v",
+                    "1",
+                    *extra_args,
+                    str(image),
+                ]
+                run(command, [image])
+                os.replace(image, overlay)
+            finally:
+                textfile.unlink(missing_ok=True)
+                image.unlink(missing_ok=True)
+        with self._lock:
+            # Later callers find the file and never need this key's lock again.
+            self._key_locks.pop(key, None)
+        self._evict(keep=overlay)
+        return overlay
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _evict(self, keep: Path) -> None:
+        overlays = []
+        for path in self.directory.glob("*.png"):
+            if path.name.startswith(".") or path == keep:
+                continue
+            try:
+                overlays.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        overlays.sort()
+        for _, path in overlays[: max(0, len(overlays) + 1 - self.max_overlays)]:
+            path.unlink(missing_ok=True)
+
+
+_RASTERIZERS: Dict[Path, CaptionRasterizer] = {}
+_RASTERIZERS_LOCK = threading.Lock()
+
+
+def rasterizer_for(directory: Path) -> CaptionRasterizer:
+    """Shared rasterizer per directory, so parallel renders never rasterize a caption twice."""
+    with _RASTERIZERS_LOCK:
+        return _RASTERIZERS.setdefault(Path(directory), CaptionRasterizer(directory))
+
+
+def _touch(path: Path) -> bool:
+    # Refresh the overlay's LRU position; False when it does not exist (or was just evicted).
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _caption_key(
+    lines: Sequence[str], font_path: Path, font_size: int, size: Tuple[int, int]
+) -> str:
+    digest = hashlib.sha256()
+    for part in (CAPTION_VERSION, font_path, font_size, *size, *lines):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _filter_path(path: Path) -> str:
+    # Paths are the only free-form values left in the filtergraph; escape its separators.
+    return str(path).replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
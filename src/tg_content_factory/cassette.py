@@ -0,0 +1,291 @@
+"""Record and replay ``/responses`` traffic through a local stand-in server."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .http_pool import HTTPConnectionPool
+
+_FORWARDED_HEADERS = ("Authorization", "Content-Type", "Accept")
+_REPLAYED_HEADERS = ("content-type", "x-request-id")
+
+
+@dataclass(frozen=True)
+class Interaction:
+    key: str
+    path: str
+    stream: bool
+    status: int
+    headers: Dict[str, str]
+    body: str
+
+
+def request_key(path: str, body: bytes) -> str:
+    """Stable key for a request: its path plus the canonical JSON body."""
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        canonical = body.decode("utf-8", "replace")
+    return hashlib.sha256(f"{path}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Append-only JSON-lines file of recorded interactions."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.interactions: List[Interaction] = []
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        self.interactions.append(Interaction(**json.loads(line)))
+
+    def append(self, interaction: Interaction) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(interaction.__dict__, ensure_ascii=False) + "\n")
+            self.interactions.append(interaction)
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Per-request delay in seconds: ``fixed:S``, ``uniform:LO,HI``,
+    ``normal:MEAN,STD`` or ``lognormal:MU,SIGMA`` (parameters of the log)."""
+
+    kind: str = "fixed"
+    params: Tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(value) for value in raw.split(",") if value)
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind=kind, params=params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        return math.exp(rng.gauss(*self.params))
+
+
+@dataclass(frozen=True)
+class ServerStats:
+    requests: int
+    misses: int
+    max_in_flight: int
+
+
+class _CassetteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], handler: type) -> None:
+        super().__init__(address, handler)
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._misses = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def stats(self) -> ServerStats:
+        with self._stats_lock:
+            return ServerStats(self._requests, self._misses, self._max_in_flight)
+
+    def begin(self) -> None:
+        with self._stats_lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+    def end(self, missed: bool = False) -> None:
+        with self._stats_lock:
+            self._in_flight -= 1
+            self._misses += int(missed)
+
+    def respond(self, request: "_CassetteHandler", path: str, body: bytes) -> None:
+        raise NotImplementedError
+
+
+class _CassetteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _CassetteServer
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        self.server.respond(self, self.path, body)
+
+    def send_body(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(
+        self, headers: Dict[str, str], body: str, event_delay: float = 0.0
+    ) -> None:
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in body.split("\n\n"):
+            if not event.strip():
+                continue
+            if event_delay > 0:
+                time.sleep(event_delay)
+            chunk = f"{event}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+class RecordingServer(_CassetteServer):
+    """Forwards requests to ``upstream`` and appends successful replies to the cassette.
+
+    When the upstream cannot be reached the client gets a 502 carrying the error.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        upstream: str,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        timeout: float = 120.0,
+    ) -> None:
+        super().__init__(address, _CassetteHandler)
+        self.cassette = cassette
+        self.upstream = HTTPConnectionPool(upstream, max_size=8, timeout=timeout)
+
+    def respond(self, request: _CassetteHandler, path: str, body: bytes) -> None:
+        self.begin()
+        try:
+            relative = path[len("/v1") :] if path.startswith("/v1/") else path
+            headers = {
+                name: request.headers[name]
+                for name in _FORWARDED_HEADERS
+                if request.headers.get(name)
+            }
+            try:
+                result = self.upstream.request("POST", relative, body=body, headers=headers)
+            except Exception as exc:
+                # Answer instead of dropping the request, which would leave the client waiting.
+                message = f"Upstream request failed: {type(exc).__name__}: {exc}"
+                error = json.dumps({"error": {"message": message}}).encode("utf-8")
+                request.send_body(502, {"Content-Type": "application/json"}, error)
+                return
+            kept = {
+                name: result.headers[name] for name in _REPLAYED_HEADERS if name in result.headers
+            }
+            if result.status < 400:
+                self.cassette.append(
+                    Interaction(
+                        key=request_key(path, body),
+                        path=path,
+                        stream=bool(_json_or_empty(body).get("stream")),
+                        status=result.status,
+                        headers=kept,
+                        body=result.body.decode("utf-8"),
+                    )
+                )
+            request.send_body(result.status, kept, result.body)
+        finally:
+            self.end()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.upstream.close()
+
+
+class ReplayServer(_CassetteServer):
+    """Serves recorded replies after a sampled delay; never touches the network.
+
+    Unknown requests get a 404 in ``strict`` mode. Otherwise they are answered
+    round-robin from recordings of the same kind (streamed or not), which keeps
+    response sizes realistic when prompts differ from the recording run.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: LatencyModel = LatencyModel(),
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        strict: bool = False,
+        event_delay: float = 0.0,
+        seed: Optional[int] = 0,
+    ) -> None:
+        super().__init__(address, _CassetteHandler)
+        self.latency = latency
+        self.strict = strict
+        self.event_delay = event_delay
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._by_key = {item.key: item for item in cassette.interactions}
+        self._by_kind: Dict[bool, List[Interaction]] = {True: [], False: []}
+        for item in cassette.interactions:
+            self._by_kind[item.stream].append(item)
+        self._cursor = {True: 0, False: 0}
+
+    def respond(self, request: _CassetteHandler, path: str, body: bytes) -> None:
+        self.begin()
+        interaction = self._by_key.get(request_key(path, body))
+        missed = interaction is None
+        try:
+            with self._rng_lock:
+                delay = self.latency.sample(self._rng)
+                if interaction is None and not self.strict:
+                    interaction = self._next_of_kind(bool(_json_or_empty(body).get("stream")))
+            time.sleep(delay)
+            if interaction is None:
+                error = json.dumps({"error": {"message": "No recorded response"}}).encode("utf-8")
+                request.send_body(404, {"Content-Type": "application/json"}, error)
+            elif interaction.stream:
+                request.send_events(interaction.headers, interaction.body, self.event_delay)
+            else:
+                request.send_body(
+                    interaction.status, interaction.headers, interaction.body.encode("utf-8")
+                )
+        finally:
+            self.end(missed)
+
+    def _next_of_kind(self, stream: bool) -> Optional[Interaction]:
+        candidates = self._by_kind[stream]
+        if not candidates:
+            return None
+        interaction = candidates[self._cursor[stream] % len(candidates)]
+        self._cursor[stream] += 1
+        return interaction
+
+
+def _json_or_empty(body: bytes) -> Dict[str, Any]:
+    try:
+        value = json.loads(body)
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
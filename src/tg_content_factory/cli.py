@@ -2,9 +2,22 @@ from __future__ import annotations
 
 import argparse
 import os
+from datetime import datetime
 from pathlib import Path
 
-from tg_content_factory import analytics, db, drafts, ideas, review, templates, venues
+from tg_content_factory import (
+    analytics,
+    db,
+    drafts,
+    ideas,
+    render_telemetry,
+    review,
+    templates,
+    venues,
+)
+from tg_content_factory.render_cache import RenderCache
+from tg_content_factory.response_cache import ResponseCache
+from tg_content_factory.video_renderer import PROFILES
 
 DEFAULT_DB = str(Path("data") / "tg_content_factory.db")
 
@@ -24,6 +37,16 @@ def build_parser() -> argparse.ArgumentParser:
 
     generate_parser = subparsers.add_parser("generate-ideas", help="Generate ideas")
     generate_parser.add_argument("--count", type=int, default=3)
+    generate_parser.add_argument(
+        "--allow-duplicates",
+        action="store_true",
+        help="Store ideas even when they near-duplicate existing ones",
+    )
+    generate_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse a cached reply for the same count (returns the same ideas as before)",
+    )
 
     subparsers.add_parser("list-ideas", help="List ideas")
 
@@ -34,6 +57,51 @@ def build_parser() -> argparse.ArgumentParser:
         nargs="+",
         default=[template.name for template in templates.TEMPLATES],
     )
+    draft_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Max concurrent script requests (or set OPENAI_MAX_CONCURRENCY)",
+    )
+    draft_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Scripts requested per model call (or set OPENAI_SCRIPT_BATCH_SIZE; 1 disables)",
+    )
+    draft_parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=None,
+        help="Parallel video renders (defaults to CPU count)",
+    )
+    draft_parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default="proof",
+        help="Render quality for new drafts; approval re-renders proofs at full quality",
+    )
+    draft_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip idea/template pairs that already have drafts and reuse finished renders",
+    )
+    draft_parser.add_argument(
+        "--deadline",
+        action="append",
+        default=[],
+        type=_parse_deadline,
+        metavar="IDEA_ID=ISO_TIME",
+        help="Target publish time for an idea; earliest deadlines render first (repeatable)",
+    )
+    draft_parser.add_argument(
+        "--no-cache", action="store_true", help="Bypass the OpenAI response cache"
+    )
+    draft_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream scripts and render each preview as soon as its hook arrives",
+    )
 
     list_drafts_parser = subparsers.add_parser("list-drafts", help="List drafts")
     list_drafts_parser.add_argument("--status", default=None)
@@ -62,9 +130,33 @@ def build_parser() -> argparse.ArgumentParser:
 
     subparsers.add_parser("list-analytics", help="List analytics")
 
+    subparsers.add_parser("cache-stats", help="Show OpenAI response cache statistics")
+    subparsers.add_parser("render-cache-stats", help="Show video render cache statistics")
+
+    report_parser = subparsers.add_parser(
+        "render-report", help="Show render timings per template from ffmpeg telemetry"
+    )
+    report_parser.add_argument(
+        "--slowest", type=int, default=0, help="Also list the N slowest individual renders"
+    )
+
     return parser
 
 
+def _parse_deadline(value: str) -> tuple[int, datetime]:
+    idea_id, _, when = value.partition("=")
+    try:
+        return int(idea_id), datetime.fromisoformat(when)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected IDEA_ID=ISO_TIME, got {value!r}"
+        ) from None
+
+
+def _print_preview_ready(idea_id: int, template_name: str, preview_path: Path) -> None:
+    print(f"Preview ready for idea {idea_id} ({template_name}): {preview_path}", flush=True)
+
+
 def _ensure_openai_key(api_key: str) -> None:
     if not api_key:
         raise SystemExit("OPENAI_API_KEY is required. Pass --openai-key or set env.")
@@ -82,7 +174,12 @@ def main() -> None:
     if args.command == "generate-ideas":
         _ensure_openai_key(args.openai_key)
         os.environ["OPENAI_API_KEY"] = args.openai_key
-        idea_ids = ideas.generate_ideas(args.db, args.count)
+        idea_ids = ideas.generate_ideas(
+            args.db,
+            args.count,
+            allow_duplicates=args.allow_duplicates,
+            use_cache=args.cache,
+        )
         print(f"Generated ideas: {idea_ids}")
         return
 
@@ -94,7 +191,20 @@ def main() -> None:
     if args.command == "create-drafts":
         _ensure_openai_key(args.openai_key)
         os.environ["OPENAI_API_KEY"] = args.openai_key
-        draft_ids = drafts.create_drafts(args.db, args.idea_ids, args.templates)
+        draft_ids = drafts.create_drafts(
+            args.db,
+            args.idea_ids,
+            args.templates,
+            concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+            batch_size=args.batch_size,
+            stream=args.stream,
+            on_preview=_print_preview_ready,
+            render_workers=args.render_workers,
+            profile=args.profile,
+            resume=args.resume,
+            deadlines=dict(args.deadline) or None,
+        )
         print(f"Created drafts: {draft_ids}")
         return
 
@@ -143,6 +253,31 @@ def main() -> None:
             print(metric)
         return
 
+    if args.command == "cache-stats":
+        cache = ResponseCache.from_env()
+        if cache is None:
+            print("Response cache disabled. Set TG_OPENAI_CACHE to a file path.")
+            return
+        print(cache.stats())
+        return
+
+    if args.command == "render-report":
+        for row in render_telemetry.template_report(args.db):
+            print(row)
+        if args.slowest:
+            print(f"Slowest {args.slowest} renders:")
+            for row in render_telemetry.slowest_renders(args.db, args.slowest):
+                print(row)
+        return
+
+    if args.command == "render-cache-stats":
+        render_cache = RenderCache.from_env()
+        if render_cache is None:
+            print("Render cache disabled. Set TG_RENDER_CACHE to a directory.")
+            return
+        print(render_cache.stats())
+        return
+
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,10 @@ from __future__ import annotations
 import sqlite3
 from pathlib import Path
 
+from .near_duplicates import NearDuplicateIndex
+
+IDEA_DUPLICATES = NearDuplicateIndex(table_prefix="idea")
+
 SCHEMA = """
 PRAGMA foreign_keys = ON;
 
@@ -24,9 +28,35 @@ CREATE TABLE IF NOT EXISTS drafts (
     preview_path TEXT,
     status TEXT NOT NULL,
     created_at TEXT NOT NULL,
+    render_profile TEXT NOT NULL DEFAULT 'full',
     FOREIGN KEY (idea_id) REFERENCES ideas (id)
 );
 
+CREATE TABLE IF NOT EXISTS render_metrics (
+    draft_id INTEGER NOT NULL,
+    profile TEXT NOT NULL,
+    wall_seconds REAL NOT NULL,
+    output_bytes INTEGER NOT NULL,
+    frames INTEGER,
+    fps REAL,
+    speed REAL,
+    cached INTEGER NOT NULL,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (draft_id, profile),
+    FOREIGN KEY (draft_id) REFERENCES drafts (id)
+);
+
+CREATE TABLE IF NOT EXISTS draft_variants (
+    draft_id INTEGER NOT NULL,
+    venue TEXT NOT NULL,
+    video_path TEXT NOT NULL,
+    thumbnail_path TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    PRIMARY KEY (draft_id, venue),
+    FOREIGN KEY (draft_id) REFERENCES drafts (id)
+);
+
 CREATE TABLE IF NOT EXISTS posts (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     draft_id INTEGER NOT NULL,
@@ -34,6 +64,7 @@ CREATE TABLE IF NOT EXISTS posts (
     status TEXT NOT NULL,
     external_id TEXT,
     created_at TEXT NOT NULL,
+    video_path TEXT,
     FOREIGN KEY (draft_id) REFERENCES drafts (id)
 );
 
@@ -47,6 +78,12 @@ CREATE TABLE IF NOT EXISTS analytics (
 );
 """
 
+# Columns added after a table first shipped; init_db adds them to older databases.
+ADDED_COLUMNS = {
+    "drafts": [("render_profile", "TEXT NOT NULL DEFAULT 'full'")],
+    "posts": [("video_path", "TEXT")],
+}
+
 
 def get_connection(db_path: str) -> sqlite3.Connection:
     path = Path(db_path)
@@ -61,4 +98,43 @@ def init_db(db_path: str) -> None:
     conn = get_connection(db_path)
     with conn:
         conn.executescript(SCHEMA)
+        _add_missing_columns(conn)
+        _key_render_metrics_by_profile(conn)
+        if IDEA_DUPLICATES.ensure_schema(conn):
+            IDEA_DUPLICATES.backfill(
+                conn, conn.execute("SELECT id, prompt FROM ideas").fetchall()
+            )
     conn.close()
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, definition in columns:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def _key_render_metrics_by_profile(conn: sqlite3.Connection) -> None:
+    # render_metrics used to be keyed by draft alone, so a full render replaced the
+    # proof's row. The key cannot be altered in place: rebuild the table and credit
+    # each kept row to the profile its draft has now, the last one it was rendered at.
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(render_metrics)")}
+    if "profile" in columns:
+        return
+    conn.execute("ALTER TABLE render_metrics RENAME TO render_metrics_by_draft")
+    conn.executescript(SCHEMA)
+    conn.execute(
+        """
+        INSERT INTO render_metrics (
+            draft_id, profile, wall_seconds, output_bytes, frames, fps, speed, cached,
+            recorded_at
+        )
+        SELECT
+            old.draft_id, drafts.render_profile, old.wall_seconds, old.output_bytes,
+            old.frames, old.fps, old.speed, old.cached, old.recorded_at
+        FROM render_metrics_by_draft AS old
+        JOIN drafts ON drafts.id = old.draft_id
+        """
+    )
+    conn.execute("DROP TABLE render_metrics_by_draft")
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Mapping, Optional
 
-from tg_content_factory import db, templates
+from tg_content_factory import db, pipeline, render_telemetry, templates
 from tg_content_factory.openai_client import OpenAIClient
-from tg_content_factory.video_renderer import VideoRenderer
+from tg_content_factory.video_renderer import (
+    FULL_PROFILE,
+    VENUE_VARIANTS,
+    RenderJob,
+    RenderMetrics,
+    VideoRenderer,
+    VideoVariant,
+    available_cores,
+)
 
 
 def create_drafts(
@@ -15,51 +28,101 @@ def create_drafts(
     template_names: list[str],
     client: Optional[OpenAIClient] = None,
     renderer: Optional[VideoRenderer] = None,
+    concurrency: Optional[int] = None,
+    use_cache: bool = True,
+    batch_size: Optional[int] = None,
+    stream: bool = False,
+    on_preview: Optional[Callable[[int, str, Path], None]] = None,
+    render_workers: Optional[int] = None,
+    queue_size: int = 8,
+    profile: str = "proof",
+    resume: bool = False,
+    deadlines: Optional[Mapping[int, datetime]] = None,
 ) -> list[int]:
     db.init_db(db_path)
     draft_ids: list[int] = []
     openai_client = client or OpenAIClient.from_env()
-    video_renderer = renderer or VideoRenderer.default()
+    # Drafts get a cheap proof render by default; approval promotes them to full quality.
+    video_renderer = (renderer or VideoRenderer.default()).with_profile(profile)
+    draft_templates = [templates.get_template(name) for name in template_names]
+    script_workers = concurrency or int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
     with db.get_connection(db_path) as conn:
+        ideas = []
         for idea_id in idea_ids:
             idea = conn.execute(
                 "SELECT id, prompt FROM ideas WHERE id = ?", (idea_id,)
             ).fetchone()
-            if not idea:
-                continue
-            for template_name in template_names:
-                template = templates.get_template(template_name)
-                content = openai_client.generate_script(idea["prompt"], template.description)
-                video_path, preview_path = _render_video_assets(
-                    video_renderer,
-                    idea["id"],
-                    template.name,
+            if idea:
+                ideas.append(idea)
+        pairs = [(dict(idea), template) for idea in ideas for template in draft_templates]
+        if resume:
+            done = {
+                (row["idea_id"], row["template_name"])
+                for row in conn.execute("SELECT idea_id, template_name FROM drafts")
+            }
+            pairs = [
+                (idea, template)
+                for idea, template in pairs
+                if (idea["id"], template.name) not in done
+            ]
+        if deadlines:
+            # The pipeline keeps input order in every stage, so sorting its input is
+            # enough to fetch and render urgent drafts ahead of the rest.
+            pairs.sort(key=_deadline_key(deadlines))
+
+        def write_draft(draft: _RenderedDraft) -> None:
+            cursor = conn.execute(
+                """
+                INSERT INTO drafts (
+                    idea_id,
+                    template_name,
                     content,
+                    video_path,
+                    preview_path,
+                    status,
+                    created_at,
+                    render_profile
                 )
-                cursor = conn.execute(
-                    """
-                    INSERT INTO drafts (
-                        idea_id,
-                        template_name,
-                        content,
-                        video_path,
-                        preview_path,
-                        status,
-                        created_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        idea["id"],
-                        template.name,
-                        content,
-                        str(video_path),
-                        str(preview_path),
-                        "pending_review",
-                        datetime.now(timezone.utc).isoformat(),
-                    ),
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    draft.idea_id,
+                    draft.template_name,
+                    draft.content,
+                    str(draft.video_path),
+                    str(draft.preview_path),
+                    "pending_review",
+                    datetime.now(timezone.utc).isoformat(),
+                    video_renderer.profile.name,
+                ),
+            )
+            draft_ids.append(cursor.lastrowid)
+            if draft.metrics is not None:
+                render_telemetry.record_render(
+                    conn, cursor.lastrowid, video_renderer.profile.name, draft.metrics
                 )
-                draft_ids.append(cursor.lastrowid)
+            _record_variants(conn, cursor.lastrowid, draft.video_path, draft.variants)
+            # Commit per draft so a crash later in the batch keeps finished work.
+            conn.commit()
+
+        # Scripts, renders and DB writes overlap; drafts are still written in pair order.
+        pipeline.run_pipeline(
+            pairs,
+            _draft_stages(
+                openai_client,
+                video_renderer,
+                script_workers=script_workers,
+                render_workers=render_workers or available_cores(),
+                batch_size=batch_size or int(os.getenv("OPENAI_SCRIPT_BATCH_SIZE", "10")),
+                use_cache=use_cache,
+                stream=stream,
+                on_preview=on_preview,
+                reuse_renders=resume,
+            ),
+            write_draft,
+            queue_size=queue_size,
+        )
+        for idea in ideas:
             conn.execute(
                 "UPDATE ideas SET status = ? WHERE id = ?",
                 ("drafted", idea["id"]),
@@ -67,27 +130,270 @@ def create_drafts(
     return draft_ids
 
 
-def _render_video_assets(
+def promote_draft(
+    db_path: str, draft_id: int, renderer: Optional[VideoRenderer] = None
+) -> Optional[Path]:
+    """Render a draft at full quality and point it at the new files.
+
+    Returns the full-quality video path, or None if the draft does not exist.
+    Drafts that already have a full render are left alone.
+    """
+    db.init_db(db_path)
+    with db.get_connection(db_path) as conn:
+        draft = conn.execute(
+            "SELECT idea_id, template_name, content, video_path, render_profile "
+            "FROM drafts WHERE id = ?",
+            (draft_id,),
+        ).fetchone()
+    if draft is None:
+        return None
+    if draft["render_profile"] == FULL_PROFILE.name and draft["video_path"]:
+        return Path(draft["video_path"])
+    full_renderer = (renderer or VideoRenderer.default()).with_profile(FULL_PROFILE)
+    video_path, preview_path = _draft_paths(full_renderer, draft["idea_id"], draft["template_name"])
+    variants = _venue_variants(full_renderer)
+    # Render outside the connection so a long ffmpeg run holds no database lock.
+    (metrics,) = full_renderer.render_many(
+        [
+            RenderJob(
+                draft["content"], video_path, preview_path, draft["template_name"], variants
+            )
+        ],
+        workers=1,
+    )
+    with db.get_connection(db_path) as conn:
+        conn.execute(
+            """
+            UPDATE drafts
+            SET video_path = ?, preview_path = ?, render_profile = ?
+            WHERE id = ?
+            """,
+            (str(video_path), str(preview_path), FULL_PROFILE.name, draft_id),
+        )
+        render_telemetry.record_render(conn, draft_id, FULL_PROFILE.name, metrics)
+        _record_variants(conn, draft_id, video_path, variants)
+    return video_path
+
+
+@dataclass(frozen=True)
+class _RenderedDraft:
+    idea_id: int
+    template_name: str
+    content: str
+    video_path: Path
+    preview_path: Path
+    metrics: Optional[RenderMetrics] = None
+    variants: tuple[VideoVariant, ...] = ()
+
+
+def _draft_stages(
+    client: OpenAIClient,
+    renderer: VideoRenderer,
+    script_workers: int,
+    render_workers: int,
+    batch_size: int,
+    use_cache: bool,
+    stream: bool,
+    on_preview: Optional[Callable[[int, str, Path], None]],
+    reuse_renders: bool = False,
+) -> list[pipeline.Stage]:
+    variants = _venue_variants(renderer)
+    # Every stream worker runs its own ffmpeg, so split the cores between them as well.
+    stream_renderer = replace(renderer, threads=max(1, available_cores() // script_workers))
+
+    def stream_draft(pair: tuple[dict, templates.VideoTemplate]) -> _RenderedDraft:
+        idea, template = pair
+        content, video_path, preview_path, metrics = _stream_and_render(
+            client,
+            stream_renderer,
+            idea["id"],
+            idea["prompt"],
+            template,
+            use_cache,
+            on_preview,
+            variants,
+        )
+        return _RenderedDraft(
+            idea["id"], template.name, content, video_path, preview_path, metrics, variants
+        )
+
+    def fetch_scripts(pairs: list[tuple[dict, templates.VideoTemplate]]) -> list[tuple]:
+        scripts = client.generate_scripts_batch(
+            [(idea["prompt"], template.description) for idea, template in pairs], use_cache
+        )
+        return list(zip(pairs, scripts))
+
+    # Each render worker runs one ffmpeg at a time, so split the cores between them once.
+    pool_renderer = replace(renderer, threads=max(1, available_cores() // render_workers))
+
+    def render(scripted: tuple) -> _RenderedDraft:
+        (idea, template), content = scripted
+        video_path, preview_path = _draft_paths(renderer, idea["id"], template.name)
+        job = RenderJob(content, video_path, preview_path, template.name, variants)
+        metrics = _reuse_render(renderer, job) if reuse_renders else None
+        if metrics is None:
+            # Drop any stamp from an earlier render first: if this one dies half-way,
+            # resume must not mistake the partial outputs for a finished render.
+            _stamp_path(job).unlink(missing_ok=True)
+            metrics = pool_renderer.render_job(job)
+            _write_stamp(job, renderer.render_key(job))
+        return _RenderedDraft(
+            idea["id"], template.name, content, video_path, preview_path, metrics, variants
+        )
+
+    if stream:
+        # Streaming renders each preview as its hook arrives, so fetch and render share a worker.
+        return [pipeline.Stage("stream", stream_draft, workers=script_workers)]
+
+    return [
+        pipeline.Stage("script", fetch_scripts, workers=script_workers, batch_size=batch_size),
+        pipeline.Stage("render", render, workers=render_workers),
+    ]
+
+
+def _stream_and_render(
+    client: OpenAIClient,
     renderer: VideoRenderer,
     idea_id: int,
-    template_name: str,
-    content: str,
-) -> tuple[Path, Path]:
+    idea_prompt: str,
+    template: templates.VideoTemplate,
+    use_cache: bool,
+    on_preview: Optional[Callable[[int, str, Path], None]],
+    variants: tuple[VideoVariant, ...] = (),
+) -> tuple[str, Path, Path, RenderMetrics]:
+    """Stream one script, rendering a preview card from the hook while the rest arrives.
+
+    The full render then goes through ``render_job`` like any other draft, so it
+    uses the render cache and replaces the hook card with the rendered preview.
+    """
+    video_path, preview_path = _draft_paths(renderer, idea_id, template.name)
+
+    def render_preview(hook: str) -> None:
+        renderer.render_still(hook, preview_path)
+        if on_preview is not None:
+            on_preview(idea_id, template.name, preview_path)
+
+    chunks: list[str] = []
+    preview: Optional[Future] = None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for delta in client.stream_script(idea_prompt, template.description, use_cache):
+            chunks.append(delta)
+            if preview is None:
+                hook = _completed_hook("".join(chunks))
+                if hook is not None:
+                    preview = executor.submit(render_preview, hook)
+        content = "".join(chunks).strip()
+        if preview is None:
+            preview = executor.submit(render_preview, content.split("\n", 1)[0])
+        # The card is usually done by now; wait so it never lands over the final preview.
+        preview.result()
+    job = RenderJob(content, video_path, preview_path, template.name, variants)
+    return content, video_path, preview_path, renderer.render_job(job)
+
+
+def _deadline_key(
+    deadlines: Optional[Mapping[int, datetime]],
+) -> Callable[[tuple], datetime]:
+    # Drafts without a target publish time render after every scheduled one.
+    latest = datetime.max.replace(tzinfo=timezone.utc)
+
+    def deadline_for(pair: tuple) -> datetime:
+        deadline = (deadlines or {}).get(pair[0]["id"])
+        if deadline is None:
+            return latest
+        if deadline.tzinfo is None:
+            return deadline.replace(tzinfo=timezone.utc)
+        return deadline
+
+    return deadline_for
+
+
+def _venue_variants(renderer: VideoRenderer) -> tuple[VideoVariant, ...]:
+    # Only final renders are worth encoding per venue; proofs are for review. The main
+    # video is a CRF encode with no bitrate cap, so a venue only posts it as is when it
+    # asks for the same frame and no bitrate of its own.
+    profile = renderer.profile
+    if profile.name != FULL_PROFILE.name:
+        return ()
+    return tuple(
+        variant
+        for variant in VENUE_VARIANTS.values()
+        if (variant.width, variant.height, variant.fps, variant.video_bitrate)
+        != (profile.width, profile.height, profile.fps, None)
+    )
+
+
+def _record_variants(
+    conn: sqlite3.Connection,
+    draft_id: int,
+    video_path: Path,
+    variants: tuple[VideoVariant, ...],
+) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO draft_variants (
+            draft_id, venue, video_path, thumbnail_path, width, height
+        )
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                draft_id,
+                variant.name,
+                *(str(path) for path in variant.paths_for(video_path)),
+                variant.width,
+                variant.height,
+            )
+            for variant in variants
+        ],
+    )
+
+
+def _stamp_path(job: RenderJob) -> Path:
+    return job.video_path.with_suffix(".key")
+
+
+def _write_stamp(job: RenderJob, key: str) -> None:
+    stamp = _stamp_path(job)
+    staging = stamp.with_name(f".{stamp.name}.{os.getpid()}.{threading.get_ident()}")
+    staging.write_text(key)
+    os.replace(staging, stamp)
+
+
+def _reuse_render(renderer: VideoRenderer, job: RenderJob) -> Optional[RenderMetrics]:
+    """Metrics for outputs a previous run already rendered for this exact job, else None."""
+    stamp = _stamp_path(job)
+    outputs = job.outputs()
+    if not (stamp.exists() and all(path.exists() for path in outputs)):
+        return None
+    if stamp.read_text() != renderer.render_key(job):
+        return None
+    output_bytes = sum(path.stat().st_size for path in outputs)
+    return RenderMetrics(wall_seconds=0.0, output_bytes=output_bytes, cached=True)
+
+
+def _completed_hook(text: str) -> Optional[str]:
+    # The hook is the first non-empty line, complete once a newline follows it.
+    stripped = text.lstrip()
+    if "\n" not in stripped:
+        return None
+    return stripped.split("\n", 1)[0].strip()
+
+
+def _draft_paths(renderer: VideoRenderer, idea_id: int, template_name: str) -> tuple[Path, Path]:
     slug = template_name.lower().replace(" ", "-")
     output_dir = renderer.output_dir / f"idea_{idea_id}"
     output_dir.mkdir(parents=True, exist_ok=True)
-    video_path = output_dir / f"{slug}.mp4"
-    preview_path = output_dir / f"{slug}.png"
-    renderer.render_video(content, video_path)
-    renderer.render_preview(video_path, preview_path)
-    return video_path, preview_path
+    if renderer.profile.name != FULL_PROFILE.name:
+        slug = f"{slug}.{renderer.profile.name}"
+    return output_dir / f"{slug}.mp4", output_dir / f"{slug}.png"
 
 
 def list_drafts(db_path: str, status: str | None = None) -> list[dict[str, str]]:
     db.init_db(db_path)
     query = (
-        "SELECT id, idea_id, template_name, status, created_at, video_path, preview_path "
-        "FROM drafts"
+        "SELECT id, idea_id, template_name, status, created_at, video_path, preview_path, "
+        "render_profile FROM drafts"
     )
     params: list[str] = []
     if status:
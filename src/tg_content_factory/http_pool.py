@@ -0,0 +1,199 @@
+"""Keep-alive HTTP connection pool shared by API clients in one process."""
+
+from __future__ import annotations
+
+import http.client
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Errors that mean an idle keep-alive connection was closed by the server.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+@dataclass(frozen=True)
+class HTTPResult:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class HTTPStream:
+    """An open response whose body is read incrementally.
+
+    The connection and its pool slot stay checked out until ``close``; a fully
+    read keep-alive response hands the connection back for reuse.
+    """
+
+    def __init__(
+        self,
+        pool: "HTTPConnectionPool",
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ) -> None:
+        self.status = response.status
+        self.headers = {key.lower(): value for key, value in response.getheaders()}
+        self._pool = pool
+        self._conn = conn
+        self._response = response
+        self._closed = False
+
+    @property
+    def body(self) -> bytes:
+        try:
+            return self._response.read()
+        finally:
+            self.close()
+
+    def iter_lines(self) -> Iterator[str]:
+        while True:
+            line = self._response.readline()
+            if not line:
+                return
+            yield line.decode("utf-8").rstrip("\r\n")
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        keep_alive = self._response.isclosed() and not self._response.will_close
+        self._pool._release(self._conn, keep_alive)
+
+    def __enter__(self) -> "HTTPStream":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class HTTPConnectionPool:
+    """Bounded pool of persistent connections to one scheme/host/port.
+
+    At most ``max_size`` connections exist at a time; callers block until one is
+    free. Idle connections are reused LIFO so the warmest socket goes first.
+    """
+
+    def __init__(self, base_url: str, max_size: int = 4, timeout: float = 30.0) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {parts.scheme!r}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname or ""
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.connections_opened = 0
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> HTTPResult:
+        stream = self.stream(method, path, body, headers)
+        return HTTPResult(status=stream.status, headers=stream.headers, body=stream.body)
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> HTTPStream:
+        """Send a request and return once the response headers have arrived."""
+        self._slots.acquire()
+        try:
+            conn, reused = self._checkout()
+            try:
+                response = self._send(conn, method, path, body, headers)
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                conn = self._new_connection()
+                try:
+                    response = self._send(conn, method, path, body, headers)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            self._slots.release()
+            raise
+        return HTTPStream(self, conn, response)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _send(
+        self,
+        conn: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Optional[Mapping[str, str]],
+    ) -> http.client.HTTPResponse:
+        conn.request(method, f"{self.base_path}{path}", body=body, headers=dict(headers or {}))
+        return conn.getresponse()
+
+    def _release(self, conn: http.client.HTTPConnection, keep_alive: bool) -> None:
+        try:
+            if keep_alive:
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+
+
+_SHARED_POOLS: Dict[Tuple[str, int, float], HTTPConnectionPool] = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def shared_pool(base_url: str, max_size: int = 4, timeout: float = 30.0) -> HTTPConnectionPool:
+    """Return the process-wide pool for ``base_url`` with the given settings."""
+    key = (base_url, max_size, timeout)
+    with _SHARED_POOLS_LOCK:
+        pool = _SHARED_POOLS.get(key)
+        if pool is None:
+            pool = HTTPConnectionPool(base_url, max_size=max_size, timeout=timeout)
+            _SHARED_POOLS[key] = pool
+        return pool
+
+
+def close_shared_pools() -> None:
+    with _SHARED_POOLS_LOCK:
+        pools = list(_SHARED_POOLS.values())
+        _SHARED_POOLS.clear()
+    for pool in pools:
+        pool.close()
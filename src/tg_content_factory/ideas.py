@@ -8,14 +8,21 @@ from tg_content_factory.openai_client import OpenAIClient
 
 
 def generate_ideas(
-    db_path: str, count: int, client: Optional[OpenAIClient] = None
+    db_path: str,
+    count: int,
+    client: Optional[OpenAIClient] = None,
+    allow_duplicates: bool = False,
+    use_cache: bool = False,
 ) -> list[int]:
     db.init_db(db_path)
     created_ids: list[int] = []
     openai_client = client or OpenAIClient.from_env()
-    prompts = openai_client.generate_ideas(count)
+    prompts = openai_client.generate_ideas(count, use_cache=use_cache)
     with db.get_connection(db_path) as conn:
         for prompt in prompts:
+            signature = db.IDEA_DUPLICATES.signature(prompt)
+            if not allow_duplicates and db.IDEA_DUPLICATES.find_duplicate(conn, signature):
+                continue
             cursor = conn.execute(
                 """
                 INSERT INTO ideas (created_at, prompt, status, generated_by, model)
@@ -29,6 +36,7 @@ def generate_ideas(
                     openai_client.model,
                 ),
             )
+            db.IDEA_DUPLICATES.add(conn, cursor.lastrowid, signature)
             created_ids.append(cursor.lastrowid)
     return created_ids
 
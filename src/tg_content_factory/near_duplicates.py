@@ -0,0 +1,191 @@
+"""MinHash/LSH index for suppressing near-duplicate ideas before they are stored."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import sqlite3
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+DEFAULT_NUM_PERMUTATIONS = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    idea_id: int
+    similarity: float
+
+
+def shingles(text: str) -> set[str]:
+    """Word unigrams plus bigrams, so short prompts still produce useful sets."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    return set(tokens) | {f"{left} {right}" for left, right in zip(tokens, tokens[1:])}
+
+
+class MinHasher:
+    def __init__(self, num_permutations: int = DEFAULT_NUM_PERMUTATIONS, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_permutations = num_permutations
+        self._coefficients = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        """MinHash signature of ``text``; empty when the text has no shingles."""
+        hashes = [_stable_hash(shingle) for shingle in shingles(text)]
+        if not hashes:
+            return ()
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self._coefficients
+        )
+
+
+def estimate_similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    matches = sum(1 for a, b in zip(left, right) if a == b)
+    return matches / len(left)
+
+
+class NearDuplicateIndex:
+    """Banded LSH buckets stored in SQLite next to an ``ideas`` table.
+
+    Lookups touch only the buckets a candidate hashes into (one primary-key probe
+    per band) and then verify the few colliding signatures, so the cost does not
+    grow with the number of stored ideas. Texts without shingles (empty or
+    punctuation only) have an empty signature and are neither indexed nor matched,
+    since they carry nothing to compare. An optional ``scope`` (e.g. the idea's
+    theme) partitions the index: entries only ever match others in the same scope.
+    """
+
+    def __init__(
+        self,
+        table_prefix: str = "idea",
+        threshold: float = DEFAULT_THRESHOLD,
+        num_permutations: int = DEFAULT_NUM_PERMUTATIONS,
+        bands: int = DEFAULT_BANDS,
+    ) -> None:
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be divisible by bands.")
+        self.threshold = threshold
+        self.bands = bands
+        self._rows_per_band = num_permutations // bands
+        self._hasher = MinHasher(num_permutations)
+        self._signature_table = f"{table_prefix}_minhash"
+        self._bucket_table = f"{table_prefix}_lsh_buckets"
+        self._signature_format = f"<{num_permutations}Q"
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        return self._hasher.signature(text)
+
+    def ensure_schema(self, conn: sqlite3.Connection) -> bool:
+        """Create the index tables; returns True when they need a (re)build.
+
+        Indexes written before scopes existed are dropped, since their buckets
+        were hashed without one.
+        """
+        columns = {
+            row[1] for row in conn.execute(f"PRAGMA table_info({self._signature_table})")
+        }
+        exists = "scope" in columns
+        if columns and not exists:
+            conn.execute(f"DROP TABLE {self._signature_table}")
+            conn.execute(f"DROP TABLE IF EXISTS {self._bucket_table}")
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self._signature_table} (
+                idea_id INTEGER PRIMARY KEY REFERENCES ideas (id),
+                signature BLOB NOT NULL,
+                scope TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self._bucket_table} (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                idea_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, idea_id)
+            ) WITHOUT ROWID
+            """
+        )
+        return not exists
+
+    def find_duplicate(
+        self, conn: sqlite3.Connection, signature: Sequence[int], scope: str = ""
+    ) -> Optional[DuplicateMatch]:
+        if not signature:
+            return None
+        buckets = self._band_buckets(signature, scope)
+        candidate_ids = {
+            row[0]
+            for band, bucket in buckets
+            for row in conn.execute(
+                f"SELECT idea_id FROM {self._bucket_table} WHERE band = ? AND bucket = ?",
+                (band, bucket),
+            )
+        }
+        best: Optional[DuplicateMatch] = None
+        for idea_id in sorted(candidate_ids):
+            row = conn.execute(
+                f"SELECT signature FROM {self._signature_table} WHERE idea_id = ? AND scope = ?",
+                (idea_id, scope),
+            ).fetchone()
+            if row is None:
+                continue
+            similarity = estimate_similarity(signature, self._unpack(row[0]))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = DuplicateMatch(idea_id=idea_id, similarity=similarity)
+        return best
+
+    def add(
+        self, conn: sqlite3.Connection, idea_id: int, signature: Sequence[int], scope: str = ""
+    ) -> None:
+        if not signature:
+            return
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {self._signature_table} (idea_id, signature, scope)
+            VALUES (?, ?, ?)
+            """,
+            (idea_id, struct.pack(self._signature_format, *signature), scope),
+        )
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {self._bucket_table} (band, bucket, idea_id) VALUES (?, ?, ?)",
+            [(band, bucket, idea_id) for band, bucket in self._band_buckets(signature, scope)],
+        )
+
+    def backfill(self, conn: sqlite3.Connection, rows: Iterable[Sequence]) -> None:
+        """Index ``(idea_id, text)`` or ``(idea_id, text, scope)`` rows."""
+        for idea_id, text, *scope in rows:
+            self.add(conn, idea_id, self.signature(text), *scope)
+
+    def _band_buckets(self, signature: Sequence[int], scope: str) -> list[tuple[int, int]]:
+        buckets = []
+        for band in range(self.bands):
+            start = band * self._rows_per_band
+            chunk = struct.pack(
+                f"<{self._rows_per_band}Q", *signature[start : start + self._rows_per_band]
+            )
+            digest = hashlib.blake2b(
+                scope.encode("utf-8") + b"\0" + chunk, digest_size=8
+            ).digest()
+            buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+        return buckets
+
+    def _unpack(self, blob: bytes) -> tuple[int, ...]:
+        return struct.unpack(self._signature_format, blob)
+
+
+def _stable_hash(value: str) -> int:
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
@@ -1,17 +1,43 @@
 from __future__ import annotations
 
+import http.client
 import json
 import os
-import urllib.request
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .http_pool import HTTPResult, HTTPStream, shared_pool
+from .rate_limiter import RETRYABLE_STATUSES, RateLimiter, RetryPolicy, retry_after_seconds
+from .response_cache import ResponseCache
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Rough budget for limiter accounting until the response reports real usage.
+_CHARS_PER_TOKEN = 4
+_OUTPUT_TOKEN_ESTIMATE = 512
+
+_RETRYABLE_ERRORS = (TimeoutError, ConnectionError, http.client.HTTPException)
+
+
+class OpenAIHTTPError(RuntimeError):
+    def __init__(self, status: int, body: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(f"OpenAI API returned HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
 
 
 @dataclass(frozen=True)
 class OpenAIClient:
     api_key: str
     model: str = "gpt-5.2"
-    base_url: str = "https://api.openai.com/v1"
+    base_url: str = DEFAULT_BASE_URL
+    pool_size: int = 4
+    timeout: float = 30.0
+    cache: Optional[ResponseCache] = None
+    rate_limiter: Optional[RateLimiter] = None
+    retry_policy: RetryPolicy = RetryPolicy()
 
     @classmethod
     def from_env(cls) -> "OpenAIClient":
@@ -19,51 +45,277 @@ class OpenAIClient:
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is required.")
         model = os.getenv("OPENAI_MODEL", "gpt-5.2")
-        return cls(api_key=api_key, model=model)
+        return cls(
+            api_key=api_key,
+            model=model,
+            base_url=os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL),
+            pool_size=int(os.getenv("OPENAI_POOL_SIZE", "4")),
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "30")),
+            cache=ResponseCache.from_env(),
+            rate_limiter=RateLimiter.from_env(),
+            retry_policy=RetryPolicy(max_attempts=int(os.getenv("OPENAI_MAX_ATTEMPTS", "5"))),
+        )
 
-    def generate_ideas(self, count: int) -> List[str]:
+    def generate_ideas(self, count: int, use_cache: bool = False) -> List[str]:
+        # Uncached by default: a cached reply repeats the same ideas, which the
+        # near-duplicate filter then drops, so reruns would produce nothing new.
         if os.getenv("TG_OPENAI_MOCK"):
+            _mock_latency()
             return [f"Mock idea {idx + 1}" for idx in range(count)]
         prompt = (
             "Generate course marketing video ideas. "
             f"Return exactly {count} short idea prompts as a JSON array of strings."
         )
-        data = self._responses_call(prompt)
+        data = self._responses_call(prompt, use_cache=use_cache)
         return _ensure_list(data, count, label="idea prompts")
 
-    def generate_script(self, idea_prompt: str, template: str) -> str:
+    def generate_script(self, idea_prompt: str, template: str, use_cache: bool = True) -> str:
         if os.getenv("TG_OPENAI_MOCK"):
-            return f"Hook: {idea_prompt}\nBeats: 1, 2, 3\nCTA: Learn more."
-        prompt = (
-            "Write a short vertical-video script for this idea. "
-            "Include a hook, 3 beats, and a CTA. "
-            f"Idea: {idea_prompt}\nTemplate: {template}\n"
-            "Return plain text."
-        )
-        data = self._responses_call(prompt)
+            _mock_latency()
+            return _mock_script(idea_prompt)
+        data = self._responses_call(_script_prompt(idea_prompt, template), use_cache=use_cache)
         if not isinstance(data, str):
             raise ValueError("Expected script text response.")
         return data.strip()
 
-    def _responses_call(self, prompt: str) -> Any:
-        payload = {
-            "model": self.model,
-            "input": prompt,
-        }
-        body = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            f"{self.base_url}/responses",
-            data=body,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
+    def stream_script(
+        self, idea_prompt: str, template: str, use_cache: bool = True
+    ) -> Iterator[str]:
+        """Yield script text deltas as the model produces them (server-sent events).
+
+        A cached script is yielded as a single chunk; a streamed one is cached
+        once the stream completes.
+        """
+        if os.getenv("TG_OPENAI_MOCK"):
+            _mock_latency()
+            yield from _mock_script(idea_prompt).splitlines(keepends=True)
+            return
+        prompt = _script_prompt(idea_prompt, template)
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.key_for(self.model, prompt)
+            hit, cached = self.cache.get(cache_key)
+            if hit and isinstance(cached, str):
+                yield cached
+                return
+        chunks: List[str] = []
+        for delta in self._stream_output(prompt):
+            chunks.append(delta)
+            yield delta
+        if cache_key is not None:
+            self.cache.put(cache_key, "".join(chunks).strip())
+
+    def generate_scripts_batch(
+        self, requests: Sequence[Tuple[str, str]], use_cache: bool = True
+    ) -> List[str]:
+        """Fetch scripts for ``(idea_prompt, template)`` pairs in one model call.
+
+        Each script is cached under the same key ``generate_script`` uses, so a
+        regrouped batch (a resumed run, another batch size, a subset of ideas)
+        still hits; only the pairs that miss are sent. Entries missing from the
+        JSON reply, or that are not non-empty strings, are retried one by one
+        with ``generate_script``.
+        """
+        if len(requests) <= 1:
+            return [self.generate_script(idea, template, use_cache) for idea, template in requests]
+        if os.getenv("TG_OPENAI_MOCK"):
+            _mock_latency()
+            return [_mock_script(idea_prompt) for idea_prompt, _ in requests]
+        scripts: List[Optional[str]] = [None] * len(requests)
+        keys: List[Optional[str]] = [None] * len(requests)
+        if self.cache is not None and use_cache:
+            for index, (idea_prompt, template) in enumerate(requests):
+                keys[index] = ResponseCache.key_for(
+                    self.model, _script_prompt(idea_prompt, template)
+                )
+                hit, cached = self.cache.get(keys[index])
+                if hit and isinstance(cached, str):
+                    scripts[index] = cached.strip()
+        missing = [index for index, script in enumerate(scripts) if script is None]
+        fetched: List[Optional[str]] = [None] * len(missing)
+        if len(missing) > 1:
+            batch = [requests[index] for index in missing]
+            fetched = _parse_batch_scripts(self._request_output(_batch_prompt(batch)), len(batch))
+        for index, script in zip(missing, fetched):
+            if script is None:
+                script = self._fetch_script(*requests[index])
+            if keys[index] is not None:
+                self.cache.put(keys[index], script)
+            scripts[index] = script
+        return [script for script in scripts if script is not None]
+
+    def _fetch_script(self, idea_prompt: str, template: str) -> str:
+        data = self._request_output(_script_prompt(idea_prompt, template))
+        if not isinstance(data, str):
+            raise ValueError("Expected script text response.")
+        return data.strip()
+
+    def _responses_call(self, prompt: str, use_cache: bool = True) -> Any:
+
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.key_for(self.model, prompt)
+            hit, cached = self.cache.get(cache_key)
+            if hit:
+                return cached
+        result = self._request_output(prompt)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _request_output(self, prompt: str) -> Any:
+        estimated_tokens = _estimate_tokens(prompt)
+        response = self._send_with_retries(
+            {"model": self.model, "input": prompt}, estimated_tokens
         )
-        with urllib.request.urlopen(request, timeout=30) as response:
-            raw = json.loads(response.read().decode("utf-8"))
+        raw = json.loads(response.body.decode("utf-8"))
+        self._settle_usage(estimated_tokens, raw.get("usage"))
         return _extract_output_text(raw)
 
+    def _stream_output(self, prompt: str) -> Iterator[str]:
+        estimated_tokens = _estimate_tokens(prompt)
+        stream = self._send_with_retries(
+            {"model": self.model, "input": prompt, "stream": True},
+            estimated_tokens,
+            stream=True,
+        )
+        with stream:
+            for event in _iter_sse_events(stream.iter_lines()):
+                event_type = event.get("type")
+                if event_type == "response.output_text.delta":
+                    yield event.get("delta", "")
+                elif event_type == "response.completed":
+                    self._settle_usage(
+                        estimated_tokens, (event.get("response") or {}).get("usage")
+                    )
+                elif event_type in ("error", "response.failed"):
+                    raise OpenAIHTTPError(stream.status, json.dumps(event), stream.headers)
+
+    def _send_with_retries(
+        self, payload: Dict[str, Any], estimated_tokens: int, stream: bool = False
+    ) -> Any:
+        body = json.dumps(payload).encode("utf-8")
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(tokens=estimated_tokens)
+            try:
+                response = self._post_responses(body, stream=stream)
+            except _RETRYABLE_ERRORS:
+                if attempt + 1 >= self.retry_policy.max_attempts:
+                    raise
+                time.sleep(self.retry_policy.delay_for(attempt))
+                attempt += 1
+                continue
+            if response.status < 400:
+                return response
+            error_body = response.body.decode("utf-8", "replace")
+            if (
+                response.status not in RETRYABLE_STATUSES
+                or attempt + 1 >= self.retry_policy.max_attempts
+            ):
+                raise OpenAIHTTPError(response.status, error_body, response.headers)
+            retry_after = retry_after_seconds(response.headers)
+            if retry_after is not None and self.rate_limiter is not None:
+                # Hold back every worker sharing the limiter, not just this one.
+                self.rate_limiter.block_for(retry_after)
+            time.sleep(self.retry_policy.delay_for(attempt, retry_after))
+            attempt += 1
+
+    def _settle_usage(self, estimated_tokens: int, usage: Optional[Dict[str, Any]]) -> None:
+        if self.rate_limiter is None or not usage:
+            return
+        if isinstance(usage.get("total_tokens"), int):
+            self.rate_limiter.settle(estimated_tokens, usage["total_tokens"])
+
+    def _post_responses(self, body: bytes, stream: bool = False) -> Union[HTTPResult, HTTPStream]:
+        # All clients in the process share keep-alive connections per base URL.
+        pool = shared_pool(self.base_url, max_size=self.pool_size, timeout=self.timeout)
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        if stream:
+            headers["Accept"] = "text/event-stream"
+            return pool.stream("POST", "/responses", body=body, headers=headers)
+        return pool.request("POST", "/responses", body=body, headers=headers)
+
+
+def _mock_latency() -> None:
+    # Lets offline benchmarks model API round-trips without a network.
+    delay = float(os.getenv("TG_OPENAI_MOCK_LATENCY", "0") or 0)
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _script_prompt(idea_prompt: str, template: str) -> str:
+    return (
+        "Write a short vertical-video script for this idea. "
+        "Include a hook, 3 beats, and a CTA. "
+        f"Idea: {idea_prompt}\nTemplate: {template}\n"
+        "Return plain text."
+    )
+
+
+def _batch_prompt(requests: Sequence[Tuple[str, str]]) -> str:
+    items = [
+        {"id": index, "idea": idea_prompt, "template": template}
+        for index, (idea_prompt, template) in enumerate(requests)
+    ]
+    return (
+        "Write a short vertical-video script for each item below. "
+        "Each script needs a hook, 3 beats, and a CTA. "
+        'Return a JSON array of objects with keys "id" and "script" (plain text), '
+        "one per item.\n"
+        f"Items: {json.dumps(items, ensure_ascii=False)}"
+    )
+
+
+def _estimate_tokens(prompt: str) -> int:
+    return len(prompt) // _CHARS_PER_TOKEN + _OUTPUT_TOKEN_ESTIMATE
+
+
+def _iter_sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    data: List[str] = []
+    for line in lines:
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+            continue
+        if line or not data:
+            continue
+        payload, data = "\n".join(data), []
+        if payload == "[DONE]":
+            return
+        yield json.loads(payload)
+    if data and data != ["[DONE]"]:
+        yield json.loads("\n".join(data))
+
+
+def _mock_script(idea_prompt: str) -> str:
+    return f"Hook: {idea_prompt}\nBeats: 1, 2, 3\nCTA: Learn more."
+
+
+def _parse_batch_scripts(value: Any, count: int) -> List[Optional[str]]:
+    scripts: List[Optional[str]] = [None] * count
+    if not isinstance(value, list):
+        return scripts
+    for position, entry in enumerate(value):
+        if isinstance(entry, dict):
+            index, script = entry.get("id"), entry.get("script")
+        elif len(value) == count:
+            index, script = position, entry
+        else:
+            continue
+        if (
+            isinstance(index, int)
+            and 0 <= index < count
+            and scripts[index] is None
+            and isinstance(script, str)
+            and script.strip()
+        ):
+            scripts[index] = script.strip()
+    return scripts
+
 
 def _extract_output_text(response: Dict[str, Any]) -> Any:
     outputs = response.get("output", [])
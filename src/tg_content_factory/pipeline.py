@@ -0,0 +1,193 @@
+"""Bounded, multi-stage worker pipelines that deliver results in input order."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_POLL_SECONDS = 0.05
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step run by ``workers`` threads.
+
+    With a ``batch_size`` a worker takes up to that many queued items at once and
+    ``func`` receives and returns a list of the same length; without one, ``func``
+    is called per item.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    batch_size: Optional[int] = None
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _capacity(stage: Stage, queue_size: int) -> int:
+    # Room for a full batch per worker, so batched stages are never starved by the queue.
+    return max(1, queue_size, (stage.batch_size or 1) * max(1, stage.workers))
+
+
+class _Run:
+    def __init__(
+        self, stages: Sequence[Stage], queue_size: int, max_pending: Optional[int]
+    ) -> None:
+        self.stages = stages
+        self.queues: List[queue.Queue] = [
+            queue.Queue(maxsize=_capacity(stage, queue_size)) for stage in stages
+        ]
+        self.queues.append(queue.Queue(maxsize=max(1, queue_size)))
+        if max_pending is None:
+            max_pending = sum(
+                _capacity(stage, queue_size) + max(1, stage.workers) * (stage.batch_size or 1)
+                for stage in stages
+            ) + max(1, queue_size)
+        # Items fed but not yet sunk; caps how far later results can pile up behind a slow one.
+        self.in_flight = threading.BoundedSemaphore(max(1, max_pending))
+        self.failed = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._running = [max(1, stage.workers) for stage in stages]
+
+    def fail(self, exc: BaseException) -> None:
+        with self._lock:
+            if self.error is None:
+                self.error = exc
+        self.failed.set()
+
+    def put(self, index: int, item: Any) -> None:
+        while True:
+            try:
+                self.queues[index].put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                if self.failed.is_set():
+                    raise _Aborted
+
+    def get(self, index: int, block: bool = True) -> Any:
+        if not block:
+            return self.queues[index].get_nowait()
+        while True:
+            try:
+                return self.queues[index].get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self.failed.is_set():
+                    raise _Aborted
+
+    def feed(self, items: Iterable[Any]) -> None:
+        try:
+            for position, item in enumerate(items):
+                while not self.in_flight.acquire(timeout=_POLL_SECONDS):
+                    if self.failed.is_set():
+                        return
+                self.put(0, (position, item))
+            for _ in range(self._running[0]):
+                self.put(0, _STOP)
+        except _Aborted:
+            return
+        except BaseException as exc:
+            self.fail(exc)
+
+    def work(self, stage_index: int) -> None:
+        stage = self.stages[stage_index]
+        try:
+            stopped = False
+            while not stopped:
+                batch: List[Tuple[int, Any]] = []
+                while len(batch) < max(1, stage.batch_size or 1):
+                    try:
+                        entry = self.get(stage_index, block=not batch)
+                    except queue.Empty:
+                        break
+                    if entry is _STOP:
+                        stopped = True
+                        break
+                    batch.append(entry)
+                if not batch:
+                    continue
+                values = [value for _, value in batch]
+                if stage.batch_size is not None:
+                    results = list(stage.func(values))
+                    if len(results) != len(values):
+                        raise ValueError(
+                            f"Stage {stage.name!r} returned {len(results)} results "
+                            f"for {len(values)} items"
+                        )
+                else:
+                    results = [stage.func(values[0])]
+                for (position, _), result in zip(batch, results):
+                    self.put(stage_index + 1, (position, result))
+            self._finish(stage_index)
+        except _Aborted:
+            return
+        except BaseException as exc:
+            self.fail(exc)
+
+    def _finish(self, stage_index: int) -> None:
+        with self._lock:
+            self._running[stage_index] -= 1
+            last = self._running[stage_index] == 0
+        if not last:
+            return
+        if stage_index + 1 < len(self.stages):
+            for _ in range(self._running[stage_index + 1]):
+                self.put(stage_index + 1, _STOP)
+        else:
+            self.put(stage_index + 1, _STOP)
+
+
+def run_pipeline(
+    items: Iterable[Any],
+    stages: Sequence[Stage],
+    sink: Callable[[Any], None],
+    queue_size: int = 8,
+    max_pending: Optional[int] = None,
+) -> None:
+    """Push ``items`` through ``stages`` concurrently; ``sink`` sees results in input order.
+
+    Every stage has its own worker threads and a bounded input queue (at least
+    ``queue_size``, and never less than one batch per worker), so a slow stage
+    applies backpressure upstream. At most ``max_pending`` items are between
+    the feeder and the sink at once (by default, what the queues and workers can
+    hold), which bounds the results buffered while an earlier item is still
+    running. ``sink`` runs on the calling thread. The first exception from any
+    stage or the sink stops the run and is re-raised.
+    """
+    run = _Run(stages, queue_size, max_pending)
+    threads = [threading.Thread(target=run.feed, args=(items,), daemon=True)]
+    for stage_index, stage in enumerate(stages):
+        threads.extend(
+            threading.Thread(target=run.work, args=(stage_index,), daemon=True)
+            for _ in range(max(1, stage.workers))
+        )
+    for thread in threads:
+        thread.start()
+    pending: Dict[int, Any] = {}
+    next_position = 0
+    try:
+        while True:
+            entry = run.get(len(stages))
+            if entry is _STOP:
+                break
+            position, result = entry
+            pending[position] = result
+            while next_position in pending:
+                sink(pending.pop(next_position))
+                next_position += 1
+                run.in_flight.release()
+    except _Aborted:
+        pass
+    except BaseException as exc:
+        run.fail(exc)
+    finally:
+        for thread in threads:
+            thread.join()
+    if run.error is not None:
+        raise run.error
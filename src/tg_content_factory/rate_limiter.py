@@ -0,0 +1,201 @@
+"""Token-bucket rate limiting and retry backoff for API clients."""
+
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+RETRYABLE_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def delay_for(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Server hint if given, else full-jitter exponential backoff for ``attempt``."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, ceiling)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets shared by every caller.
+
+    Without ``state_path`` the buckets live in this process and are guarded by
+    a lock. With ``state_path`` they live in a small SQLite file, so separate
+    worker processes draw from the same budget.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.limits: Dict[str, float] = {}
+        if requests_per_minute:
+            self.limits["requests"] = float(requests_per_minute)
+        if tokens_per_minute:
+            self.limits["tokens"] = float(tokens_per_minute)
+        self.state_path = state_path
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[float, float, float]] = {}
+        if state_path:
+            Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                        name TEXT PRIMARY KEY,
+                        available REAL NOT NULL,
+                        updated_at REAL NOT NULL,
+                        blocked_until REAL NOT NULL DEFAULT 0
+                    )
+                    """
+                )
+
+    @classmethod
+    def from_env(cls) -> Optional["RateLimiter"]:
+        requests_per_minute = float(os.getenv("OPENAI_RPM", "0") or 0)
+        tokens_per_minute = float(os.getenv("OPENAI_TPM", "0") or 0)
+        if not (requests_per_minute or tokens_per_minute):
+            return None
+        return cls(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            state_path=os.getenv("OPENAI_RATE_LIMIT_STATE") or None,
+        )
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request and ``tokens`` fit the budget; returns seconds waited."""
+        costs = {"requests": 1.0, "tokens": float(tokens)}
+        waited = 0.0
+        while True:
+            wait = self._update(lambda state, now: _take(state, self.limits, costs, now))
+            if wait <= 0:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def block_for(self, seconds: float) -> None:
+        """Pause every caller for ``seconds``, e.g. after a ``Retry-After`` reply."""
+
+        def apply(state: Dict[str, Tuple[float, float, float]], now: float) -> float:
+            for name, limit in self.limits.items():
+                available, updated_at, blocked_until = _refilled(state, name, limit, now)
+                state[name] = (available, updated_at, max(blocked_until, now + seconds))
+            return 0.0
+
+        self._update(apply)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once a response reports real usage."""
+        limit = self.limits.get("tokens")
+        if limit is None:
+            return
+
+        def apply(state: Dict[str, Tuple[float, float, float]], now: float) -> float:
+            available, updated_at, blocked_until = _refilled(state, "tokens", limit, now)
+            available = min(limit, available + estimated_tokens - actual_tokens)
+            state["tokens"] = (available, updated_at, blocked_until)
+            return 0.0
+
+        self._update(apply)
+
+    def _update(
+        self, apply: Callable[[Dict[str, Tuple[float, float, float]], float], float]
+    ) -> float:
+        if not self.limits:
+            return 0.0
+        with self._lock:
+            if not self.state_path:
+                return apply(self._memory, self._clock())
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                state = {
+                    row[0]: (row[1], row[2], row[3])
+                    for row in conn.execute(
+                        "SELECT name, available, updated_at, blocked_until FROM rate_limit_buckets"
+                    )
+                }
+                result = apply(state, self._clock())
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO rate_limit_buckets (
+                        name, available, updated_at, blocked_until
+                    )
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [(name, *values) for name, values in state.items()],
+                )
+            return result
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.state_path, timeout=30, isolation_level=None)
+
+
+def retry_after_seconds(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """Parse ``retry-after-ms`` or ``retry-after`` (seconds or HTTP date)."""
+    millis = headers.get("retry-after-ms")
+    if millis:
+        try:
+            return float(millis) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+def _refilled(
+    state: Dict[str, Tuple[float, float, float]], name: str, limit: float, now: float
+) -> Tuple[float, float, float]:
+    available, updated_at, blocked_until = state.get(name, (limit, now, 0.0))
+    elapsed = max(0.0, now - updated_at)
+    return min(limit, available + elapsed * limit / 60), now, blocked_until
+
+
+def _take(
+    state: Dict[str, Tuple[float, float, float]],
+    limits: Mapping[str, float],
+    costs: Mapping[str, float],
+    now: float,
+) -> float:
+    refilled = {name: _refilled(state, name, limit, now) for name, limit in limits.items()}
+    wait = 0.0
+    for name, limit in limits.items():
+        available, _, blocked_until = refilled[name]
+        # A single oversized request may take a whole bucket, never more.
+        cost = min(costs.get(name, 0.0), limit)
+        wait = max(wait, blocked_until - now, (cost - available) * 60 / limit)
+    state.update(refilled)
+    if wait > 0:
+        return wait
+    for name, limit in limits.items():
+        available, updated_at, blocked_until = refilled[name]
+        state[name] = (available - min(costs.get(name, 0.0), limit), updated_at, blocked_until)
+    return 0.0
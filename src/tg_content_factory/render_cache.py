@@ -0,0 +1,179 @@
+"""Content-addressed store of rendered videos and previews."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+@dataclass(frozen=True)
+class RenderCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+
+class RenderCache:
+    """Keeps the output files of each render key under ``directory``.
+
+    An entry is every file one render produced (video, preview and any venue
+    variants), stored and restored together so a hit never yields a partial set.
+
+    Hits are hardlinked into place (copied when the output lives on another
+    filesystem). Once the stored files exceed ``max_bytes`` the least recently
+    used entries are deleted. Hit, miss and eviction counters persist across runs.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._objects = self.directory / "objects"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS renders (
+                    key TEXT PRIMARY KEY,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_renders_accessed_at
+                ON renders (accessed_at);
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["RenderCache"]:
+        directory = os.getenv("TG_RENDER_CACHE")
+        if not directory:
+            return None
+        return cls(
+            directory,
+            max_bytes=int(os.getenv("TG_RENDER_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+        )
+
+    @staticmethod
+    def key_for(script: str, template_name: str, params: Mapping[str, Any]) -> str:
+        document = {"script": script, "template": template_name, "params": dict(params)}
+        encoded = json.dumps(document, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def fetch(self, key: str, *outputs: Path) -> bool:
+        """Place the cached outputs for ``key`` at the given paths; False on a miss."""
+        cached = self._object_paths(key, outputs)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM renders WHERE key = ?", (key,)).fetchone()
+            hit = row is not None and all(path.exists() for path in cached)
+            if hit:
+                for source, target in zip(cached, outputs):
+                    _place(source, target)
+                conn.execute(
+                    "UPDATE renders SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+            elif row is not None:
+                self._delete_objects(key)
+                conn.execute("DELETE FROM renders WHERE key = ?", (key,))
+            _bump(conn, "hits" if hit else "misses")
+        return hit
+
+    def store(self, key: str, *outputs: Path) -> None:
+        cached = self._object_paths(key, outputs)
+        for source, target in zip(outputs, cached):
+            _place(source, target)
+        size_bytes = sum(path.stat().st_size for path in cached)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO renders (key, size_bytes, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, size_bytes, now, now),
+            )
+            self._evict(conn)
+
+    def stats(self) -> RenderCacheStats:
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM renders"
+            ).fetchone()
+        return RenderCacheStats(
+            hits=counters.get("hits", 0),
+            misses=counters.get("misses", 0),
+            evictions=counters.get("evictions", 0),
+            entries=entries,
+            size_bytes=size_bytes,
+        )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (size_bytes,) = conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM renders"
+        ).fetchone()
+        if size_bytes <= self.max_bytes:
+            return
+        evicted = []
+        for key, entry_size in conn.execute(
+            "SELECT key, size_bytes FROM renders ORDER BY accessed_at ASC"
+        ).fetchall():
+            if size_bytes <= self.max_bytes:
+                break
+            self._delete_objects(key)
+            evicted.append((key,))
+            size_bytes -= entry_size
+        conn.executemany("DELETE FROM renders WHERE key = ?", evicted)
+        _bump(conn, "evictions", len(evicted))
+
+    def _object_paths(self, key: str, outputs: Sequence[Path]) -> list[Path]:
+        # Position in the output list, not the file name, identifies an object.
+        return [
+            self._objects / f"{key}.{index}{output.suffix}" for index, output in enumerate(outputs)
+        ]
+
+    def _delete_objects(self, key: str) -> None:
+        for path in self._objects.glob(f"{key}.*"):
+            path.unlink(missing_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.directory / "index.db", timeout=30)
+
+
+def _place(source: Path, target: Path) -> None:
+    # Link into a temp name and rename, so readers never see a partial file and an
+    # existing target (possibly linked to another cache object) is replaced, not rewritten.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}")
+    staging.unlink(missing_ok=True)
+    try:
+        os.link(source, staging)
+    except OSError:
+        shutil.copy2(source, staging)
+    os.replace(staging, target)
+
+
+def _bump(conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+    conn.execute(
+        """
+        INSERT INTO counters (name, value) VALUES (?, ?)
+        ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+        """,
+        (name, amount),
+    )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+
+from tg_content_factory import db
+from tg_content_factory.video_renderer import RenderMetrics
+
+
+def record_render(
+    conn: sqlite3.Connection, draft_id: int, profile: str, metrics: RenderMetrics
+) -> None:
+    """Store one render's telemetry; a draft keeps one row per render profile."""
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO render_metrics (
+            draft_id,
+            profile,
+            wall_seconds,
+            output_bytes,
+            frames,
+            fps,
+            speed,
+            cached,
+            recorded_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            draft_id,
+            profile,
+            metrics.wall_seconds,
+            metrics.output_bytes,
+            metrics.frames,
+            metrics.fps,
+            metrics.speed,
+            int(metrics.cached),
+            datetime.now(timezone.utc).isoformat(),
+        ),
+    )
+
+
+def template_report(db_path: str) -> list[dict[str, object]]:
+    """Per-template, per-profile render timings.
+
+    Speed and fps only count real (uncached) renders.
+    """
+    db.init_db(db_path)
+    with db.get_connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                drafts.template_name,
+                render_metrics.profile,
+                COUNT(*) AS renders,
+                SUM(render_metrics.cached) AS cached,
+                ROUND(AVG(CASE WHEN render_metrics.cached = 0
+                    THEN render_metrics.wall_seconds END), 3) AS avg_seconds,
+                ROUND(MAX(render_metrics.wall_seconds), 3) AS max_seconds,
+                ROUND(AVG(CASE WHEN render_metrics.cached = 0
+                    THEN render_metrics.speed END), 2) AS avg_speed,
+                ROUND(AVG(CASE WHEN render_metrics.cached = 0
+                    THEN render_metrics.fps END), 1) AS avg_fps,
+                ROUND(AVG(render_metrics.output_bytes)) AS avg_bytes
+            FROM render_metrics
+            JOIN drafts ON drafts.id = render_metrics.draft_id
+            GROUP BY drafts.template_name, render_metrics.profile
+            ORDER BY render_metrics.profile, avg_seconds DESC
+            """
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def slowest_renders(db_path: str, limit: int = 10) -> list[dict[str, object]]:
+    db.init_db(db_path)
+    with db.get_connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                render_metrics.draft_id,
+                drafts.idea_id,
+                drafts.template_name,
+                render_metrics.profile,
+                render_metrics.wall_seconds,
+                render_metrics.speed,
+                render_metrics.fps,
+                render_metrics.frames,
+                render_metrics.output_bytes
+            FROM render_metrics
+            JOIN drafts ON drafts.id = render_metrics.draft_id
+            WHERE render_metrics.cached = 0
+            ORDER BY render_metrics.wall_seconds DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,204 @@
+"""Disk-backed, content-addressed cache for model responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+
+class ResponseCache:
+    """SQLite cache keyed by ``sha256(model, prompt)`` with TTL and LRU eviction.
+
+    Entries older than ``ttl_seconds`` are treated as misses. When the cache
+    grows beyond ``max_entries`` (or ``max_bytes``), the least recently read
+    entries are evicted. Hit, miss and eviction counters persist across runs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_responses_accessed_at
+                ON responses (accessed_at);
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+            # Entry count and total size are tracked so puts need not scan the table;
+            # seed them once for caches created before they were tracked.
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO counters (name, value)
+                SELECT 'entries', COUNT(*) FROM responses
+                """
+            )
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO counters (name, value)
+                SELECT 'size_bytes', COALESCE(SUM(size_bytes), 0) FROM responses
+                """
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        path = os.getenv("TG_OPENAI_CACHE")
+        if not path:
+            return None
+        max_bytes = os.getenv("TG_OPENAI_CACHE_MAX_BYTES")
+        return cls(
+            path,
+            ttl_seconds=float(os.getenv("TG_OPENAI_CACHE_TTL", str(DEFAULT_TTL_SECONDS))),
+            max_entries=int(os.getenv("TG_OPENAI_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+            max_bytes=int(max_bytes) if max_bytes else None,
+        )
+
+    @staticmethod
+    def key_for(model: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            value: Any = _MISSING
+            if row is not None and now - row[1] <= self.ttl_seconds:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                value = json.loads(row[0])
+            elif row is not None:
+                _delete(conn, key)
+            _bump(conn, "misses" if value is _MISSING else "hits")
+        if value is _MISSING:
+            return False, None
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value)
+        size_bytes = len(encoded.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            previous = conn.execute(
+                "SELECT size_bytes FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, value, size_bytes, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, encoded, size_bytes, now, now),
+            )
+            _bump(conn, "entries", 0 if previous else 1)
+            _bump(conn, "size_bytes", size_bytes - (previous[0] if previous else 0))
+            self._evict(conn)
+
+    def stats(self) -> CacheStats:
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM responses"
+            ).fetchone()
+        return CacheStats(
+            hits=counters.get("hits", 0),
+            misses=counters.get("misses", 0),
+            evictions=counters.get("evictions", 0),
+            entries=entries,
+            size_bytes=size_bytes,
+        )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        counters = dict(
+            conn.execute(
+                "SELECT name, value FROM counters WHERE name IN ('entries', 'size_bytes')"
+            ).fetchall()
+        )
+        entries, size_bytes = counters.get("entries", 0), counters.get("size_bytes", 0)
+        if not self._over_limit(entries, size_bytes):
+            return
+        evicted = 0
+        # Walks the accessed_at index and stops as soon as the cache fits again.
+        cursor = conn.execute("SELECT key, size_bytes FROM responses ORDER BY accessed_at ASC")
+        stale = []
+        for key, entry_size in cursor:
+            if not self._over_limit(entries, size_bytes):
+                break
+            stale.append(key)
+            entries -= 1
+            size_bytes -= entry_size
+            evicted += 1
+        for key in stale:
+            _delete(conn, key)
+        _bump(conn, "evictions", evicted)
+
+    def _over_limit(self, entries: int, size_bytes: int) -> bool:
+        over_size = self.max_bytes is not None and size_bytes > self.max_bytes
+        return entries > self.max_entries or over_size
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+
+def _delete(conn: sqlite3.Connection, key: str) -> None:
+    row = conn.execute("SELECT size_bytes FROM responses WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return
+    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+    _bump(conn, "entries", -1)
+    _bump(conn, "size_bytes", -row[0])
+
+
+def _bump(conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+    conn.execute(
+        """
+        INSERT INTO counters (name, value) VALUES (?, ?)
+        ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+        """,
+        (name, amount),
+    )
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from tg_content_factory import db
+from typing import Optional
 
+from tg_content_factory import db, drafts
+from tg_content_factory.video_renderer import VideoRenderer
 
-def set_review_status(db_path: str, draft_id: int, status: str) -> bool:
+
+def set_review_status(
+    db_path: str, draft_id: int, status: str, renderer: Optional[VideoRenderer] = None
+) -> bool:
     db.init_db(db_path)
+    if status == "approved":
+        # Approved drafts get their full-quality render before they can be posted.
+        drafts.promote_draft(db_path, draft_id, renderer)
     with db.get_connection(db_path) as conn:
         cursor = conn.execute(
             "UPDATE drafts SET status = ? WHERE id = ?",
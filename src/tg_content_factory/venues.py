@@ -13,7 +13,7 @@ def post_approved(db_path: str, venues: list[str]) -> list[int]:
     post_ids: list[int] = []
     with db.get_connection(db_path) as conn:
         drafts = conn.execute(
-            "SELECT id FROM drafts WHERE status = ?",
+            "SELECT id, video_path FROM drafts WHERE status = ?",
             ("approved",),
         ).fetchall()
         for draft in drafts:
@@ -24,10 +24,17 @@ def post_approved(db_path: str, venues: list[str]) -> list[int]:
                 ).fetchone()
                 if existing:
                     continue
+                # Post the venue's own encode when one was rendered, else the main video.
+                variant = conn.execute(
+                    "SELECT video_path FROM draft_variants WHERE draft_id = ? AND venue = ?",
+                    (draft["id"], venue),
+                ).fetchone()
                 cursor = conn.execute(
                     """
-                    INSERT INTO posts (draft_id, venue, status, external_id, created_at)
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO posts (
+                        draft_id, venue, status, external_id, created_at, video_path
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
                     """,
                     (
                         draft["id"],
@@ -35,6 +42,7 @@ def post_approved(db_path: str, venues: list[str]) -> list[int]:
                         "posted",
                         f"mock-{uuid4().hex}",
                         datetime.now(timezone.utc).isoformat(),
+                        variant["video_path"] if variant else draft["video_path"],
                     ),
                 )
                 post_ids.append(cursor.lastrowid)
@@ -45,6 +53,7 @@ def list_posts(db_path: str) -> list[dict[str, str]]:
     db.init_db(db_path)
     with db.get_connection(db_path) as conn:
         rows = conn.execute(
-            "SELECT id, draft_id, venue, status, external_id, created_at FROM posts ORDER BY id DESC"
+            "SELECT id, draft_id, venue, status, external_id, created_at, video_path "
+            "FROM posts ORDER BY id DESC"
         ).fetchall()
     return [dict(row) for row in rows]
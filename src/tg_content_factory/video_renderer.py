@@ -2,77 +2,491 @@ from __future__ import annotations
 
 import os
 import subprocess
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .captions import rasterizer_for
+from .render_cache import RenderCache
+
+VIDEO_SECONDS = 12
+PREVIEW_OFFSET_SECONDS = 1.0
+# Bump when the ffmpeg pipeline changes so cached renders are not reused.
+RENDER_VERSION = 2
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    width: int
+    height: int
+    fps: int
+    font_size: int
+    preset: Optional[str] = None
+    crf: Optional[int] = None
+
+    @property
+    def size(self) -> str:
+        return f"{self.width}x{self.height}"
+
+
+FULL_PROFILE = RenderProfile("full", 1080, 1920, fps=30, font_size=42)
+# Review-only tier: quarter the pixels, half the frames, fastest x264 preset.
+PROOF_PROFILE = RenderProfile(
+    "proof", 540, 960, fps=15, font_size=21, preset="ultrafast", crf=32
+)
+PROFILES = {profile.name: profile for profile in (PROOF_PROFILE, FULL_PROFILE)}
+
+
+@dataclass(frozen=True)
+class VideoVariant:
+    """One venue-specific encode, letterboxed to ``width`` x ``height``."""
+
+    name: str
+    width: int
+    height: int
+    video_bitrate: str
+    fps: int = 30
+
+    def paths_for(self, video_path: Path) -> tuple[Path, Path]:
+        """Variant video and thumbnail paths next to the draft's main video."""
+        stem = video_path.with_suffix("")
+        return (
+            stem.with_name(f"{stem.name}.{self.name}.mp4"),
+            stem.with_name(f"{stem.name}.{self.name}.jpg"),
+        )
+
+
+VENUE_VARIANTS = {
+    variant.name: variant
+    for variant in (
+        VideoVariant("youtube", 1080, 1920, video_bitrate="8M"),
+        VideoVariant("tiktok", 1080, 1920, video_bitrate="6M"),
+        VideoVariant("twitter", 720, 720, video_bitrate="2M"),
+    )
+}
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    script: str
+    video_path: Path
+    preview_path: Path
+    template_name: str = ""
+    variants: tuple[VideoVariant, ...] = ()
+
+    def outputs(self) -> list[Path]:
+        """Every file the job writes: video, preview, then each variant and its thumbnail."""
+        outputs = [self.video_path, self.preview_path]
+        for variant in self.variants:
+            outputs.extend(variant.paths_for(self.video_path))
+        return outputs
+
+
+@dataclass(frozen=True)
+class RenderMetrics:
+    wall_seconds: float
+    output_bytes: int
+    frames: Optional[int] = None
+    fps: Optional[float] = None
+    speed: Optional[float] = None
+    cached: bool = False
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
 
 
 @dataclass(frozen=True)
 class VideoRenderer:
     output_dir: Path
     font_path: Path
+    threads: Optional[int] = None
+    cache: Optional[RenderCache] = None
+    profile: RenderProfile = FULL_PROFILE
 
     @classmethod
     def default(cls) -> "VideoRenderer":
         output_dir = Path(os.getenv("TG_VIDEO_OUTPUT", "data/renders"))
         if os.getenv("TG_VIDEO_RENDER_MODE") == "mock":
-            return MockVideoRenderer(output_dir=output_dir)
+            return MockVideoRenderer(output_dir=output_dir, cache=RenderCache.from_env())
         font_path = Path(
             os.getenv(
                 "TG_VIDEO_FONT",
                 "/System/Library/Fonts/Supplemental/Arial.ttf",
             )
         )
-        return cls(output_dir=output_dir, font_path=font_path)
+        return cls(output_dir=output_dir, font_path=font_path, cache=RenderCache.from_env())
 
-    def render_video(self, script: str, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        escaped_script = script.replace(":", "\\:").replace("'", "\\'")
-        command = [
-            "ffmpeg",
-            "-y",
+    def with_profile(self, profile: RenderProfile | str) -> "VideoRenderer":
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ValueError(f"Unknown render profile: {profile}")
+            profile = PROFILES[profile]
+        return replace(self, profile=profile)
+
+    def render_many(
+        self, jobs: Sequence[RenderJob], workers: Optional[int] = None
+    ) -> List[RenderMetrics]:
+        """Render each job's video and preview, running ffmpeg processes in parallel.
+
+        ``workers`` defaults to the cores available to this process; the cores are
+        split evenly across jobs via ``-threads`` so the pool never oversubscribes.
+        Returns one ``RenderMetrics`` per job, in job order.
+        """
+        if not jobs:
+            return []
+        cores = available_cores()
+        pool_size = max(1, min(workers or cores, len(jobs)))
+        renderer = replace(self, threads=max(1, cores // pool_size))
+        if pool_size == 1:
+            return [renderer.render_job(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            return list(executor.map(renderer.render_job, jobs))
+
+    def render_params(self) -> dict[str, object]:
+        """Everything besides script and template that changes the rendered output."""
+        return {
+            "renderer": type(self).__name__,
+            "version": RENDER_VERSION,
+            "font_path": str(self.font_path),
+            "profile": self.profile.name,
+            "font_size": self.profile.font_size,
+            "size": self.profile.size,
+            "fps": self.profile.fps,
+            "preset": self.profile.preset,
+            "crf": self.profile.crf,
+            "seconds": VIDEO_SECONDS,
+            "preview_offset": PREVIEW_OFFSET_SECONDS,
+        }
+
+    def render_key(self, job: RenderJob) -> str:
+        """Render cache key for ``job``; variants are part of it, as they add outputs."""
+        params = self.render_params()
+        if job.variants:
+            params["variants"] = [asdict(variant) for variant in job.variants]
+        return RenderCache.key_for(job.script, job.template_name, params)
+
+    def render_job(self, job: RenderJob) -> RenderMetrics:
+        """Render one job's outputs, through the render cache when one is configured.
+
+        A job with variants is cached as one entry holding every output, so a hit
+        restores the main video, preview and each variant together.
+        """
+        if self.cache is None:
+            return self._render_outputs(job)
+        key = self.render_key(job)
+        outputs = job.outputs()
+        started = time.perf_counter()
+        if self.cache.fetch(key, *outputs):
+            return RenderMetrics(
+                wall_seconds=time.perf_counter() - started,
+                output_bytes=_total_size(outputs),
+                cached=True,
+            )
+        metrics = self._render_outputs(job)
+        self.cache.store(key, *outputs)
+        return metrics
+
+    def _render_outputs(self, job: RenderJob) -> RenderMetrics:
+        if job.variants:
+            return self.render_variants(
+                job.script, job.video_path, job.preview_path, job.variants
+            )
+        return self.render_with_preview(job.script, job.video_path, job.preview_path)
+
+    def _caption_overlay(self, text: str) -> Path:
+        """Rasterized caption for ``text``, shared by every render of the same layout."""
+        return rasterizer_for(self.output_dir / ".captions").overlay_for(
+            text,
+            self.font_path,
+            self.profile.font_size,
+            (self.profile.width, self.profile.height),
+            _run_ffmpeg,
+            self._thread_args(),
+        )
+
+    def _background_inputs(self, text: str, seconds: Optional[int]) -> list[str]:
+        duration = f":d={seconds}" if seconds else ""
+        return [
             "-f",
             "lavfi",
             "-i",
-            "color=c=black:s=1080x1920:d=12",
-            "-vf",
+            f"color=c=black:s={self.profile.size}:r={self.profile.fps}{duration}",
+            "-loop",
+            "1",
+            "-i",
+            str(self._caption_overlay(text)),
+        ]
+
+    def _encoder_args(self) -> list[str]:
+        args = []
+        if self.profile.preset or self.profile.crf is not None:
+            args.extend(["-c:v", "libx264"])
+        if self.profile.preset:
+            args.extend(["-preset", self.profile.preset])
+        if self.profile.crf is not None:
+            args.extend(["-crf", str(self.profile.crf)])
+        return args
+
+    def _thread_args(self) -> list[str]:
+        return ["-threads", str(self.threads)] if self.threads else []
+
+    def render_video(self, script: str, output_path: Path) -> RenderMetrics:
+        _prepare_output(output_path)
+        command = [
+            "ffmpeg",
+            "-y",
+            *self._background_inputs(script, VIDEO_SECONDS),
+            "-filter_complex",
+            "[0:v][1:v]overlay=0:0:shortest=1",
+            "-r",
+            str(self.profile.fps),
+            "-pix_fmt",
+            "yuv420p",
+            *self._encoder_args(),
+            *self._thread_args(),
+            str(output_path),
+        ]
+        return _run_ffmpeg(command, [output_path])
+
+    def render_with_preview(
+        self, script: str, video_path: Path, preview_path: Path
+    ) -> RenderMetrics:
+        """Write the video and its 1s preview frame from a single ffmpeg process."""
+        _prepare_output(video_path)
+        _prepare_output(preview_path)
+        command = [
+            "ffmpeg",
+            "-y",
+            *self._background_inputs(script, VIDEO_SECONDS),
+            "-filter_complex",
             (
-                "drawtext="
-                f"fontfile={self.font_path}:"
-                "fontsize=42:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2:"
-                f"text='{escaped_script}'"
+                "[0:v][1:v]overlay=0:0:shortest=1,split=2[video][still];"
+                f"[still]trim=start={PREVIEW_OFFSET_SECONDS},setpts=PTS-STARTPTS[preview]"
             ),
-            "-r",
-            "30",
+            "-map",
+            "[video]",
             "-pix_fmt",
             "yuv420p",
+            *self._encoder_args(),
+            *self._thread_args(),
+            str(video_path),
+            "-map",
+            "[preview]",
+            "-frames:v",
+            "1",
+            str(preview_path),
+        ]
+        return _run_ffmpeg(command, [video_path, preview_path])
+
+    def render_variants(
+        self,
+        script: str,
+        video_path: Path,
+        preview_path: Path,
+        variants: Sequence[VideoVariant],
+    ) -> RenderMetrics:
+        """Encode the main video, its preview and every variant plus thumbnail in one process.
+
+        The composited frames are produced once and ``split`` to each output; variant
+        files sit next to ``video_path`` (see ``VideoVariant.paths_for``).
+        """
+        outputs = [video_path, preview_path]
+        for variant in variants:
+            outputs.extend(variant.paths_for(video_path))
+        for output in outputs:
+            _prepare_output(output)
+        labels = "".join(f"[v{index}]" for index in range(len(variants)))
+        graph = [
+            f"[0:v][1:v]overlay=0:0:shortest=1,split={len(variants) + 2}[video][still]{labels}",
+            f"[still]trim=start={PREVIEW_OFFSET_SECONDS},setpts=PTS-STARTPTS[preview]",
+        ]
+        for index, variant in enumerate(variants):
+            size = f"{variant.width}:{variant.height}"
+            graph.append(
+                f"[v{index}]scale={size}:force_original_aspect_ratio=decrease,"
+                f"pad={size}:(ow-iw)/2:(oh-ih)/2,fps={variant.fps},"
+                f"split=2[out{index}][thumb_src{index}]"
+            )
+            graph.append(
+                f"[thumb_src{index}]trim=start={PREVIEW_OFFSET_SECONDS},"
+                f"setpts=PTS-STARTPTS[thumb{index}]"
+            )
+        command = [
+            "ffmpeg",
+            "-y",
+            *self._background_inputs(script, VIDEO_SECONDS),
+            "-filter_complex",
+            ";".join(graph),
+            "-map",
+            "[video]",
+            "-pix_fmt",
+            "yuv420p",
+            *self._encoder_args(),
+            *self._thread_args(),
+            str(video_path),
+            "-map",
+            "[preview]",
+            "-frames:v",
+            "1",
+            str(preview_path),
+        ]
+        for index, variant in enumerate(variants):
+            variant_video, thumbnail = variant.paths_for(video_path)
+            command.extend(
+                [
+                    "-map",
+                    f"[out{index}]",
+                    "-pix_fmt",
+                    "yuv420p",
+                    "-c:v",
+                    "libx264",
+                    "-b:v",
+                    variant.video_bitrate,
+                    "-maxrate",
+                    variant.video_bitrate,
+                    "-bufsize",
+                    variant.video_bitrate,
+                    *self._thread_args(),
+                    str(variant_video),
+                    "-map",
+                    f"[thumb{index}]",
+                    "-frames:v",
+                    "1",
+                    str(thumbnail),
+                ]
+            )
+        return _run_ffmpeg(command, outputs)
+
+    def render_still(self, text: str, output_path: Path) -> RenderMetrics:
+        _prepare_output(output_path)
+        command = [
+            "ffmpeg",
+            "-y",
+            *self._background_inputs(text, None),
+            "-filter_complex",
+            "[0:v][1:v]overlay=0:0",
+            "-frames:v",
+            "1",
+            *self._thread_args(),
             str(output_path),
         ]
-        subprocess.run(command, check=True)
+        return _run_ffmpeg(command, [output_path])
 
-    def render_preview(self, video_path: Path, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    def render_preview(self, video_path: Path, output_path: Path) -> RenderMetrics:
+        _prepare_output(output_path)
         command = [
             "ffmpeg",
             "-y",
             "-i",
             str(video_path),
             "-ss",
-            "00:00:01.000",
+            f"{PREVIEW_OFFSET_SECONDS:.3f}",
             "-vframes",
             "1",
+            *self._thread_args(),
             str(output_path),
         ]
-        subprocess.run(command, check=True)
+        return _run_ffmpeg(command, [output_path])
+
+
+def _run_ffmpeg(command: List[str], outputs: Sequence[Path]) -> RenderMetrics:
+    """Run ffmpeg with ``-progress`` on stdout and collect its final counters."""
+    command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+    started = time.perf_counter()
+    with subprocess.Popen(command, stdout=subprocess.PIPE, text=True) as process:
+        progress = _parse_progress(process.stdout or ())
+    wall_seconds = time.perf_counter() - started
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return RenderMetrics(
+        wall_seconds=wall_seconds,
+        output_bytes=_total_size(outputs),
+        frames=_progress_number(progress, "frame", int),
+        fps=_progress_number(progress, "fps", float),
+        speed=_progress_number(progress, "speed", float),
+    )
+
+
+def _parse_progress(lines: Iterable[str]) -> Dict[str, str]:
+    # ffmpeg repeats key=value blocks ending in progress=continue|end; keep the latest values.
+    latest: Dict[str, str] = {}
+    for line in lines:
+        key, separator, value = line.strip().partition("=")
+        if separator:
+            latest[key] = value.strip()
+    return latest
+
+
+def _progress_number(progress: Dict[str, str], key: str, kind: type) -> Optional[float]:
+    raw = progress.get(key, "").rstrip("x")
+    try:
+        return kind(raw)
+    except ValueError:
+        return None
+
+
+def _total_size(paths: Iterable[Path]) -> int:
+    return sum(path.stat().st_size for path in paths if path.exists())
+
+
+def _prepare_output(path: Path) -> None:
+    # Outputs may be hardlinks into the render cache; unlink so writes never reach it.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
 
 
 @dataclass(frozen=True)
 class MockVideoRenderer(VideoRenderer):
     font_path: Path = Path("")
 
-    def render_video(self, script: str, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(script)
+    def render_video(self, script: str, output_path: Path) -> RenderMetrics:
+        return _mock_write(output_path, script)
+
+    def render_still(self, text: str, output_path: Path) -> RenderMetrics:
+        return _mock_write(output_path, f"still: {text}")
+
+    def render_preview(self, video_path: Path, output_path: Path) -> RenderMetrics:
+        return _mock_write(output_path, f"preview for {video_path.name}")
+
+    def render_with_preview(
+        self, script: str, video_path: Path, preview_path: Path
+    ) -> RenderMetrics:
+        video = self.render_video(script, video_path)
+        preview = self.render_preview(video_path, preview_path)
+        return RenderMetrics(
+            wall_seconds=video.wall_seconds + preview.wall_seconds,
+            output_bytes=video.output_bytes + preview.output_bytes,
+        )
+
+    def render_variants(
+        self,
+        script: str,
+        video_path: Path,
+        preview_path: Path,
+        variants: Sequence[VideoVariant],
+    ) -> RenderMetrics:
+        metrics = [self.render_with_preview(script, video_path, preview_path)]
+        for variant in variants:
+            variant_video, thumbnail = variant.paths_for(video_path)
+            metrics.append(_mock_write(variant_video, f"{variant.name}: {script}"))
+            metrics.append(_mock_write(thumbnail, f"thumbnail for {variant_video.name}"))
+        return RenderMetrics(
+            wall_seconds=sum(item.wall_seconds for item in metrics),
+            output_bytes=sum(item.output_bytes for item in metrics),
+        )
+
 
-    def render_preview(self, video_path: Path, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(f"preview for {video_path.name}")
+def _mock_write(output_path: Path, text: str) -> RenderMetrics:
+    started = time.perf_counter()
+    _prepare_output(output_path)
+    output_path.write_text(text)
+    return RenderMetrics(
+        wall_seconds=time.perf_counter() - started, output_bytes=output_path.stat().st_size
+    )
@@ -0,0 +1,53 @@
+import unittest
+
+from tg_content_factory.adapters import TwitterAdapter, YouTubeAdapter
+from tg_content_factory.db import Database
+from tg_content_factory.models import PostPayload
+
+
+class AdapterVariantTests(unittest.TestCase):
+    def test_adapters_pick_their_venue_variant(self) -> None:
+        payload = PostPayload(
+            title="Hello",
+            description="World",
+            video_url="https://cdn.example/main.mp4",
+            video_variants={
+                "youtube": "https://cdn.example/main.youtube.mp4",
+                "twitter": "https://cdn.example/main.twitter.mp4",
+            },
+        )
+
+        youtube = YouTubeAdapter("key").format_payload(payload)
+        twitter = TwitterAdapter("token").format_payload(payload)
+
+        self.assertEqual(youtube["video_url"], "https://cdn.example/main.youtube.mp4")
+        self.assertEqual(twitter["video_url"], "https://cdn.example/main.twitter.mp4")
+
+    def test_adapters_fall_back_to_main_video(self) -> None:
+        payload = PostPayload(
+            title="Hello",
+            description="World",
+            video_url="https://cdn.example/main.mp4",
+            video_variants={"tiktok": "https://cdn.example/main.tiktok.mp4"},
+        )
+
+        self.assertEqual(
+            YouTubeAdapter("key").format_payload(payload)["video_url"],
+            "https://cdn.example/main.mp4",
+        )
+
+    def test_variants_survive_storage(self) -> None:
+        db = Database()
+        payload = PostPayload(
+            title="Hello",
+            description="World",
+            video_variants={" twitter ": " https://cdn.example/t.mp4 ", "youtube": " "},
+        )
+
+        stored = db.get_post_payload(db.create_post(payload))
+
+        self.assertEqual(stored.video_variants, {"twitter": "https://cdn.example/t.mp4"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.asset_worker import AssetGenWorkerPool
+from src.db import IdeaRepository
+from src.idea_service import IdeaService
+from src.models import AssetJobPayload
+from src.payloads import decode_asset_payload, encode_asset_payload
+from src.asset_queue import AssetGenQueue
+from src.tg_content_factory import AssetGenService, LocalStorage, MetadataStore
+
+
+def _seed(db_path: str, themes: list[str], **queue_options) -> AssetGenQueue:
+    repository = IdeaRepository(db_path)
+    queue = AssetGenQueue(repository, **queue_options)
+    IdeaService(repository, queue).generate_and_enqueue_bulk(
+        themes=themes,
+        recent_keywords=["Workflow", "Pipeline"],
+        trend_signals=["AI"],
+    )
+    return queue
+
+
+class _PidRecordingService(AssetGenService):
+    """Prefixes each prompt with the id of the process that generated it."""
+
+    def generate_assets(self, request):
+        items = [replace(item, prompt=f"{os.getpid()}:{item.prompt}") for item in request.items]
+        return super().generate_assets(replace(request, items=items))
+
+
+class AssetGenQueueTests(unittest.TestCase):
+    def test_claim_leases_rows_until_visibility_timeout(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            queue = _seed(
+                f"{tmpdir}/ideas.db", ["Automation", "Analytics"], visibility_timeout=timedelta(seconds=60)
+            )
+            now = datetime(2030, 1, 1)
+
+            first = queue.claim(limit=5, now=now)
+            self.assertEqual([job.idea_id for job in first], [1, 2])
+            self.assertEqual(first[0].payload.theme, "Automation")
+            self.assertEqual(queue.claim(now=now + timedelta(seconds=30)), [])
+
+            reclaimed = queue.claim(limit=5, now=now + timedelta(seconds=61))
+            self.assertEqual([job.attempts for job in reclaimed], [2, 2])
+            self.assertFalse(queue.ack(first[0]))
+            self.assertTrue(queue.ack(reclaimed[0]))
+
+    def test_nack_retries_then_dead_letters(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            queue = _seed(
+                f"{tmpdir}/ideas.db",
+                ["Automation"],
+                max_attempts=2,
+                retry_delay=timedelta(seconds=10),
+            )
+            now = datetime(2030, 1, 1)
+
+            job = queue.claim(now=now)[0]
+            self.assertTrue(queue.nack(job, "boom", now=now))
+            self.assertEqual(queue.claim(now=now + timedelta(seconds=5)), [])
+            retry = queue.claim(now=now + timedelta(seconds=11))[0]
+            self.assertTrue(queue.nack(retry, "boom again", now=now))
+
+            self.assertEqual(queue.claim(now=now + timedelta(days=1)), [])
+            dead = queue.dead_letters()
+            self.assertEqual([(row["id"], row["last_error"]) for row in dead], [(1, "boom again")])
+            self.assertEqual(queue.requeue_dead_letters(), 1)
+
+    def test_undecodable_payloads_are_dead_lettered_without_failing_the_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            queue = _seed(db_path, ["Automation", "Analytics", "Ethics"])
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("UPDATE asset_gen_queue SET payload = ? WHERE id = 2", (b"\x09\x00",))
+            now = datetime(2030, 1, 1)
+
+            jobs = queue.claim(limit=5, now=now)
+
+            self.assertEqual([job.id for job in jobs], [1, 3])
+            dead = queue.dead_letters()
+            self.assertEqual([row["id"] for row in dead], [2])
+            self.assertIn("undecodable payload", dead[0]["last_error"])
+
+    def test_worker_pool_drains_queue_into_asset_service(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            queue = _seed(db_path, ["Automation", "Analytics", "Ethics", "Growth"])
+            metadata = MetadataStore(Path(tmpdir) / "metadata.db")
+            service = AssetGenService(LocalStorage(Path(tmpdir) / "assets"), metadata)
+
+            stats = AssetGenWorkerPool(queue, service, workers=3).drain()
+
+            self.assertEqual((stats.succeeded, stats.failed), (4, 0))
+            self.assertEqual(len(metadata.fetch_clips()), 4 * 3)
+            with sqlite3.connect(db_path) as conn:
+                statuses = {row[0] for row in conn.execute("SELECT status FROM asset_gen_queue")}
+            self.assertEqual(statuses, {"done"})
+
+    def test_worker_pool_generates_assets_outside_the_calling_process(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            queue = _seed(f"{tmpdir}/ideas.db", ["Automation", "Analytics", "Ethics"])
+            metadata = MetadataStore(Path(tmpdir) / "metadata.db")
+            service = _PidRecordingService(LocalStorage(Path(tmpdir) / "assets"), metadata)
+
+            stats = AssetGenWorkerPool(queue, service, workers=2).drain()
+
+            self.assertEqual((stats.succeeded, stats.failed), (3, 0))
+            pids = {clip.prompt.split(":", 1)[0] for clip in metadata.fetch_clips()}
+            self.assertNotIn(str(os.getpid()), pids)
+
+
+class AssetPayloadTests(unittest.TestCase):
+    def test_compact_payload_round_trips(self) -> None:
+        payload = AssetJobPayload(title="Ética: IA", theme="Ethics", keywords=("trust", "métricas"))
+
+        encoded = encode_asset_payload(payload)
+
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(decode_asset_payload(encoded), payload)
+
+    def test_legacy_json_rows_are_compacted_and_linked(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            repository = IdeaRepository(db_path)
+            service = IdeaService(repository, AssetGenQueue(repository))
+            idea = service.generate_and_enqueue(
+                themes=["Automation"],
+                recent_keywords=["Workflow", "Pipeline", "Ops", "Extra"],
+                trend_signals=["AI"],
+            )[0]
+            legacy = json.dumps(
+                {
+                    "title": idea.title,
+                    "theme": idea.theme,
+                    "keywords": list(idea.keywords),
+                    "created_at": idea.created_at.isoformat(),
+                }
+            )
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("UPDATE asset_gen_queue SET payload = ?, idea_id = NULL", (legacy,))
+
+            self.assertEqual(repository.compact_queue_payloads().converted, 1)
+
+            with sqlite3.connect(db_path) as conn:
+                idea_id, payload = conn.execute(
+                    "SELECT idea_id, payload FROM asset_gen_queue"
+                ).fetchone()
+            self.assertEqual(idea_id, 1)
+            self.assertLess(len(payload), len(legacy))
+            self.assertEqual(
+                decode_asset_payload(payload).keywords, ("Workflow", "Pipeline", "Ops")
+            )
+
+    def test_compaction_dead_letters_legacy_rows_without_a_title(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            queue = _seed(db_path, ["Automation", "Analytics"])
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(
+                    "UPDATE asset_gen_queue SET payload = ? WHERE id = 1",
+                    (json.dumps({"theme": "Automation"}),),
+                )
+                conn.execute(
+                    "UPDATE asset_gen_queue SET payload = ? WHERE id = 2",
+                    (json.dumps({"title": "Kept", "theme": "Analytics"}),),
+                )
+
+            result = IdeaRepository(db_path).compact_queue_payloads()
+
+            self.assertEqual((result.converted, result.dead_lettered), (1, 1))
+            self.assertEqual([row["id"] for row in queue.dead_letters()], [1])
+            self.assertEqual(queue.claim(limit=5)[0].payload.title, "Kept")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+from src.tg_content_factory.cassette import (
+    Cassette,
+    LatencyModel,
+    RecordingServer,
+    ReplayServer,
+)
+from src.tg_content_factory.openai_client import OpenAIClient, OpenAIHTTPError
+from src.tg_content_factory.rate_limiter import RetryPolicy
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.hits += 1
+        if request.get("stream"):
+            events = [
+                {"type": "response.output_text.delta", "delta": "Hook: recorded\n"},
+                {"type": "response.output_text.delta", "delta": "CTA: go"},
+                {"type": "response.completed", "response": {}},
+            ]
+            body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+            content_type = "text/event-stream"
+        else:
+            text = f"recorded {request['input'][-12:]}"
+            body = json.dumps({"output": [{"content": [{"type": "output_text", "text": text}]}]})
+            content_type = "application/json"
+        encoded = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def serve(server: ThreadingHTTPServer) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+class CassetteTests(unittest.TestCase):
+    def setUp(self) -> None:
+        env = mock.patch.dict(os.environ, {}, clear=False)
+        env.start()
+        os.environ.pop("TG_OPENAI_MOCK", None)
+        self.addCleanup(env.stop)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.cassette_path = str(Path(tmpdir.name) / "openai.jsonl")
+
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+        upstream.hits = 0
+        serve(upstream)
+        self.addCleanup(upstream.server_close)
+        self.addCleanup(upstream.shutdown)
+        self.upstream = upstream
+
+        recorder = RecordingServer(
+            Cassette(self.cassette_path),
+            f"http://127.0.0.1:{upstream.server_address[1]}/v1",
+        )
+        serve(recorder)
+        client = OpenAIClient(api_key="test", base_url=recorder.base_url, timeout=5)
+        self.recorded_script = client.generate_script("idea one", "Lightning")
+        self.recorded_stream = "".join(client.stream_script("idea two", "Lightning"))
+        recorder.shutdown()
+        recorder.server_close()
+
+    def replay(self, **kwargs: object) -> ReplayServer:
+        server = ReplayServer(Cassette(self.cassette_path), **kwargs)
+        serve(server)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_replay_matches_recording_without_upstream(self) -> None:
+        server = self.replay()
+        client = OpenAIClient(api_key="test", base_url=server.base_url, timeout=5)
+
+        script = client.generate_script("idea one", "Lightning")
+        streamed = "".join(client.stream_script("idea two", "Lightning"))
+
+        self.assertEqual(script, self.recorded_script)
+        self.assertEqual(streamed, "Hook: recorded\nCTA: go")
+        self.assertEqual(streamed, self.recorded_stream)
+        self.assertEqual(self.upstream.hits, 2)
+        self.assertEqual(server.stats().misses, 0)
+
+    def test_unknown_requests_reuse_recordings_unless_strict(self) -> None:
+        lenient = self.replay()
+        client = OpenAIClient(api_key="test", base_url=lenient.base_url, timeout=5)
+        self.assertEqual(client.generate_script("new idea", "Lightning"), self.recorded_script)
+        self.assertEqual(lenient.stats().misses, 1)
+
+        strict = self.replay(strict=True)
+        client = OpenAIClient(
+            api_key="test",
+            base_url=strict.base_url,
+            timeout=5,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+        with self.assertRaises(OpenAIHTTPError) as raised:
+            client.generate_script("new idea", "Lightning")
+        self.assertEqual(raised.exception.status, 404)
+
+    def test_replay_applies_latency_and_tracks_concurrency(self) -> None:
+        server = self.replay(latency=LatencyModel.parse("fixed:0.2"))
+        client = OpenAIClient(api_key="test", base_url=server.base_url, pool_size=4, timeout=5)
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=client.generate_script, args=("idea one", "Lightning"))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(server.stats().requests, 4)
+        self.assertGreater(server.stats().max_in_flight, 1)
+
+    def test_recorder_answers_502_when_upstream_fails(self) -> None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            closed_port = probe.getsockname()[1]
+        cassette = Cassette(self.cassette_path + ".failed")
+        recorder = RecordingServer(cassette, f"http://127.0.0.1:{closed_port}/v1", timeout=2)
+        serve(recorder)
+        self.addCleanup(recorder.server_close)
+        self.addCleanup(recorder.shutdown)
+        client = OpenAIClient(
+            api_key="test",
+            base_url=recorder.base_url,
+            timeout=5,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+        with self.assertRaises(OpenAIHTTPError) as raised:
+            client.generate_script("idea one", "Lightning")
+
+        self.assertEqual(raised.exception.status, 502)
+        self.assertIn("Upstream request failed", raised.exception.body)
+        self.assertEqual(cassette.interactions, [])
+
+    def test_latency_specs(self) -> None:
+        rng = random.Random(1)
+        self.assertEqual(LatencyModel.parse("fixed:0.5").sample(rng), 0.5)
+        self.assertTrue(0.1 <= LatencyModel.parse("uniform:0.1,0.3").sample(rng) <= 0.3)
+        self.assertGreater(LatencyModel.parse("lognormal:-1,0.5").sample(rng), 0)
+        with self.assertRaises(ValueError):
+            LatencyModel.parse("gamma:1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,75 @@
+import json
 import os
 import sqlite3
 import subprocess
 import tempfile
+import threading
+import time
 import unittest
+from dataclasses import dataclass
 from pathlib import Path
+from unittest import mock
+
+from src.tg_content_factory import db as tg_db
+from src.tg_content_factory.captions import CaptionRasterizer, layout_caption
+from src.tg_content_factory.video_renderer import (
+    PROOF_PROFILE,
+    VENUE_VARIANTS,
+    MockVideoRenderer,
+    RenderJob,
+    RenderMetrics,
+    VideoRenderer,
+    available_cores,
+)
+
+FAKE_FFMPEG = """#!/usr/bin/env python3
+import sys
+for frame in (120, 360):
+    print(f"frame={frame}\\nfps=240.5\\nspeed=8.01x\\nprogress=continue")
+print("progress=end")
+with open(sys.argv[-1], "w") as handle:
+    handle.write("video")
+"""
+
+# Writes every output file; with FAKE_FFMPEG_FAIL set it leaves them truncated and fails.
+# FAKE_FFMPEG_LOG names a file that receives each command line as JSON.
+PARTIAL_FFMPEG = """#!/usr/bin/env python3
+import json
+import os
+import sys
+args = sys.argv[1:]
+failing = bool(os.environ.get("FAKE_FFMPEG_FAIL"))
+if os.environ.get("FAKE_FFMPEG_LOG"):
+    with open(os.environ["FAKE_FFMPEG_LOG"], "a") as log:
+        log.write(json.dumps(args) + "\\n")
+for index, arg in enumerate(args):
+    if arg.endswith((".mp4", ".png", ".jpg")) and args[index - 1] != "-i":
+        with open(arg, "w") as handle:
+            handle.write("partial" if failing else "complete")
+sys.exit(1 if failing else 0)
+"""
+
+
+@dataclass(frozen=True)
+class SlowRenderer(MockVideoRenderer):
+    def render_video(self, script: str, output_path: Path) -> RenderMetrics:
+        time.sleep(0.2)
+        return super().render_video(f"{script} threads={self.threads}", output_path)
+
+
+class RecordingFFmpeg:
+    """Stands in for ``_run_ffmpeg``: records commands and creates their outputs."""
+
+    def __init__(self) -> None:
+        self.commands: list = []
+        self._lock = threading.Lock()
+
+    def __call__(self, command: list, outputs: list) -> RenderMetrics:
+        with self._lock:
+            self.commands.append(command)
+        for output in outputs:
+            Path(output).write_text("rendered")
+        return RenderMetrics(wall_seconds=0.0, output_bytes=0)
 
 
 class DraftVideoTests(unittest.TestCase):
@@ -73,6 +139,611 @@ class DraftVideoTests(unittest.TestCase):
             self.assertTrue(Path(row["video_path"]).exists())
             self.assertTrue(Path(row["preview_path"]).exists())
 
+    def test_create_drafts_fetches_scripts_concurrently_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            env = os.environ.copy()
+            env["PYTHONPATH"] = str(Path.cwd() / "src")
+            env["OPENAI_API_KEY"] = "test-key"
+            env["TG_OPENAI_MOCK"] = "1"
+            env["TG_VIDEO_RENDER_MODE"] = "mock"
+            env["TG_VIDEO_OUTPUT"] = f"{tmpdir}/renders"
+
+            def run_cli(*args: str) -> None:
+                subprocess.run(
+                    ["python", "-m", "tg_content_factory.cli", "--db", db_path, *args],
+                    check=True,
+                    env=env,
+                    cwd=tmpdir,
+                )
+
+            run_cli("generate-ideas", "--count", "3")
+            env["TG_OPENAI_MOCK_LATENCY"] = "0.4"
+            started = time.perf_counter()
+            run_cli(
+                "create-drafts", "1", "2", "3", "--concurrency", "6", "--batch-size", "1"
+            )
+            elapsed = time.perf_counter() - started
+
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute(
+                    "SELECT idea_id, template_name, content FROM drafts ORDER BY id ASC"
+                ).fetchall()
+
+            self.assertEqual(
+                [(row[0], row[1]) for row in rows],
+                [
+                    (idea_id, template)
+                    for idea_id in (1, 2, 3)
+                    for template in ("Lightning Lecture", "Deep Dive Teaser")
+                ],
+            )
+            self.assertIn("Mock idea 2", rows[2][2])
+            # Six sequential mock calls would take 2.4s on their own.
+            self.assertLess(elapsed, 2.0)
+
+    def test_create_drafts_stream_renders_preview_from_hook(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            env = os.environ.copy()
+            env["PYTHONPATH"] = str(Path.cwd() / "src")
+            env["OPENAI_API_KEY"] = "test-key"
+            env["TG_OPENAI_MOCK"] = "1"
+            env["TG_VIDEO_RENDER_MODE"] = "mock"
+            env["TG_VIDEO_OUTPUT"] = f"{tmpdir}/renders"
+
+            def run_cli(*args: str) -> str:
+                return subprocess.run(
+                    ["python", "-m", "tg_content_factory.cli", "--db", db_path, *args],
+                    check=True,
+                    env=env,
+                    cwd=tmpdir,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+
+            env["TG_RENDER_CACHE"] = f"{tmpdir}/cache"
+            run_cli("generate-ideas", "--count", "1")
+            output = run_cli("create-drafts", "1", "--templates", "Lightning Lecture", "--stream")
+            run_cli("create-drafts", "1", "--templates", "Lightning Lecture", "--stream")
+
+            with sqlite3.connect(db_path) as conn:
+                row = conn.execute(
+                    "SELECT content, video_path, preview_path FROM drafts ORDER BY id"
+                ).fetchone()
+            with sqlite3.connect(f"{tmpdir}/cache/index.db") as conn:
+                counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+
+            self.assertIn("Preview ready for idea 1 (Lightning Lecture)", output)
+            # The hook card is replaced by the rendered preview once the video is done.
+            self.assertEqual(Path(row[2]).read_text(), f"preview for {Path(row[1]).name}")
+            self.assertEqual(Path(row[1]).read_text(), row[0])
+            self.assertTrue(row[0].startswith("Hook: Mock idea 1\nBeats"))
+            # The repeat run streams the same script and reuses the cached render.
+            self.assertEqual((counters.get("misses"), counters.get("hits")), (1, 1))
+
+
+class RenderPoolTests(unittest.TestCase):
+    def test_render_many_runs_jobs_in_parallel_with_split_threads(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            renderer = SlowRenderer(output_dir=Path(tmpdir))
+            jobs = [
+                RenderJob(f"script {idx}", Path(tmpdir) / f"{idx}.mp4", Path(tmpdir) / f"{idx}.png")
+                for idx in range(4)
+            ]
+
+            with mock.patch(
+                "src.tg_content_factory.video_renderer.available_cores", return_value=8
+            ):
+                started = time.perf_counter()
+                renderer.render_many(jobs)
+                elapsed = time.perf_counter() - started
+
+            self.assertLess(elapsed, 0.6)
+            self.assertEqual(jobs[2].video_path.read_text(), "script 2 threads=2")
+            self.assertTrue(all(job.preview_path.exists() for job in jobs))
+
+    def test_ffmpeg_commands_carry_thread_budget(self) -> None:
+        fake = RecordingFFmpeg()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            renderer = VideoRenderer(
+                output_dir=Path(tmpdir), font_path=Path("font.ttf"), threads=3
+            )
+            with mock.patch("src.tg_content_factory.video_renderer._run_ffmpeg", fake):
+                renderer.render_video("hello", Path(tmpdir) / "a.mp4")
+                renderer.render_preview(Path(tmpdir) / "a.mp4", Path(tmpdir) / "a.png")
+
+        self.assertEqual(len(fake.commands), 3)
+        for command in fake.commands:
+            self.assertEqual(command[-3:-1], ["-threads", "3"])
+
+    def test_render_with_preview_uses_one_ffmpeg_process(self) -> None:
+        fake = RecordingFFmpeg()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            renderer = VideoRenderer(output_dir=Path(tmpdir), font_path=Path("font.ttf"))
+            with mock.patch("src.tg_content_factory.video_renderer._run_ffmpeg", fake):
+                renderer.render_with_preview(
+                    "hello", Path(tmpdir) / "a.mp4", Path(tmpdir) / "a.png"
+                )
+
+        # The first command rasterizes the caption; the render itself is one process.
+        self.assertEqual(len(fake.commands), 2)
+        command = fake.commands[-1]
+        self.assertIn("split=2[video][still]", command[command.index("-filter_complex") + 1])
+        self.assertEqual(command[-1], str(Path(tmpdir) / "a.png"))
+        self.assertIn(str(Path(tmpdir) / "a.mp4"), command)
+
+    def test_ffmpeg_progress_is_collected_as_metrics(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fake_ffmpeg = Path(tmpdir) / "ffmpeg"
+            fake_ffmpeg.write_text(FAKE_FFMPEG)
+            fake_ffmpeg.chmod(0o755)
+            renderer = VideoRenderer(output_dir=Path(tmpdir), font_path=Path("font.ttf"))
+            path = f"{tmpdir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+            with mock.patch.dict(os.environ, {"PATH": path}):
+                metrics = renderer.render_video("hello", Path(tmpdir) / "out.mp4")
+
+        self.assertEqual(metrics.frames, 360)
+        self.assertEqual(metrics.fps, 240.5)
+        self.assertEqual(metrics.speed, 8.01)
+        self.assertEqual(metrics.output_bytes, 5)
+        self.assertGreater(metrics.wall_seconds, 0)
+        self.assertFalse(metrics.cached)
+
+
+class RenderReportTests(unittest.TestCase):
+    def test_render_report_groups_metrics_by_template(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            env = os.environ.copy()
+            env["PYTHONPATH"] = str(Path.cwd() / "src")
+            env["OPENAI_API_KEY"] = "test-key"
+            env["TG_OPENAI_MOCK"] = "1"
+            env["TG_VIDEO_RENDER_MODE"] = "mock"
+            env["TG_VIDEO_OUTPUT"] = f"{tmpdir}/renders"
+
+            def run_cli(*args: str) -> str:
+                return subprocess.run(
+                    ["python", "-m", "tg_content_factory.cli", "--db", db_path, *args],
+                    check=True,
+                    env=env,
+                    cwd=tmpdir,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+
+            run_cli("generate-ideas", "--count", "2")
+            run_cli("create-drafts", "1", "2")
+            report = run_cli("render-report", "--slowest", "1")
+
+            with sqlite3.connect(db_path) as conn:
+                recorded = conn.execute("SELECT COUNT(*) FROM render_metrics").fetchone()[0]
+
+        self.assertEqual(recorded, 4)
+        self.assertIn(
+            "'template_name': 'Lightning Lecture', 'profile': 'proof', 'renders': 2", report
+        )
+        self.assertIn(
+            "'template_name': 'Deep Dive Teaser', 'profile': 'proof', 'renders': 2", report
+        )
+        self.assertIn("Slowest 1 renders:", report)
+
+    def test_promoted_drafts_keep_their_proof_metrics(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            env = os.environ.copy()
+            env["PYTHONPATH"] = str(Path.cwd() / "src")
+            env["OPENAI_API_KEY"] = "test-key"
+            env["TG_OPENAI_MOCK"] = "1"
+            env["TG_VIDEO_RENDER_MODE"] = "mock"
+            env["TG_VIDEO_OUTPUT"] = f"{tmpdir}/renders"
+
+            def run_cli(*args: str) -> str:
+                return subprocess.run(
+                    ["python", "-m", "tg_content_factory.cli", "--db", db_path, *args],
+                    check=True,
+                    env=env,
+                    cwd=tmpdir,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+
+            run_cli("generate-ideas", "--count", "1")
+            run_cli("create-drafts", "1", "--templates", "Lightning Lecture")
+            run_cli("review", "1", "--approve")
+            report = run_cli("render-report")
+
+            with sqlite3.connect(db_path) as conn:
+                recorded = conn.execute(
+                    "SELECT draft_id, profile FROM render_metrics ORDER BY profile"
+                ).fetchall()
+
+        self.assertEqual(recorded, [(1, "full"), (1, "proof")])
+        self.assertIn("'profile': 'full', 'renders': 1", report)
+        self.assertIn("'profile': 'proof', 'renders': 1", report)
+
+    def test_metrics_keyed_by_draft_alone_are_rekeyed_by_profile(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            with sqlite3.connect(db_path) as conn:
+                conn.executescript(
+                    """
+                    CREATE TABLE drafts (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        idea_id INTEGER NOT NULL,
+                        template_name TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        video_path TEXT,
+                        preview_path TEXT,
+                        status TEXT NOT NULL,
+                        created_at TEXT NOT NULL,
+                        render_profile TEXT NOT NULL DEFAULT 'full'
+                    );
+                    CREATE TABLE render_metrics (
+                        draft_id INTEGER PRIMARY KEY,
+                        wall_seconds REAL NOT NULL,
+                        output_bytes INTEGER NOT NULL,
+                        frames INTEGER,
+                        fps REAL,
+                        speed REAL,
+                        cached INTEGER NOT NULL,
+                        recorded_at TEXT NOT NULL
+                    );
+                    INSERT INTO drafts VALUES (1, 1, 'T', 'c', NULL, NULL, 'p', 'now', 'proof');
+                    INSERT INTO render_metrics VALUES (1, 1.5, 10, NULL, NULL, NULL, 0, 'now');
+                    """
+                )
+
+            tg_db.init_db(db_path)
+            tg_db.init_db(db_path)
+
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute("SELECT draft_id, profile, wall_seconds FROM render_metrics")
+                self.assertEqual(rows.fetchall(), [(1, "proof", 1.5)])
+                # The full render of the same draft now gets a row of its own.
+                conn.execute(
+                    "INSERT INTO render_metrics VALUES "
+                    "(1, 'full', 3.0, 20, NULL, NULL, NULL, 0, 'now')"
+                )
+
+
+class ProofRenderTests(unittest.TestCase):
+    def test_proof_profile_renders_small_and_fast(self) -> None:
+        fake = RecordingFFmpeg()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            renderer = VideoRenderer(
+                output_dir=Path(tmpdir), font_path=Path("font.ttf"), profile=PROOF_PROFILE
+            )
+            with mock.patch("src.tg_content_factory.video_renderer._run_ffmpeg", fake):
+                renderer.render_with_preview(
+                    "hello", Path(tmpdir) / "a.mp4", Path(tmpdir) / "a.png"
+                )
+
+        caption, command = fake.commands
+        self.assertIn("fontsize=21", caption[caption.index("-vf") + 1])
+        self.assertIn("color=c=black:s=540x960:r=15:d=12", command)
+        self.assertEqual(command[command.index("-preset") + 1], "ultrafast")
+        self.assertNotEqual(renderer.render_params(), VideoRenderer(
+            output_dir=Path("out"), font_path=Path("font.ttf")
+        ).render_params())
+
+    def test_approving_a_proof_draft_promotes_it_to_full_quality(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            env = os.environ.copy()
+            env["PYTHONPATH"] = str(Path.cwd() / "src")
+            env["OPENAI_API_KEY"] = "test-key"
+            env["TG_OPENAI_MOCK"] = "1"
+            env["TG_VIDEO_RENDER_MODE"] = "mock"
+            env["TG_VIDEO_OUTPUT"] = f"{tmpdir}/renders"
+
+            def run_cli(*args: str) -> str:
+                return subprocess.run(
+                    ["python", "-m", "tg_content_factory.cli", "--db", db_path, *args],
+                    check=True,
+                    env=env,
+                    cwd=tmpdir,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+
+            def draft_row(draft_id: int) -> sqlite3.Row:
+                with sqlite3.connect(db_path) as conn:
+                    conn.row_factory = sqlite3.Row
+                    return conn.execute(
+                        "SELECT video_path, preview_path, render_profile, status "
+                        "FROM drafts WHERE id = ?",
+                        (draft_id,),
+                    ).fetchone()
+
+            run_cli("generate-ideas", "--count", "2")
+            run_cli("create-drafts", "1", "2", "--templates", "Lightning Lecture")
+            proof = draft_row(1)
+            run_cli("review", "1", "--approve")
+            run_cli("review", "2", "--reject")
+            full = draft_row(1)
+            rejected = draft_row(2)
+
+            self.assertEqual(proof["render_profile"], "proof")
+            self.assertTrue(proof["video_path"].endswith("lightning-lecture.proof.mp4"))
+            self.assertEqual(full["render_profile"], "full")
+            self.assertEqual(full["status"], "approved")
+            self.assertTrue(full["video_path"].endswith("lightning-lecture.mp4"))
+            self.assertTrue(Path(full["video_path"]).exists())
+            self.assertTrue(Path(full["preview_path"]).exists())
+            self.assertEqual(rejected["render_profile"], "proof")
+
+
+class VariantRenderTests(unittest.TestCase):
+    def test_variants_and_thumbnails_come_from_one_ffmpeg_process(self) -> None:
+        fake = RecordingFFmpeg()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            renderer = VideoRenderer(output_dir=Path(tmpdir), font_path=Path("font.ttf"))
+            video_path = Path(tmpdir) / "lecture.mp4"
+            with mock.patch("src.tg_content_factory.video_renderer._run_ffmpeg", fake):
+                renderer.render_variants(
+                    "hello", video_path, Path(tmpdir) / "lecture.png", VENUE_VARIANTS.values()
+                )
+            written = sorted(path.name for path in Path(tmpdir).iterdir())
+
+        _, command = fake.commands
+        graph = command[command.index("-filter_complex") + 1]
+        self.assertIn("split=5[video][still][v0][v1][v2]", graph)
+        self.assertIn("scale=720:720:force_original_aspect_ratio=decrease", graph)
+        twitter_args = command[command.index("[out2]") :]
+        self.assertEqual(twitter_args[twitter_args.index("-b:v") + 1], "2M")
+        self.assertEqual(
+            written,
+            [
+                ".captions",
+                "lecture.mp4",
+                "lecture.png",
+                "lecture.tiktok.jpg",
+                "lecture.tiktok.mp4",
+                "lecture.twitter.jpg",
+                "lecture.twitter.mp4",
+                "lecture.youtube.jpg",
+                "lecture.youtube.mp4",
+            ],
+        )
+
+    def test_approved_drafts_post_their_venue_variant(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/tg.db"
+            env = os.environ.copy()
+            env["PYTHONPATH"] = str(Path.cwd() / "src")
+            env["OPENAI_API_KEY"] = "test-key"
+            env["TG_OPENAI_MOCK"] = "1"
+            env["TG_VIDEO_RENDER_MODE"] = "mock"
+            env["TG_VIDEO_OUTPUT"] = f"{tmpdir}/renders"
+
+            def run_cli(*args: str) -> None:
+                subprocess.run(
+                    ["python", "-m", "tg_content_factory.cli", "--db", db_path, *args],
+                    check=True,
+                    env=env,
+                    cwd=tmpdir,
+                    capture_output=True,
+                )
+
+            run_cli("generate-ideas", "--count", "2")
+            run_cli("create-drafts", "1", "--templates", "Lightning Lecture")
+            run_cli("review", "1", "--approve")
+            run_cli("post-approved", "--venues", "youtube", "twitter", "blog")
+            run_cli(
+                "create-drafts", "2", "--templates", "Lightning Lecture", "--profile", "full",
+                "--stream",
+            )
+
+            with sqlite3.connect(db_path) as conn:
+                variants = conn.execute(
+                    """
+                    SELECT draft_id, venue, video_path, thumbnail_path
+                    FROM draft_variants ORDER BY draft_id, venue
+                    """
+                ).fetchall()
+                posted = dict(conn.execute("SELECT venue, video_path FROM posts").fetchall())
+                (main_video,) = conn.execute(
+                    "SELECT video_path FROM drafts WHERE id = 1"
+                ).fetchone()
+
+            # Every venue sets its own bitrate, so each gets its own encode, for batch
+            # and streamed drafts alike; venues without a variant post the main video.
+            venues = ["tiktok", "twitter", "youtube"]
+            self.assertEqual(
+                [row[:2] for row in variants],
+                [(1, venue) for venue in venues] + [(2, venue) for venue in venues],
+            )
+            for _, _, video_path, thumbnail_path in variants:
+                self.assertTrue(Path(video_path).exists())
+                self.assertTrue(Path(thumbnail_path).exists())
+            self.assertTrue(posted["twitter"].endswith("lightning-lecture.twitter.mp4"))
+            self.assertTrue(posted["youtube"].endswith("lightning-lecture.youtube.mp4"))
+            self.assertEqual(posted["blog"], main_video)
+
+
+class CaptionOverlayTests(unittest.TestCase):
+    def test_layout_wraps_long_lines_and_keeps_paragraphs(self) -> None:
+        lines = layout_caption("word " * 40 + "\n\n\nHook", 540, 21)
+
+        self.assertGreater(len(lines), 2)
+        self.assertTrue(all(len(line) <= 43 for line in lines))
+        self.assertEqual(lines[-2:], ("", "Hook"))
+
+    def test_caption_is_rasterized_once_and_composited_as_overlay(self) -> None:
+        fake = RecordingFFmpeg()
+        script = "It's 10:30 -- what's 100% true?"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            renderer = VideoRenderer(output_dir=Path(tmpdir), font_path=Path("font.ttf"))
+            with mock.patch("src.tg_content_factory.video_renderer._run_ffmpeg", fake):
+                renderer.render_many(
+                    [
+                        RenderJob(script, Path(tmpdir) / f"{idx}.mp4", Path(tmpdir) / f"{idx}.png")
+                        for idx in range(3)
+                    ],
+                    workers=3,
+                )
+            overlays = list((Path(tmpdir) / ".captions").iterdir())
+
+        rasterize = [command for command in fake.commands if "-vf" in command]
+        renders = [command for command in fake.commands if "-vf" not in command]
+        self.assertEqual(len(rasterize), 1)
+        self.assertEqual(len(renders), 3)
+        self.assertEqual([path.suffix for path in overlays], [".png"])
+        for command in renders:
+            self.assertIn(str(overlays[0]), command)
+            self.assertTrue(command[command.index("-filter_complex") + 1].startswith(
+                "[0:v][1:v]overlay=0:0"
+            ))
+        self.assertFalse(any(script in part for part in fake.commands[0]))
+
+    def test_overlays_are_evicted_least_recently_used_and_locks_released(self) -> None:
+        fake = RecordingFFmpeg()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rasterizer = CaptionRasterizer(Path(tmpdir), max_overlays=2)
+
+            def overlay(text: str) -> Path:
+                time.sleep(0.01)  # keep mtimes apart on coarse filesystems
+                return rasterizer.overlay_for(text, Path("font.ttf"), 21, (540, 960), fake)
+
+            first = overlay("first")
+            second = overlay("second")
+            self.assertEqual(overlay("first"), first)  # reuse makes it most recent
+            third = overlay("third")
+
+            remaining = {path for path in Path(tmpdir).iterdir()}
+            self.assertEqual(remaining, {first, third})
+            self.assertFalse(second.exists())
+            self.assertEqual(rasterizer._key_locks, {})
+            self.assertEqual(len(fake.commands), 3)
+
+
+class DraftBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmpdir.name
+        self.db_path = f"{self.tmpdir}/tg.db"
+        self.env = os.environ.copy()
+        self.env["PYTHONPATH"] = str(Path.cwd() / "src")
+        self.env["OPENAI_API_KEY"] = "test-key"
+        self.env["TG_OPENAI_MOCK"] = "1"
+        self.env["TG_VIDEO_RENDER_MODE"] = "mock"
+        self.env["TG_VIDEO_OUTPUT"] = f"{self.tmpdir}/renders"
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def run_cli(self, *args: str) -> str:
+        return subprocess.run(
+            ["python", "-m", "tg_content_factory.cli", "--db", self.db_path, *args],
+            check=True,
+            env=self.env,
+            cwd=self.tmpdir,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def query(self, sql: str) -> list:
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_resume_skips_pairs_that_already_have_drafts(self) -> None:
+        self.run_cli("generate-ideas", "--count", "2")
+        self.run_cli("create-drafts", "1", "--templates", "Lightning Lecture")
+
+        output = self.run_cli("create-drafts", "1", "2", "--resume")
+
+        self.assertIn("Created drafts: [2, 3, 4]", output)
+        pairs = self.query("SELECT idea_id, template_name FROM drafts ORDER BY id")
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertEqual(len(pairs), 4)
+
+    def test_resume_reuses_renders_left_on_disk(self) -> None:
+        self.run_cli("generate-ideas", "--count", "1")
+        self.run_cli("create-drafts", "1", "--templates", "Lightning Lecture")
+        ((video_path,),) = self.query("SELECT video_path FROM drafts")
+        rendered_at = Path(video_path).stat().st_mtime_ns
+        # Simulate a crash between the render finishing and its row being committed.
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM render_metrics")
+            conn.execute("DELETE FROM drafts")
+
+        self.run_cli("create-drafts", "1", "--templates", "Lightning Lecture", "--resume")
+
+        self.assertEqual(self.query("SELECT video_path FROM drafts"), [(video_path,)])
+        self.assertEqual(self.query("SELECT cached FROM render_metrics"), [(1,)])
+        self.assertEqual(Path(video_path).stat().st_mtime_ns, rendered_at)
+
+    def test_resume_never_reuses_a_render_that_crashed_part_way(self) -> None:
+        bin_dir = Path(self.tmpdir) / "bin"
+        bin_dir.mkdir()
+        (bin_dir / "ffmpeg").write_text(PARTIAL_FFMPEG)
+        (bin_dir / "ffmpeg").chmod(0o755)
+        del self.env["TG_VIDEO_RENDER_MODE"]
+        self.env["PATH"] = f"{bin_dir}{os.pathsep}{self.env.get('PATH', '')}"
+        self.run_cli("generate-ideas", "--count", "1")
+        self.run_cli("create-drafts", "1", "--templates", "Lightning Lecture")
+        ((video_path,),) = self.query("SELECT video_path FROM drafts")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM render_metrics")
+            conn.execute("DELETE FROM drafts")
+
+        # Re-rendering the same pair dies mid-encode, leaving truncated outputs behind.
+        self.env["FAKE_FFMPEG_FAIL"] = "1"
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.run_cli("create-drafts", "1", "--templates", "Lightning Lecture")
+        self.assertEqual(Path(video_path).read_text(), "partial")
+        del self.env["FAKE_FFMPEG_FAIL"]
+
+        self.run_cli("create-drafts", "1", "--templates", "Lightning Lecture", "--resume")
+
+        self.assertEqual(Path(video_path).read_text(), "complete")
+        self.assertEqual(self.query("SELECT cached FROM render_metrics"), [(0,)])
+
+    def test_stream_mode_splits_ffmpeg_threads_between_workers(self) -> None:
+        bin_dir = Path(self.tmpdir) / "bin"
+        bin_dir.mkdir()
+        (bin_dir / "ffmpeg").write_text(PARTIAL_FFMPEG)
+        (bin_dir / "ffmpeg").chmod(0o755)
+        log_path = Path(self.tmpdir) / "ffmpeg.log"
+        del self.env["TG_VIDEO_RENDER_MODE"]
+        self.env["PATH"] = f"{bin_dir}{os.pathsep}{self.env.get('PATH', '')}"
+        self.env["FAKE_FFMPEG_LOG"] = str(log_path)
+        self.run_cli("generate-ideas", "--count", "2")
+
+        self.run_cli(
+            "create-drafts", "1", "2", "--templates", "Lightning Lecture", "--stream",
+            "--concurrency", "2",
+        )
+
+        commands = [json.loads(line) for line in log_path.read_text().splitlines()]
+        self.assertTrue(commands)
+        expected = str(max(1, available_cores() // 2))
+        for command in commands:
+            self.assertIn("-threads", command)
+            self.assertEqual(command[command.index("-threads") + 1], expected)
+
+    def test_earliest_deadline_drafts_are_rendered_first(self) -> None:
+        self.run_cli("generate-ideas", "--count", "3")
+
+        self.run_cli(
+            "create-drafts",
+            "1",
+            "2",
+            "3",
+            "--templates",
+            "Lightning Lecture",
+            "--deadline",
+            "3=2030-01-01T09:00:00",
+            "--deadline",
+            "2=2030-01-01T08:00:00+00:00",
+        )
+
+        self.assertEqual(
+            self.query("SELECT idea_id FROM drafts ORDER BY id"), [(2,), (3,), (1,)]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,12 @@
 import sqlite3
 import tempfile
 import unittest
+from datetime import datetime, timedelta
 
 from src.db import IdeaRepository
 from src.idea_service import IdeaService
-from src.queue import AssetGenQueue
+from src.models import Idea, IdeaScore
+from src.asset_queue import AssetGenQueue
 
 
 class IdeaServiceTests(unittest.TestCase):
@@ -33,6 +35,101 @@ class IdeaServiceTests(unittest.TestCase):
             self.assertIsNotNone(queue_row)
             self.assertEqual(queue_row[0], ideas[0].title)
 
+    def test_generate_and_enqueue_bulk_links_queue_rows_to_idea_ids(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            repository = IdeaRepository(db_path)
+            service = IdeaService(repository, AssetGenQueue(repository))
+            service.generate_and_enqueue(
+                themes=["Warmup"],
+                recent_keywords=["Workflow"],
+                trend_signals=["AI"],
+                recent_topics=[],
+            )
+
+            idea_ids = service.generate_and_enqueue_bulk(
+                themes=["Automation", "Analytics", "Ethics"],
+                recent_keywords=["Workflow", "Pipeline"],
+                trend_signals=["AI"],
+                recent_topics=["automation", "marketing"],
+            )
+
+            self.assertEqual(idea_ids, [2, 3, 4])
+            with sqlite3.connect(db_path) as conn:
+                themes = conn.execute(
+                    "SELECT theme FROM ideas WHERE id IN (2, 3, 4) ORDER BY id"
+                ).fetchall()
+                linked = conn.execute(
+                    """
+                    SELECT asset_gen_queue.idea_id
+                    FROM asset_gen_queue
+                    JOIN ideas ON ideas.id = asset_gen_queue.idea_id
+                    ORDER BY asset_gen_queue.id
+                    """
+                ).fetchall()
+
+            self.assertEqual([row[0] for row in themes], ["Automation", "Analytics", "Ethics"])
+            self.assertEqual([row[0] for row in linked], [1, 2, 3, 4])
+
+    def test_legacy_queue_table_is_migrated(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE asset_gen_queue (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        idea_title TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        created_at TEXT NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    "INSERT INTO asset_gen_queue (idea_title, payload, created_at) VALUES (?, ?, ?)",
+                    ("Legacy", "{}", "2024-01-01T00:00:00"),
+                )
+
+            IdeaRepository(db_path)
+
+            with sqlite3.connect(db_path) as conn:
+                row = conn.execute(
+                    "SELECT id, idea_id, idea_title FROM asset_gen_queue"
+                ).fetchone()
+            self.assertEqual(row, (1, None, "Legacy"))
+
+    def test_top_ideas_filters_by_theme_and_age(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repository = IdeaRepository(f"{tmpdir}/ideas.db")
+            now = datetime(2024, 6, 1)
+            rows = [
+                ("AI", 3.0, now),
+                ("AI", 4.5, now - timedelta(days=10)),
+                ("AI", 4.0, now - timedelta(days=1)),
+                ("Ops", 5.0, now),
+                ("AI", 2.0, now - timedelta(days=2)),
+            ]
+            for theme, engagement, created_at in rows:
+                repository.save_idea(
+                    Idea.from_inputs(
+                        title=f"{theme} {engagement}",
+                        description="",
+                        theme=theme,
+                        keywords=["k"],
+                        trends=[],
+                        created_at=created_at,
+                        score=IdeaScore(engagement=engagement, novelty=1.0, venue_fit=1.0),
+                    )
+                )
+
+            top = repository.top_ideas(2, theme="AI", since=now - timedelta(days=7))
+            overall = repository.top_ideas(1)
+
+            self.assertEqual([stored.id for stored in top], [3, 1])
+            self.assertEqual(top[0].idea.score.total, 6.0)
+            self.assertEqual(top[0].idea.keywords, ("k",))
+            self.assertEqual(overall[0].idea.theme, "Ops")
+
 
 if __name__ == "__main__":
     unittest.main()
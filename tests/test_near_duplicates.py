@@ -0,0 +1,109 @@
+import sqlite3
+import tempfile
+import unittest
+
+from src.db import IdeaRepository
+from src.idea_service import IdeaService
+from src.asset_queue import AssetGenQueue
+from src.tg_content_factory.near_duplicates import NearDuplicateIndex
+
+
+class NearDuplicateIndexTests(unittest.TestCase):
+    def test_find_duplicate_matches_reworded_prompt_only(self) -> None:
+        index = NearDuplicateIndex(threshold=0.6)
+        conn = sqlite3.connect(":memory:")
+        index.ensure_schema(conn)
+        stored = "Use a 30-second demo showing how AI grades essays in real time"
+        index.add(conn, 1, index.signature(stored))
+        index.add(conn, 2, index.signature("Three pricing mistakes new course creators make"))
+
+        match = index.find_duplicate(
+            conn, index.signature("Use a 30 second demo that shows how AI grades essays in real-time")
+        )
+        unrelated = index.find_duplicate(
+            conn, index.signature("Behind the scenes of recording a lecture series")
+        )
+
+        self.assertIsNotNone(match)
+        self.assertEqual(match.idea_id, 1)
+        self.assertIsNone(unrelated)
+
+    def test_texts_without_shingles_are_not_indexed_or_matched(self) -> None:
+        index = NearDuplicateIndex()
+        conn = sqlite3.connect(":memory:")
+        index.ensure_schema(conn)
+        index.add(conn, 1, index.signature(""))
+        index.add(conn, 2, index.signature("   "))
+
+        self.assertEqual(index.signature("?!"), ())
+        self.assertIsNone(index.find_duplicate(conn, index.signature("")))
+        self.assertIsNone(index.find_duplicate(conn, index.signature("--")))
+        stored = conn.execute("SELECT COUNT(*) FROM idea_minhash").fetchone()[0]
+        self.assertEqual(stored, 0)
+
+    def test_bulk_rerun_rejects_identical_ideas(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            repository = IdeaRepository(db_path, duplicate_index=NearDuplicateIndex())
+            service = IdeaService(repository, AssetGenQueue(repository))
+            inputs = dict(
+                themes=["Automation", "Automation", "Analytics"],
+                recent_keywords=["Workflow", "Pipeline"],
+                trend_signals=["AI"],
+            )
+
+            first = service.generate_and_enqueue_bulk(**inputs)
+            second = service.generate_and_enqueue_bulk(**inputs)
+            single = service.generate_and_enqueue(**inputs)
+
+            self.assertEqual(first, [1, 2])
+            self.assertEqual(second, [])
+            self.assertEqual(single, [])
+            with sqlite3.connect(db_path) as conn:
+                queued = conn.execute("SELECT COUNT(*) FROM asset_gen_queue").fetchone()[0]
+            self.assertEqual(queued, 2)
+
+    def test_distinct_themes_with_shared_course_text_all_survive(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repository = IdeaRepository(
+                f"{tmpdir}/ideas.db", duplicate_index=NearDuplicateIndex()
+            )
+            service = IdeaService(repository, AssetGenQueue(repository))
+            inputs = dict(
+                themes=["Ethics", "Strategy", "Operations", "Pricing", "Hiring"],
+                recent_keywords=[
+                    "responsible machine learning governance",
+                    "stakeholder communication frameworks",
+                    "cross functional product leadership",
+                ],
+                trend_signals=["agentic workflow automation platforms", "regulatory shifts in ai"],
+            )
+
+            first = service.generate_and_enqueue_bulk(**inputs)
+            rerun = service.generate_and_enqueue_bulk(**inputs)
+
+            self.assertEqual(first, [1, 2, 3, 4, 5])
+            self.assertEqual(rerun, [])
+
+    def test_unscoped_index_is_rebuilt_with_scopes(self) -> None:
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE ideas (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE idea_minhash (idea_id INTEGER PRIMARY KEY, signature BLOB)")
+        index = NearDuplicateIndex()
+
+        self.assertTrue(index.ensure_schema(conn))
+        index.backfill(conn, [(1, "ai grading demo", "ethics")])
+
+        self.assertFalse(index.ensure_schema(conn))
+        signature = index.signature("ai grading demo")
+        self.assertEqual(index.find_duplicate(conn, signature, "ethics").idea_id, 1)
+        self.assertIsNone(index.find_duplicate(conn, signature, "pricing"))
+
+    def test_cli_and_services_layers_share_one_index_module(self) -> None:
+        from src.tg_content_factory import db as cli_db
+
+        self.assertIsInstance(cli_db.IDEA_DUPLICATES, NearDuplicateIndex)
+
+
+if __name__ == "__main__":
+    unittest.main()
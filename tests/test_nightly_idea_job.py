@@ -0,0 +1,141 @@
+import json
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts.nightly_idea_job import (
+    CourseJob,
+    discover_courses,
+    generate_for_course,
+    run_courses,
+)
+from src.recent_topics import RecentTopicIndex
+
+COURSE_CONFIG = {
+    "themes": ["Data Ethics", "AI Operations"],
+    "recent_keywords": ["trust", "automation"],
+    "trend_signals": ["agentic workflows"],
+    "recent_topics": ["governance"],
+}
+
+
+class NightlyIdeaJobTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        self.shards = self.root / "shards"
+
+    def write_config(self, relative: str, config: dict = COURSE_CONFIG) -> Path:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(config), encoding="utf-8")
+        return path
+
+    def test_directory_yields_one_sorted_job_per_config(self) -> None:
+        self.write_config("courses/beta.json")
+        self.write_config("courses/alpha.json")
+        self.write_config("courses/notes.txt")
+
+        jobs = discover_courses(self.root / "courses", self.shards)
+
+        self.assertEqual([job.name for job in jobs], ["alpha", "beta"])
+        self.assertEqual(jobs[0].config_path, str(self.root / "courses" / "alpha.json"))
+        self.assertEqual(jobs[1].db_path, str(self.shards / "beta.db"))
+
+    def test_manifest_list_and_object_forms_resolve_against_manifest(self) -> None:
+        self.write_config("configs/a.json")
+        self.write_config("configs/b.json")
+        self.write_config("list.json", ["configs/a.json", "configs/b.json"])
+        self.write_config(
+            "object.json",
+            {"courses": ["configs/a.json", {"name": "renamed", "config": "configs/b.json"}]},
+        )
+
+        listed = discover_courses(self.root / "list.json", self.shards)
+        named = discover_courses(self.root / "object.json", self.shards)
+
+        self.assertEqual([job.name for job in listed], ["a", "b"])
+        self.assertEqual(
+            named[1],
+            CourseJob(
+                name="renamed",
+                config_path=str(self.root / "configs" / "b.json"),
+                db_path=str(self.shards / "renamed.db"),
+            ),
+        )
+
+    def test_duplicate_course_names_are_rejected(self) -> None:
+        self.write_config("one/course.json")
+        self.write_config("two/course.json")
+        self.write_config("manifest.json", ["one/course.json", "two/course.json"])
+
+        with self.assertRaises(SystemExit) as raised:
+            discover_courses(self.root / "manifest.json", self.shards)
+
+        self.assertIn("course", str(raised.exception))
+
+    def test_run_courses_writes_one_shard_per_course_and_reports_failures(self) -> None:
+        self.write_config("courses/alpha.json")
+        self.write_config("courses/beta.json")
+        self.write_config("courses/broken.json", {"themes": ["Only themes"]})
+        jobs = discover_courses(self.root / "courses", self.shards)
+
+        summaries = run_courses(jobs, workers=2)
+
+        self.assertEqual([summary.name for summary in summaries], ["alpha", "beta", "broken"])
+        self.assertEqual([summary.ideas_created for summary in summaries], [2, 2, 0])
+        self.assertIsNone(summaries[0].error)
+        self.assertIn("KeyError", summaries[2].error)
+        for name in ("alpha", "beta"):
+            with sqlite3.connect(self.shards / f"{name}.db") as conn:
+                (queued,) = conn.execute("SELECT COUNT(*) FROM asset_gen_queue").fetchone()
+            self.assertEqual(queued, 2)
+
+    def test_config_topics_seed_the_index_instead_of_stacking(self) -> None:
+        config_path = self.write_config("course.json")
+        db_path = str(self.root / "ideas.db")
+
+        generate_for_course(config_path, db_path)
+        generate_for_course(config_path, db_path)
+
+        weights = RecentTopicIndex(db_path).lookup(["governance"])
+        self.assertAlmostEqual(weights["governance"], 1.0, places=3)
+
+    def test_drain_script_drains_every_shard(self) -> None:
+        self.write_config("courses/alpha.json")
+        self.write_config("courses/beta.json")
+        run_courses(discover_courses(self.root / "courses", self.shards), workers=1)
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "scripts.drain_asset_queue",
+                "--shard-dir",
+                str(self.shards),
+                "--assets",
+                str(self.root / "assets"),
+                "--metadata-db",
+                str(self.root / "metadata.db"),
+                "--workers",
+                "2",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+        self.assertIn("Shard alpha:", result.stdout)
+        self.assertIn("Shard beta:", result.stdout)
+        for name in ("alpha", "beta"):
+            with sqlite3.connect(self.shards / f"{name}.db") as conn:
+                statuses = {row[0] for row in conn.execute("SELECT status FROM asset_gen_queue")}
+            self.assertEqual(statuses, {"done"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,347 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from src.tg_content_factory.http_pool import HTTPConnectionPool
+from src.tg_content_factory.openai_client import (
+    OpenAIClient,
+    OpenAIHTTPError,
+)
+from src.tg_content_factory.rate_limiter import RateLimiter, RetryPolicy
+from src.tg_content_factory.response_cache import ResponseCache
+
+
+class StubResponsesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers["Content-Length"])
+        request = json.loads(self.rfile.read(length))
+        self.server.peers.add(self.client_address)
+        self.server.paths.append(self.path)
+        if request["input"] == "fail":
+            self._reply(500, {"error": "boom"})
+            return
+        if request.get("stream"):
+            self._stream(["Hook: ", "stay curious\n", "Beats: 1, 2, 3\n", "CTA: Learn more."])
+            return
+        if request["input"].startswith("throttle") and self.server.throttled < 2:
+            self.server.throttled += 1
+            self._reply(429, {"error": "slow down"}, {"Retry-After": "0.05"})
+            return
+        self._reply(
+            200,
+            {"output": [{"content": [{"type": "output_text", "text": f"echo {request['input']}"}]}]},
+        )
+
+    def _reply(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, deltas: list) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [{"type": "response.output_text.delta", "delta": delta} for delta in deltas]
+        events.append({"type": "response.completed", "response": {"usage": {"total_tokens": 9}}})
+        for event in events:
+            chunk = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+class StubServerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubResponsesHandler)
+        self.server.peers = set()
+        self.server.paths = []
+        self.server.throttled = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        env = mock.patch.dict(os.environ, {}, clear=False)
+        env.start()
+        os.environ.pop("TG_OPENAI_MOCK", None)
+        self.addCleanup(env.stop)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OpenAIClientPoolTests(StubServerTestCase):
+    def test_calls_reuse_one_keep_alive_connection(self) -> None:
+        client = OpenAIClient(api_key="test", base_url=self.base_url, pool_size=2, timeout=5)
+
+        scripts = [client.generate_script(f"idea {idx}", "Lightning") for idx in range(3)]
+
+        self.assertTrue(all(script.startswith("echo ") for script in scripts))
+        self.assertEqual(len(self.server.peers), 1)
+        self.assertEqual(set(self.server.paths), {"/v1/responses"})
+
+    def test_error_status_raises_and_pool_recovers(self) -> None:
+        client = OpenAIClient(
+            api_key="test",
+            base_url=self.base_url,
+            pool_size=1,
+            timeout=5,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+        with self.assertRaises(OpenAIHTTPError) as raised:
+            client._responses_call("fail")
+
+        self.assertEqual(raised.exception.status, 500)
+        self.assertEqual(client._responses_call("ok"), "echo ok")
+
+    def test_pool_bounds_concurrent_connections(self) -> None:
+        pool = HTTPConnectionPool(self.base_url, max_size=2, timeout=5)
+        body = json.dumps({"input": "x"}).encode("utf-8")
+
+        threads = [
+            threading.Thread(
+                target=pool.request,
+                args=("POST", "/responses", body, {"Content-Type": "application/json"}),
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        pool.close()
+
+        self.assertLessEqual(pool.connections_opened, 2)
+
+    def test_throttled_requests_retry_after_server_hint(self) -> None:
+        limiter = RateLimiter(requests_per_minute=600)
+        client = OpenAIClient(
+            api_key="test", base_url=self.base_url, timeout=5, rate_limiter=limiter
+        )
+
+        self.assertEqual(client._responses_call("throttle me"), "echo throttle me")
+        self.assertEqual(len(self.server.paths), 3)
+
+    def test_retries_stop_after_max_attempts(self) -> None:
+        client = OpenAIClient(
+            api_key="test",
+            base_url=self.base_url,
+            timeout=5,
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0.01),
+        )
+
+        with self.assertRaises(OpenAIHTTPError):
+            client._responses_call("fail")
+        self.assertEqual(len(self.server.paths), 2)
+
+
+class StreamingTests(StubServerTestCase):
+    def test_stream_yields_deltas_and_releases_connection(self) -> None:
+        client = OpenAIClient(api_key="test", base_url=self.base_url, pool_size=1, timeout=5)
+
+        deltas = list(client.stream_script("idea", "Lightning"))
+        follow_up = client.generate_script("idea", "Lightning")
+
+        self.assertEqual(deltas[:2], ["Hook: ", "stay curious\n"])
+        self.assertEqual("".join(deltas), "Hook: stay curious\nBeats: 1, 2, 3\nCTA: Learn more.")
+        self.assertTrue(follow_up.startswith("echo "))
+        self.assertEqual(len(self.server.peers), 1)
+
+    def test_streamed_script_is_cached_whole(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResponseCache(str(Path(tmpdir) / "cache.db"))
+            client = OpenAIClient(api_key="test", base_url=self.base_url, timeout=5, cache=cache)
+
+            streamed = "".join(client.stream_script("idea", "Lightning"))
+            cached = list(client.stream_script("idea", "Lightning"))
+
+        self.assertEqual(cached, [streamed])
+        self.assertEqual(len(self.server.paths), 1)
+
+
+class BatchScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        env = mock.patch.dict(os.environ, {}, clear=False)
+        env.start()
+        os.environ.pop("TG_OPENAI_MOCK", None)
+        self.addCleanup(env.stop)
+        self.client = OpenAIClient(api_key="test")
+        self.pairs = [(f"idea {idx}", "Lightning") for idx in range(3)]
+
+    def test_batch_reply_is_split_per_pair(self) -> None:
+        reply = [{"id": 2, "script": "c"}, {"id": 0, "script": "a"}, {"id": 1, "script": "b"}]
+        with mock.patch.object(OpenAIClient, "_request_output", return_value=reply) as request:
+            scripts = self.client.generate_scripts_batch(self.pairs)
+
+        self.assertEqual(scripts, ["a", "b", "c"])
+        self.assertEqual(request.call_count, 1)
+
+    def test_invalid_entries_fall_back_to_single_calls(self) -> None:
+        replies = [[{"id": 0, "script": "a"}, {"id": 1, "script": ""}], "b", "c"]
+        with mock.patch.object(OpenAIClient, "_request_output", side_effect=replies) as request:
+            scripts = self.client.generate_scripts_batch(self.pairs)
+
+        self.assertEqual(scripts, ["a", "b", "c"])
+        self.assertEqual(request.call_count, 3)
+        self.assertIn("idea 1", request.call_args_list[1].args[0])
+
+    def test_scripts_are_cached_per_pair_across_regrouped_batches(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ResponseCache(str(Path(tmpdir) / "cache.db"))
+            client = OpenAIClient(api_key="test", cache=cache)
+            pairs = self.pairs + [("idea 3", "Lightning"), ("idea 4", "Lightning")]
+            replies = [
+                [{"id": 0, "script": "a"}, {"id": 1, "script": "b"}, {"id": 2, "script": "c"}],
+                [{"id": 0, "script": "d"}, {"id": 1, "script": "e"}],
+            ]
+            with mock.patch.object(
+                OpenAIClient, "_request_output", side_effect=replies
+            ) as request:
+                first = client.generate_scripts_batch(pairs[:3])
+                # A resumed run regroups: two cached pairs plus two new ones.
+                resumed = client.generate_scripts_batch(pairs[1:])
+                single = client.generate_script("idea 0", "Lightning")
+
+            self.assertEqual(first, ["a", "b", "c"])
+            self.assertEqual(resumed, ["b", "c", "d", "e"])
+            self.assertEqual(single, "a")
+            self.assertEqual(request.call_count, 2)
+            resent = request.call_args_list[1].args[0]
+            self.assertIn("idea 3", resent)
+            self.assertNotIn("idea 1", resent)
+            stats = cache.stats()
+            self.assertEqual((stats.hits, stats.misses), (3, 5))
+
+
+class ResponseCacheTests(StubServerTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.cache_path = str(Path(tmpdir.name) / "cache.db")
+
+    def test_repeat_prompt_is_served_from_cache(self) -> None:
+        cache = ResponseCache(self.cache_path)
+        client = OpenAIClient(api_key="test", base_url=self.base_url, timeout=5, cache=cache)
+
+        first = client.generate_script("idea", "Lightning")
+        second = client.generate_script("idea", "Lightning")
+        bypassed = client.generate_script("idea", "Lightning", use_cache=False)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, bypassed)
+        self.assertEqual(len(self.server.paths), 2)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+
+    def test_cache_key_includes_model(self) -> None:
+        cache = ResponseCache(self.cache_path)
+        for model in ("model-a", "model-b"):
+            client = OpenAIClient(
+                api_key="test", model=model, base_url=self.base_url, timeout=5, cache=cache
+            )
+            client.generate_script("idea", "Lightning")
+
+        self.assertEqual(len(self.server.paths), 2)
+
+    def test_errors_are_not_cached(self) -> None:
+        cache = ResponseCache(self.cache_path)
+        client = OpenAIClient(
+            api_key="test",
+            base_url=self.base_url,
+            timeout=5,
+            cache=cache,
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+        for _ in range(2):
+            with self.assertRaises(OpenAIHTTPError):
+                client._responses_call("fail")
+
+        self.assertEqual(len(self.server.paths), 2)
+        self.assertEqual(cache.stats().entries, 0)
+
+    def test_expired_entries_miss(self) -> None:
+        cache = ResponseCache(self.cache_path, ttl_seconds=60)
+        key = ResponseCache.key_for("model", "prompt")
+        with mock.patch("src.tg_content_factory.response_cache.time.time", return_value=1000.0):
+            cache.put(key, "value")
+            self.assertEqual(cache.get(key), (True, "value"))
+        with mock.patch("src.tg_content_factory.response_cache.time.time", return_value=1061.0):
+            self.assertEqual(cache.get(key), (False, None))
+
+        self.assertEqual(cache.stats().entries, 0)
+
+    def test_idea_generation_skips_cache_by_default(self) -> None:
+        cache = ResponseCache(self.cache_path)
+        client = OpenAIClient(api_key="test", base_url=self.base_url, timeout=5, cache=cache)
+
+        with mock.patch.object(
+            OpenAIClient, "_request_output", return_value=["a", "b"]
+        ) as request:
+            client.generate_ideas(2)
+            client.generate_ideas(2)
+            client.generate_ideas(2, use_cache=True)
+            client.generate_ideas(2, use_cache=True)
+
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(cache.stats().entries, 1)
+
+    def test_size_limit_evicts_and_tracked_totals_stay_exact(self) -> None:
+        cache = ResponseCache(self.cache_path, max_bytes=25)
+        clock = iter(float(tick) for tick in range(100))
+        with mock.patch(
+            "src.tg_content_factory.response_cache.time.time", side_effect=lambda: next(clock)
+        ):
+            cache.put("a", "x" * 8)
+            cache.put("a", "x" * 9)
+            cache.put("b", "y" * 8)
+            cache.put("c", "z" * 8)
+
+        stats = cache.stats()
+        self.assertEqual((stats.entries, stats.size_bytes, stats.evictions), (2, 20, 1))
+        reopened = ResponseCache(self.cache_path, max_bytes=25)
+        with sqlite3.connect(self.cache_path) as conn:
+            tracked = dict(
+                conn.execute(
+                    "SELECT name, value FROM counters WHERE name IN ('entries', 'size_bytes')"
+                ).fetchall()
+            )
+        self.assertEqual(tracked, {"entries": 2, "size_bytes": 20})
+        self.assertEqual(reopened.get("a"), (False, None))
+
+    def test_least_recently_read_entries_are_evicted(self) -> None:
+        cache = ResponseCache(self.cache_path, max_entries=2)
+        clock = iter(float(tick) for tick in range(100))
+        with mock.patch(
+            "src.tg_content_factory.response_cache.time.time", side_effect=lambda: next(clock)
+        ):
+            cache.put("a", 1)
+            cache.put("b", 2)
+            cache.get("a")
+            cache.put("c", 3)
+
+            self.assertEqual(cache.get("a"), (True, 1))
+            self.assertEqual(cache.get("b"), (False, None))
+            self.assertEqual(cache.get("c"), (True, 3))
+        self.assertEqual(cache.stats().evictions, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+import unittest
+
+from src.tg_content_factory.pipeline import Stage, run_pipeline
+
+
+class PipelineTests(unittest.TestCase):
+    def test_results_reach_sink_in_input_order(self) -> None:
+        rng = random.Random(3)
+        delays = {item: rng.uniform(0, 0.02) for item in range(30)}
+
+        def slow_double(item: int) -> int:
+            time.sleep(delays[item])
+            return item * 2
+
+        results: list[int] = []
+        run_pipeline(
+            range(30),
+            [Stage("double", slow_double, workers=4), Stage("inc", lambda x: x + 1, workers=2)],
+            results.append,
+        )
+
+        self.assertEqual(results, [item * 2 + 1 for item in range(30)])
+
+    def test_batched_stage_receives_lists(self) -> None:
+        batches: list[int] = []
+
+        def batch_square(items: list[int]) -> list[int]:
+            batches.append(len(items))
+            return [item * item for item in items]
+
+        results: list[int] = []
+        run_pipeline(range(10), [Stage("square", batch_square, batch_size=4)], results.append)
+
+        self.assertEqual(results, [item * item for item in range(10)])
+        self.assertTrue(all(size <= 4 for size in batches))
+        self.assertEqual(sum(batches), 10)
+
+    def test_batches_fill_even_with_a_small_queue(self) -> None:
+        batches: list[int] = []
+
+        def fetch(item: int) -> int:
+            return item
+
+        def batch_square(items: list[int]) -> list[int]:
+            if not batches:
+                time.sleep(0.1)  # let the next batch pile up while the first one runs
+            batches.append(len(items))
+            return [item * item for item in items]
+
+        results: list[int] = []
+        run_pipeline(
+            range(30),
+            [Stage("fetch", fetch), Stage("square", batch_square, batch_size=10)],
+            results.append,
+            queue_size=8,
+        )
+
+        self.assertEqual(results, [item * item for item in range(30)])
+        self.assertEqual(max(batches), 10)
+
+    def test_slow_item_bounds_buffered_results(self) -> None:
+        lock = threading.Lock()
+        fed = 0
+        results: list[int] = []
+        ahead: list[int] = []
+
+        def items():
+            nonlocal fed
+            for item in range(100):
+                with lock:
+                    fed += 1
+                    ahead.append(fed - len(results))
+                yield item
+
+        def work(item: int) -> int:
+            if item == 0:
+                time.sleep(0.2)  # everything behind it finishes first and must wait
+            return item
+
+        def sink(item: int) -> None:
+            with lock:
+                results.append(item)
+
+        run_pipeline(items(), [Stage("work", work, workers=4)], sink, max_pending=12)
+
+        self.assertEqual(results, list(range(100)))
+        # The feeder may have pulled one item it is still waiting to admit.
+        self.assertLessEqual(max(ahead), 12 + 1)
+
+    def test_stages_overlap(self) -> None:
+        def sleep_then(item: int) -> int:
+            time.sleep(0.1)
+            return item
+
+        started = time.perf_counter()
+        run_pipeline(
+            range(4),
+            [Stage("fetch", sleep_then), Stage("render", sleep_then)],
+            lambda item: None,
+        )
+
+        # Sequential execution would take 0.8s; overlapped stages need ~0.5s.
+        self.assertLess(time.perf_counter() - started, 0.7)
+
+    def test_bounded_queues_apply_backpressure(self) -> None:
+        produced = 0
+        lock = threading.Lock()
+        in_flight: list[int] = []
+
+        def items():
+            nonlocal produced
+            for item in range(20):
+                with lock:
+                    produced += 1
+                yield item
+
+        def slow_sink(item: int) -> None:
+            with lock:
+                in_flight.append(produced - item)
+            time.sleep(0.005)
+
+        run_pipeline(items(), [Stage("pass", lambda item: item)], slow_sink, queue_size=2)
+
+        # Two bounded queues plus one item each in the feeder, the worker and the sink.
+        self.assertLessEqual(max(in_flight), 2 + 2 + 3)
+
+    def test_stage_errors_propagate(self) -> None:
+        def explode(item: int) -> int:
+            if item == 5:
+                raise RuntimeError("render failed")
+            return item
+
+        results: list[int] = []
+        with self.assertRaises(RuntimeError):
+            run_pipeline(range(50), [Stage("explode", explode, workers=3)], results.append)
+        self.assertNotIn(5, results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.tg_content_factory.rate_limiter import RateLimiter, RetryPolicy, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTests(unittest.TestCase):
+    def make_limiter(self, clock: FakeClock, **kwargs: object) -> RateLimiter:
+        return RateLimiter(clock=clock.time, sleep=clock.sleep, **kwargs)
+
+    def test_requests_wait_for_refill_once_bucket_is_empty(self) -> None:
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, requests_per_minute=60)
+
+        waits = [limiter.acquire() for _ in range(61)]
+
+        self.assertEqual(waits[:60], [0.0] * 60)
+        self.assertAlmostEqual(waits[60], 1.0)
+
+    def test_token_budget_limits_large_requests(self) -> None:
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, tokens_per_minute=1200)
+
+        limiter.acquire(tokens=1000)
+        waited = limiter.acquire(tokens=500)
+
+        self.assertAlmostEqual(waited, 15.0)
+
+    def test_settle_refunds_overestimated_tokens(self) -> None:
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, tokens_per_minute=1000)
+
+        limiter.acquire(tokens=1000)
+        limiter.settle(estimated_tokens=1000, actual_tokens=200)
+
+        self.assertEqual(limiter.acquire(tokens=800), 0.0)
+
+    def test_block_for_pauses_next_caller(self) -> None:
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, requests_per_minute=600)
+
+        limiter.block_for(2.5)
+
+        self.assertAlmostEqual(limiter.acquire(), 2.5)
+
+    def test_state_file_is_shared_between_limiters(self) -> None:
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_path = str(Path(tmpdir) / "limits.db")
+            first = self.make_limiter(clock, requests_per_minute=2, state_path=state_path)
+            second = self.make_limiter(clock, requests_per_minute=2, state_path=state_path)
+
+            first.acquire()
+            first.acquire()
+            waited = second.acquire()
+
+        self.assertAlmostEqual(waited, 30.0)
+
+
+class RetryHelpersTests(unittest.TestCase):
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+
+        delays = [policy.delay_for(attempt) for attempt in range(10)]
+
+        self.assertTrue(all(0 <= delay <= 5.0 for delay in delays))
+        self.assertEqual(policy.delay_for(3, retry_after=2.0), 2.0)
+
+    def test_retry_after_header_formats(self) -> None:
+        self.assertEqual(retry_after_seconds({"retry-after": "3"}), 3.0)
+        self.assertEqual(retry_after_seconds({"retry-after-ms": "250"}), 0.25)
+        self.assertEqual(
+            retry_after_seconds(
+                {"retry-after": "Wed, 21 Oct 2015 07:28:10 GMT"}, now=1445412480.0
+            ),
+            10.0,
+        )
+        self.assertIsNone(retry_after_seconds({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
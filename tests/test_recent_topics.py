@@ -0,0 +1,124 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.db import IdeaRepository
+from src.idea_service import IdeaService
+from src.asset_queue import AssetGenQueue
+from src.recent_topics import RecentTopicIndex
+from src.scoring import ScoreCandidate, score_idea, score_ideas_batch
+
+
+class RecentTopicIndexTests(unittest.TestCase):
+    def test_weights_decay_with_half_life(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index = RecentTopicIndex(f"{tmpdir}/ideas.db", half_life=timedelta(days=1))
+            start = datetime(2024, 1, 1)
+            index.record(["AI", "growth"], observed_at=start)
+            index.record(["ai"], observed_at=start)
+
+            self.assertEqual(index.lookup(["ai", "growth", "other"], now=start), {"ai": 2.0, "growth": 1.0})
+            later = index.lookup(["AI"], now=start + timedelta(days=1))
+            self.assertAlmostEqual(later["ai"], 1.0)
+            self.assertEqual(index.lookup(["ai"], now=start + timedelta(days=30)), {})
+
+    def test_saved_ideas_update_index_incrementally(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repository = IdeaRepository(f"{tmpdir}/ideas.db")
+            index = repository.recent_topic_index()
+            service = IdeaService(repository, AssetGenQueue(repository), topic_index=index)
+
+            service.generate_and_enqueue_bulk(
+                themes=["Automation", "Analytics"],
+                recent_keywords=["Workflow"],
+                trend_signals=["AI"],
+            )
+            weights = index.lookup(["automation", "analytics", "workflow"])
+            self.assertAlmostEqual(weights["automation"], 1.0, places=3)
+            self.assertAlmostEqual(weights["workflow"], 2.0, places=3)
+
+            ideas = service.generate_and_enqueue(
+                themes=["Automation"],
+                recent_keywords=["Workflow"],
+                trend_signals=["AI"],
+            )
+            self.assertAlmostEqual(ideas[0].score.novelty, 3.4, places=2)
+            self.assertEqual(ideas[0].score.venue_fit, 3.0)
+
+    def test_index_matches_equivalent_topic_list(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            now = datetime(2024, 1, 1)
+            index = RecentTopicIndex(f"{tmpdir}/ideas.db")
+            topics = ["ai", "llm", "llm", "growth"]
+            index.record(topics, observed_at=now)
+
+            class FixedClockIndex:
+                def lookup(self, wanted):
+                    return index.lookup(wanted, now=now)
+
+            candidate = ScoreCandidate(theme="AI", keywords=("LLM", "Scale"), trends=("LLM",))
+            expected = score_idea(
+                theme=candidate.theme,
+                keywords=candidate.keywords,
+                trends=candidate.trends,
+                recent_topics=topics,
+            )
+            scalar = score_idea(
+                theme=candidate.theme,
+                keywords=candidate.keywords,
+                trends=candidate.trends,
+                topic_index=FixedClockIndex(),
+            )
+            batch = score_ideas_batch([candidate], topic_index=FixedClockIndex())
+
+            self.assertEqual(scalar, expected)
+            self.assertEqual(batch, [expected])
+
+    def test_existing_ideas_are_backfilled(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            repository = IdeaRepository(db_path)
+            IdeaService(repository, AssetGenQueue(repository)).generate_and_enqueue(
+                themes=["Automation"],
+                recent_keywords=["Workflow"],
+                trend_signals=["AI"],
+            )
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("DROP TABLE recent_topics")
+
+            weights = IdeaRepository(db_path).recent_topic_index().lookup(["automation"])
+
+            self.assertAlmostEqual(weights["automation"], 1.0, places=3)
+
+    def test_seed_counts_new_topics_once_and_keeps_history(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index = RecentTopicIndex(f"{tmpdir}/ideas.db")
+            start = datetime(2024, 1, 1)
+            index.record(["ai", "ai"], observed_at=start)
+
+            index.seed(["AI", "Governance"], observed_at=start)
+            index.seed(["governance"], observed_at=start)
+
+            self.assertEqual(index.lookup(["ai", "governance"], now=start), {"ai": 2.0, "governance": 1.0})
+
+    def test_prune_drops_decayed_topics_and_caps_size(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/ideas.db"
+            index = RecentTopicIndex(db_path, half_life=timedelta(days=1), max_topics=2)
+            start = datetime(2024, 1, 1)
+            index.record(["ancient"], observed_at=start - timedelta(days=30))
+            index.record(["light"], observed_at=start)
+            index.record(["heavy", "heavy", "medium", "medium"], observed_at=start)
+            index.record(["heavy"], observed_at=start)
+
+            removed = index.prune(now=start)
+
+            with sqlite3.connect(db_path) as conn:
+                kept = {row[0] for row in conn.execute("SELECT topic FROM recent_topics")}
+            self.assertEqual(removed, 2)
+            self.assertEqual(kept, {"heavy", "medium"})
+
+
+if __name__ == "__main__":
+    unittest.main()
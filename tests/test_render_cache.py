@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from src.tg_content_factory.render_cache import RenderCache
+from src.tg_content_factory.video_renderer import (
+    VENUE_VARIANTS,
+    MockVideoRenderer,
+    RenderJob,
+    RenderMetrics,
+)
+
+RENDER_CALLS: list[str] = []
+
+
+@dataclass(frozen=True)
+class CountingRenderer(MockVideoRenderer):
+    def render_with_preview(
+        self, script: str, video_path: Path, preview_path: Path
+    ) -> RenderMetrics:
+        RENDER_CALLS.append(script)
+        return super().render_with_preview(script, video_path, preview_path)
+
+
+class RenderCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        RENDER_CALLS.clear()
+
+    def job(self, script: str, name: str, template: str = "Lightning Lecture") -> RenderJob:
+        return RenderJob(
+            script, self.root / "out" / f"{name}.mp4", self.root / "out" / f"{name}.png", template
+        )
+
+    def test_repeat_render_skips_ffmpeg_and_links_outputs(self) -> None:
+        cache = RenderCache(str(self.root / "cache"))
+        renderer = CountingRenderer(output_dir=self.root / "out", cache=cache)
+
+        renderer.render_many([self.job("script", "first")])
+        renderer.render_many([self.job("script", "second")])
+
+        self.assertEqual(RENDER_CALLS, ["script"])
+        second = self.job("script", "second")
+        self.assertEqual(second.video_path.read_text(), "script")
+        self.assertTrue(second.preview_path.exists())
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+
+    def test_key_covers_template_and_render_params(self) -> None:
+        cache = RenderCache(str(self.root / "cache"))
+        renderer = CountingRenderer(output_dir=self.root / "out", cache=cache)
+
+        renderer.render_many([self.job("script", "a")])
+        renderer.render_many([self.job("script", "b", template="Deep Dive Teaser")])
+        other_font = CountingRenderer(
+            output_dir=self.root / "out", font_path=Path("other.ttf"), cache=cache
+        )
+        other_font.render_many([self.job("script", "c")])
+
+        self.assertEqual(len(RENDER_CALLS), 3)
+
+    def test_rerender_in_place_does_not_touch_cached_copy(self) -> None:
+        cache = RenderCache(str(self.root / "cache"))
+        renderer = CountingRenderer(output_dir=self.root / "out", cache=cache)
+
+        renderer.render_many([self.job("old script", "draft")])
+        renderer.render_many([self.job("new script", "draft")])
+        renderer.render_many([self.job("old script", "again")])
+
+        self.assertEqual(self.job("", "draft").video_path.read_text(), "new script")
+        self.assertEqual(self.job("", "again").video_path.read_text(), "old script")
+        self.assertEqual(len(RENDER_CALLS), 2)
+
+    def test_size_bound_evicts_least_recently_used(self) -> None:
+        cache = RenderCache(str(self.root / "cache"), max_bytes=80)
+        renderer = CountingRenderer(output_dir=self.root / "out", cache=cache)
+
+        # Each mock render stores 27 bytes (script plus preview text), so two fit.
+        renderer.render_many([self.job("a" * 10, "a")])
+        renderer.render_many([self.job("b" * 10, "b")])
+        renderer.render_many([self.job("a" * 10, "a2")])
+        renderer.render_many([self.job("c" * 10, "c")])
+
+        stats = cache.stats()
+        self.assertEqual(stats.evictions, 1)
+        self.assertLessEqual(stats.size_bytes, 80)
+        self.assertEqual(len(os.listdir(self.root / "cache" / "objects")), stats.entries * 2)
+        renderer.render_many([self.job("a" * 10, "a3"), self.job("b" * 10, "b2")])
+        self.assertEqual(RENDER_CALLS.count("a" * 10), 1)
+        self.assertEqual(RENDER_CALLS.count("b" * 10), 2)
+
+    def test_variant_outputs_are_cached_as_one_entry(self) -> None:
+        cache = RenderCache(str(self.root / "cache"))
+        renderer = CountingRenderer(output_dir=self.root / "out", cache=cache)
+        twitter = (VENUE_VARIANTS["twitter"],)
+
+        renderer.render_many([replace(self.job("script", "first"), variants=twitter)])
+        again = replace(self.job("script", "second"), variants=twitter)
+        (metrics,) = renderer.render_many([again])
+        renderer.render_many([self.job("script", "plain")])
+
+        # The plain job has fewer outputs, so it is a separate entry, not a partial hit.
+        self.assertEqual(RENDER_CALLS, ["script", "script"])
+        self.assertTrue(metrics.cached)
+        variant_video, thumbnail = VENUE_VARIANTS["twitter"].paths_for(again.video_path)
+        self.assertEqual(variant_video.read_text(), "twitter: script")
+        self.assertTrue(thumbnail.exists())
+        self.assertTrue(again.preview_path.exists())
+        self.assertEqual(cache.stats().entries, 2)
+        self.assertEqual(len(os.listdir(self.root / "cache" / "objects")), 4 + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
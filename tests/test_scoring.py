@@ -1,6 +1,8 @@
 import unittest
+from unittest import mock
 
-from src.scoring import score_idea
+from src import scoring
+from src.scoring import ScoreCandidate, score_idea, score_ideas_batch
 
 
 class ScoreIdeaTests(unittest.TestCase):
@@ -17,5 +19,41 @@ class ScoreIdeaTests(unittest.TestCase):
         self.assertEqual(breakdown.venue_fit, 3.3)
 
 
+class ScoreIdeasBatchTests(unittest.TestCase):
+    CANDIDATES = [
+        ScoreCandidate(theme="AI", keywords=("LLM", "Scale"), trends=("LLM", "Video")),
+        ScoreCandidate(theme="Growth", keywords=("llm", "LLM", "ai"), trends=("Ai", "ai")),
+        ScoreCandidate(theme="Ops", keywords=(), trends=()),
+        ScoreCandidate(
+            theme="Data",
+            keywords=tuple(f"kw{idx}" for idx in range(12)),
+            trends=tuple(f"kw{idx}" for idx in range(8)),
+        ),
+    ]
+    RECENT = ["ai", "llm", "growth", "LLM", "kw3", "kw3", "kw4", "kw5", "kw6", "kw7"]
+
+    def _scalar(self) -> list[scoring.ScoreBreakdown]:
+        return [
+            score_idea(
+                theme=candidate.theme,
+                keywords=candidate.keywords,
+                trends=candidate.trends,
+                recent_topics=self.RECENT,
+            )
+            for candidate in self.CANDIDATES
+        ]
+
+    def test_batch_matches_scalar_scores(self) -> None:
+        self.assertEqual(score_ideas_batch(self.CANDIDATES, recent_topics=self.RECENT), self._scalar())
+
+    def test_pure_python_fallback_matches_scalar_scores(self) -> None:
+        with mock.patch.object(scoring, "np", None):
+            batch = score_ideas_batch(self.CANDIDATES, recent_topics=self.RECENT)
+        self.assertEqual(batch, self._scalar())
+
+    def test_empty_batch(self) -> None:
+        self.assertEqual(score_ideas_batch([], recent_topics=self.RECENT), [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from tg_content_factory.models import PostPayload
 
@@ -40,6 +40,10 @@ class VenueAdapter:
     def format_payload(self, payload: PostPayload) -> Dict[str, Any]:
         raise NotImplementedError
 
+    def video_url_for(self, payload: PostPayload) -> Optional[str]:
+        """The variant rendered for this venue, falling back to the main video."""
+        return payload.video_variants.get(self.venue_name) or payload.video_url
+
     def submit(self, payload: PostPayload) -> Dict[str, Any]:
         formatted = self.format_payload(payload)
         return self.client.post("/posts", formatted)
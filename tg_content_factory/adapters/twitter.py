@@ -22,5 +22,5 @@ class TwitterAdapter(VenueAdapter):
         return {
             "text": text,
             "tags": payload.tags,
-            "video_url": payload.video_url,
+            "video_url": self.video_url_for(payload),
         }
@@ -21,5 +21,5 @@ class YouTubeAdapter(VenueAdapter):
             "description": payload.description,
             "tags": payload.tags,
             "category": "Education",
-            "video_url": payload.video_url,
+            "video_url": self.video_url_for(payload),
         }
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 
 @dataclass(frozen=True)
@@ -15,6 +15,8 @@ class PostPayload:
     tags: List[str] = field(default_factory=list)
     hashtags: List[str] = field(default_factory=list)
     video_url: Optional[str] = None
+    # Venue-specific encodes keyed by adapter ``venue_name``; ``video_url`` is the fallback.
+    video_variants: Dict[str, str] = field(default_factory=dict)
 
 
 def _normalize_list(values: Iterable[str]) -> List[str]:
@@ -38,4 +40,9 @@ def normalize_post_payload(payload: PostPayload) -> PostPayload:
         tags=tags,
         hashtags=hashtags,
         video_url=payload.video_url.strip() if payload.video_url else None,
+        video_variants={
+            venue.strip(): url.strip()
+            for venue, url in payload.video_variants.items()
+            if venue.strip() and url.strip()
+        },
     )